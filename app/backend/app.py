@@ -1,10 +1,24 @@
 from flask import Flask, jsonify
 from flask import Flask, send_from_directory
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from extensions import Config
-from extensions import db
+from extensions import db, JSONProvider
 from flask_migrate import Migrate
+from middleware.principal_cache import principal_cache
+from middleware.keyring import keyring
+from services.password_pool import password_pool
+from middleware.rate_limit import login_throttle, create_backend
+from repositories.habilidade_catalog import habilidade_catalog
+from services.text_index import oportunidade_index
+from services.skill_match import skill_matrix
+from services.feed_ranking import feed_candidatos
+from services.presenca import presenca_cache, escritor_presenca
+from services.email import correio, create_transport
+from services.timeline import timeline_cache
 import os
+import time
+import click
 
 migrate = Migrate()
 
@@ -12,12 +26,88 @@ def create_app():
 
     # =============== App Initialization ====================
     app = Flask(__name__)
+    app.json = JSONProvider(app)
 
     app.config.from_object(Config)
+    if app.config['PROXY_FIX_X_FOR']:
+        # request.remote_addr passa a ser o cliente, não o proxy (limite de login por IP)
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
     db.init_app(app)
     migrate.init_app(app, db)  
+
+    #=============== Caches and services ===================
+    keyring.load(app.config)
+    if keyring.ephemeral:
+        app.logger.warning("SECRET_KEY não configurada: tokens JWT só serão válidos neste processo")
+
+    password_pool.configure(
+        workers=app.config['PASSWORD_POOL_WORKERS'],
+        queue_depth=app.config['PASSWORD_POOL_QUEUE_DEPTH'],
+        timeout=app.config['PASSWORD_VERIFY_TIMEOUT'],
+        method=app.config['PASSWORD_HASH_METHOD']
+    )
+
+    login_throttle.configure(
+        backend=create_backend(app.config['LOGIN_THROTTLE_STORE'], app.config['LOGIN_THROTTLE_MAX_KEYS']),
+        window=app.config['LOGIN_THROTTLE_WINDOW'],
+        buckets=app.config['LOGIN_THROTTLE_BUCKETS'],
+        max_por_email=app.config['LOGIN_THROTTLE_MAX_EMAIL'],
+        max_por_ip=app.config['LOGIN_THROTTLE_MAX_IP']
+    )
+
+    habilidade_catalog.configure(ttl=app.config['HABILIDADE_CATALOG_TTL'])
+    oportunidade_index.configure(max_age=app.config['OPORTUNIDADE_INDEX_MAX_AGE'])
+    skill_matrix.configure(max_age=app.config['SKILL_MATRIX_MAX_AGE'])
+    feed_candidatos.configure(
+        ttl=app.config['FEED_CANDIDATOS_TTL'],
+        tamanho=app.config['FEED_TAMANHO'],
+        feed_ttl=app.config['FEED_TTL']
+    )
+
+    presenca_cache.configure(
+        janela_antes=app.config['PRESENCA_JANELA_ANTES'],
+        janela_depois=app.config['PRESENCA_JANELA_DEPOIS'],
+        ttl=app.config['PRESENCA_TABELA_TTL']
+    )
+
+    def gravar_presenca(itens):
+        # Roda na thread do escritor ou, com a fila pequena, na requisição que marcou (contexto próprio)
+        from repositories import PresencaRepo
+        with app.app_context():
+            PresencaRepo.gravar_lote(itens)
+
+    escritor_presenca.configure(
+        gravar=gravar_presenca,
+        lote=app.config['PRESENCA_LOTE'],
+        intervalo=app.config['PRESENCA_INTERVALO'],
+        sincrono_ate=app.config['PRESENCA_SINCRONO_ATE']
+    )
+
+    timeline_cache.configure(
+        tamanho=app.config['TIMELINE_TAMANHO'],
+        ttl=app.config['TIMELINE_TTL'],
+        sync=app.config['TIMELINE_SYNC'],
+        janela_pull=app.config['TIMELINE_JANELA_PULL'],
+        max_timelines=app.config['TIMELINE_MAX_COMUNIDADES'],
+        janela_sync=app.config['TIMELINE_JANELA_SYNC']
+    )
+
+    correio.configure(create_transport(
+        app.config['EMAIL_TRANSPORT'],
+        host=app.config['MAIL_SERVER'],
+        port=app.config['MAIL_PORT'],
+        usuario=app.config['MAIL_USERNAME'],
+        senha=app.config['MAIL_PASSWORD'],
+        tls=app.config['MAIL_USE_TLS'],
+        remetente=app.config['MAIL_REMETENTE']
+    ))
+
+    principal_cache.configure(
+        max_size=app.config['PRINCIPAL_CACHE_SIZE'],
+        ttl=app.config['PRINCIPAL_CACHE_TTL']
+    )
     
-    CORS(app, supports_credentials=True)
+    CORS(app, supports_credentials=True, expose_headers=['X-Next-Cursor'])
 
     #=============== Test Route =================
     @app.route('/', methods=['GET'])
@@ -31,6 +121,10 @@ def create_app():
     from routes.organizacao_routes import organizacao_bp
     from routes.user_routes import user_bp
     from routes.habilidade_routes import habilidade_bp
+    from routes.presenca_routes import presenca_bp
+    from routes.comunidade_routes import comunidade_bp
+    from routes.avaliacao_routes import avaliacao_bp
+    from routes.historico_routes import historico_bp
 
 
     #=============== Register blueprints ===================
@@ -40,7 +134,87 @@ def create_app():
     app.register_blueprint(organizacao_bp, url_prefix='/organizacao')
     app.register_blueprint(user_bp, url_prefix='/user')
     app.register_blueprint(habilidade_bp, url_prefix='/habilidade')
+    app.register_blueprint(presenca_bp, url_prefix='/presenca')
+    app.register_blueprint(comunidade_bp, url_prefix='/comunidade')
+    app.register_blueprint(avaliacao_bp, url_prefix='/avaliacao')
+    app.register_blueprint(historico_bp, url_prefix='/historico')
+
+
+    #============ CLI commands ================
+    @app.cli.command('reindexar-busca')
+    def reindexar_busca():
+        """Reconstrói o índice de busca textual de oportunidades a partir do banco."""
+        from repositories import OportunidadeRepo
+        OportunidadeRepo.rebuild_text_index()
+        print(oportunidade_index.stats())
+
+    @app.cli.command('backfill-tags')
+    def backfill_tags():
+        """Preenche oportunidade_tag a partir da coluna tags das oportunidades existentes."""
+        from repositories import TagRepo
+        total = TagRepo.backfill_oportunidade_tags()
+        print(f'{total} oportunidades processadas.')
+
+    @app.cli.command('aquecer-feed')
+    def aquecer_feed():
+        """Calcula o feed de todos os voluntários ativos (rodar antes dos horários de pico)."""
+        from repositories import FeedRepo
+        total = FeedRepo.warm_feeds()
+        print(f'{total} feeds gerados.')
+
+    @app.cli.command('reconciliar-horas')
+    def reconciliar_horas():
+        """Recalcula os totais de horas por usuário e corrige divergências."""
+        from repositories import HistoricoRepo
+        relatorio = HistoricoRepo.reconciliar_totais()
+        for divergencia in relatorio['divergencias']:
+            print(divergencia)
+        print(f"{relatorio['verificados']} usuários verificados, {relatorio['divergentes']} divergentes corrigidos.")
+
+    @app.cli.command('backfill-conquistas')
+    def backfill_conquistas():
+        """Concede as conquistas correspondentes ao histórico já existente."""
+        from repositories import HistoricoRepo
+        total = HistoricoRepo.backfill_conquistas()
+        print(f'{total} conquistas verificadas.')
+
+    @app.cli.command('recalcular-avaliacoes')
+    def recalcular_avaliacoes():
+        """Regrava o agregado de avaliações (total, soma e histograma) de cada alvo."""
+        from repositories import AvaliacaoRepo
+        total = AvaliacaoRepo.recalcular_agregados()
+        print(f'{total} alvos recalculados.')
+
+    @app.cli.command('despachar-notificacoes')
+    @click.option('--uma-vez', is_flag=True, help='Esvazia a fila e termina, em vez de ficar aguardando eventos.')
+    def despachar_notificacoes(uma_vez):
+        """Consome a outbox de notificações em lotes (rodar como processo worker)."""
+        from repositories import NotificacaoRepo
+        while True:
+            parametros = dict(
+                lote=app.config['OUTBOX_LOTE'],
+                max_tentativas=app.config['OUTBOX_MAX_TENTATIVAS'],
+                backoff=app.config['OUTBOX_BACKOFF']
+            )
+            # Os emails saem depois do commit do despacho, sem lock na outbox
+            total = NotificacaoRepo.despachar_lote(**parametros)
+            emails = NotificacaoRepo.enviar_emails(**parametros)
+            if total or emails:
+                print(f'{total} eventos despachados, {emails} emails enviados.')
+                continue
+            if uma_vez:
+                return
+            NotificacaoRepo.limpar_outbox()
+            time.sleep(app.config['OUTBOX_INTERVALO'])
 
+    @app.cli.command('smtp-local')
+    @click.option('--porta', default=1025, help='Porta do servidor SMTP local.')
+    def smtp_local(porta):
+        """Servidor SMTP de testes que só imprime os emails recebidos (use EMAIL_TRANSPORT=smtp, MAIL_SERVER=localhost, MAIL_USE_TLS=false)."""
+        from services.email import SmtpLocal
+        servidor = SmtpLocal(port=porta, ao_receber=lambda m: print(f"--- {m['To']}: {m['Subject']}\n{m.get_payload()}"))
+        print(f'SMTP local em 127.0.0.1:{porta}')
+        servidor.serve_forever()
 
     #============ Special route to serve files ================
     @app.route('/uploads/<path:filename>')
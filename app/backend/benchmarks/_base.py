@@ -0,0 +1,63 @@
+"""
+Utilitários dos benchmarks: app num SQLite em arquivo temporário (para que
+várias threads usem conexões próprias) e carga de dados em lote.
+
+Rode os scripts a partir de app/backend, por exemplo:
+    python -m benchmarks.login
+"""
+import os
+import tempfile
+import time
+from datetime import date
+from typing import List
+
+# Precisa vir antes de importar extensions: Config lê o ambiente na importação
+os.environ.setdefault('SECRET_KEY', 'chave-de-benchmark-com-32-bytes-ou-mais')
+os.environ.setdefault('EMAIL_TRANSPORT', 'memoria')
+os.environ.setdefault('LOGIN_THROTTLE_MAX_EMAIL', '1000000')
+os.environ.setdefault('LOGIN_THROTTLE_MAX_IP', '1000000')
+
+from extensions import Config, db
+
+
+def criar_app(**config):
+    diretorio = tempfile.mkdtemp(prefix='ami-benchmark-')
+    Config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{diretorio}/ami.db?timeout=60'
+
+    from app import create_app
+    app = create_app()
+    app.config.update(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def inserir_usuarios(n: int, senha: str = 'x', prefixo: str = 'usuario', **campos) -> List[str]:
+    """
+    Insere `n` usuários num único INSERT em lote e retorna os emails.
+    """
+    from models import Usuario
+    emails = [f'{prefixo}{i}@benchmark.com' for i in range(n)]
+    db.session.execute(db.insert(Usuario), [
+        dict(nome_completo=f'Usuário {i}', cpf=f'{prefixo[:3]}{i:08d}', email=email, senha=senha, cidade='Cidade',
+             bairro='Bairro', telefone='11999999999', data_nasc=date(2000, 1, 1), **campos)
+        for i, email in enumerate(emails)
+    ])
+    db.session.commit()
+    return emails
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+class Cronometro:
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.segundos = time.perf_counter() - self.inicio
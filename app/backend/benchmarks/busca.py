@@ -0,0 +1,78 @@
+"""
+Tempo da busca de oportunidades (OportunidadeRepo.search_oportunidades, RF010)
+conforme a tabela cresce. Com os índices compostos, o custo de uma página
+acompanha o tamanho da página, não o da tabela: o tempo por consulta deve
+ficar praticamente estável de 10 mil a 1 milhão de linhas.
+
+    python -m benchmarks.busca [--tamanhos 10000 100000 1000000] [--repeticoes 50]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from ._base import criar_app, inserir_usuarios, Cronometro
+from extensions import db
+from models import Oportunidade, Organizacao
+from models.enums import StatusOportunidades
+from repositories import OportunidadeRepo
+
+COMUNIDADES = [f'Bairro {i}' for i in range(200)]
+INICIO = datetime(2026, 1, 1)
+
+CONSULTAS = {
+    'abertas por data': dict(data_inicio=INICIO + timedelta(days=180)),
+    'comunidade': dict(comunidade='Bairro 7'),
+    'comunidade + período': dict(comunidade='Bairro 7', data_inicio=INICIO + timedelta(days=30), data_fim=INICIO + timedelta(days=90)),
+    'período + duração': dict(data_inicio=INICIO + timedelta(days=100), data_fim=INICIO + timedelta(days=101), duracao_min=2, duracao_max=4),
+}
+
+
+def popular(ate: int, atual: int, id_organizacao: int, lote: int = 50000) -> None:
+    while atual < ate:
+        n = min(lote, ate - atual)
+        db.session.execute(db.insert(Oportunidade), [
+            dict(
+                id_organizacao=id_organizacao, titulo=f'Oportunidade {atual + i}', descricao='Descrição', local_endereco='Rua',
+                comunidade=random.choice(COMUNIDADES), data_hora=INICIO + timedelta(minutes=random.randint(0, 525600)),
+                duracao_horas=random.randint(1, 8), num_vagas=10, vagas_restantes=10,
+                status=StatusOportunidades.aberta if random.random() < 0.7 else StatusOportunidades.fechada
+            )
+            for i in range(n)
+        ])
+        db.session.commit()
+        atual += n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(42)
+    app = criar_app()
+    with app.app_context():
+        inserir_usuarios(1, tipo_usuario='organizacao')
+        organizacao = Organizacao(1, 'ONG', 'ong@benchmark.com', 'x', '12345678000190', 'd', 'Rua', '11999999999')
+        db.session.add(organizacao)
+        db.session.commit()
+
+        print(f"{'linhas':>10} | " + ' | '.join(f'{nome:>22}' for nome in CONSULTAS) + '   (ms por consulta)')
+        atual = 0
+        for tamanho in sorted(args.tamanhos):
+            popular(tamanho, atual, organizacao.id)
+            atual = tamanho
+            db.session.execute(db.text('ANALYZE'))
+
+            tempos = []
+            for filtros in CONSULTAS.values():
+                OportunidadeRepo.search_oportunidades(args.limit, **filtros)
+                with Cronometro() as cronometro:
+                    for _ in range(args.repeticoes):
+                        OportunidadeRepo.search_oportunidades(args.limit, **filtros)
+                tempos.append(cronometro.segundos / args.repeticoes * 1000)
+            print(f'{tamanho:>10} | ' + ' | '.join(f'{t:>22.2f}' for t in tempos))
+
+
+if __name__ == '__main__':
+    main()
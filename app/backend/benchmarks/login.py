@@ -0,0 +1,88 @@
+"""
+Vazão de POST /auth/login sob carga concorrente, com a verificação de senha
+na thread da requisição (antes, PASSWORD_POOL_WORKERS=0) e no pool de
+processos limitado (depois). As requisições são atendidas por um número
+fixo de threads, como num worker do servidor; junto com a rajada de logins
+chegam requisições baratas (GET /), cuja latência mostra se o login está
+segurando as threads do worker.
+
+    python -m benchmarks.login [--logins 200] [--threads 8] [--workers 2] [--fila 8]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash
+from ._base import criar_app, inserir_usuarios, percentil, Cronometro
+from extensions import db
+from services.password_pool import password_pool
+
+
+def rodar(app, emails, threads, rapidas):
+    cliente = app.test_client()
+
+    def login(email):
+        inicio = time.perf_counter()
+        status = cliente.post('/auth/login', json={'email': email, 'senha': 'senha'}).status_code
+        return 'login', status, time.perf_counter() - inicio
+
+    def rapida(_):
+        inicio = time.perf_counter()
+        status = cliente.get('/').status_code
+        return 'rapida', status, time.perf_counter() - inicio
+
+    # Intercala uma requisição barata a cada `rapidas` logins
+    tarefas = []
+    for i, email in enumerate(emails):
+        tarefas.append((login, email))
+        if i % rapidas == 0:
+            tarefas.append((rapida, None))
+
+    with Cronometro() as total, ThreadPoolExecutor(threads) as executor:
+        resultados = list(executor.map(lambda t: t[0](t[1]), tarefas))
+
+    logins = [r for r in resultados if r[0] == 'login']
+    ok = sum(1 for _, status, _ in logins if status == 200)
+    recusados = sum(1 for _, status, _ in logins if status in (429, 503))
+    latencias_rapidas = [d for tipo, _, d in resultados if tipo == 'rapida']
+    return {
+        'segundos': total.segundos,
+        'logins_ok_por_s': ok / total.segundos,
+        'ok': ok,
+        'recusados_503': recusados,
+        'login_p95_ms': percentil([d for _, _, d in logins], 0.95) * 1000,
+        'rapida_p50_ms': percentil(latencias_rapidas, 0.5) * 1000,
+        'rapida_p95_ms': percentil(latencias_rapidas, 0.95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8, help='threads de requisição do "worker"')
+    parser.add_argument('--workers', type=int, default=2, help='processos do pool de senhas')
+    parser.add_argument('--fila', type=int, default=8, help='PASSWORD_POOL_QUEUE_DEPTH')
+    parser.add_argument('--rapidas', type=int, default=5, help='uma requisição barata a cada N logins')
+    args = parser.parse_args()
+
+    app = criar_app()
+    with app.app_context():
+        senha_hash = generate_password_hash('senha', method=app.config['PASSWORD_HASH_METHOD'])
+        emails = inserir_usuarios(args.logins, senha=senha_hash)
+        db.session.remove()
+
+    metodo = app.config['PASSWORD_HASH_METHOD']
+    cenarios = [
+        ('antes: verificação na thread da requisição', dict(workers=0, queue_depth=args.logins)),
+        (f'depois: pool com {args.workers} processos e fila {args.fila}', dict(workers=args.workers, queue_depth=args.fila)),
+    ]
+    for nome, pool in cenarios:
+        password_pool.configure(timeout=app.config['PASSWORD_VERIFY_TIMEOUT'], method=metodo, **pool)
+        resultado = rodar(app, emails, args.threads, args.rapidas)
+        password_pool.shutdown()
+        print(nome)
+        for chave, valor in resultado.items():
+            print(f'  {chave:>16}: {valor:.1f}' if isinstance(valor, float) else f'  {chave:>16}: {valor}')
+
+
+if __name__ == '__main__':
+    main()
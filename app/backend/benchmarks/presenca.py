@@ -0,0 +1,95 @@
+"""
+Check-in por PIN no início de um evento grande (RF013): `--checkins`
+voluntários chegando, todos de uma vez ou espalhados por `--duracao`
+segundos (o pico real é de centenas por minuto). Mede a vazão e a latência
+de POST /presenca/oportunidade/<id>/checkin e confere, depois que o
+escritor esvazia a fila, que todos os horários foram gravados.
+
+    python -m benchmarks.presenca [--checkins 2000] [--threads 16] [--duracao 0]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from collections import Counter
+from werkzeug.security import generate_password_hash
+from ._base import criar_app, inserir_usuarios, percentil, Cronometro
+from extensions import db
+from models import Inscricao, Oportunidade, Organizacao, Usuario
+from models.inscricao import RegistroPresenca
+from models.enums import StatusInscricao
+from repositories import PresencaRepo
+from services.presenca import escritor_presenca
+
+
+def preparar(checkins: int):
+    inserir_usuarios(1, senha=generate_password_hash('senha'), prefixo='org', tipo_usuario='organizacao')
+    inserir_usuarios(checkins, prefixo='voluntario')
+    id_responsavel = db.session.scalar(db.select(Usuario.id).where(Usuario.email == 'org0@benchmark.com'))
+    organizacao = Organizacao(id_responsavel, 'ONG', 'ong@benchmark.com', 'x', '12345678000190', 'd', 'Rua', '11999999999')
+    db.session.add(organizacao)
+    db.session.flush()
+    oportunidade = Oportunidade(organizacao.id, 'Mutirão', 'Descrição', 'Rua', 'Bairro', datetime.now() + timedelta(minutes=30), 4, checkins)
+    db.session.add(oportunidade)
+    db.session.flush()
+
+    ids = db.session.scalars(db.select(Usuario.id).where(Usuario.id != id_responsavel)).all()
+    db.session.execute(db.insert(Inscricao), [
+        dict(id_usuario=id_usuario, id_oportunidade=oportunidade.id, status_inscricao=StatusInscricao.aprovada) for id_usuario in ids
+    ])
+    db.session.commit()
+
+    pins = {}
+    for inscricao in Inscricao.query.filter_by(id_oportunidade=oportunidade.id):
+        registro, _ = PresencaRepo.get_or_create_pin(inscricao)
+        pins[inscricao.id] = registro.codigo_validacao_pin
+    return oportunidade.id, pins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checkins', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duracao', type=float, default=0, help='segundos para espalhar as chegadas (0 = rajada)')
+    args = parser.parse_args()
+
+    app = criar_app()
+    with app.app_context():
+        id_oportunidade, pins = preparar(args.checkins)
+
+    cliente = app.test_client()
+    token = cliente.post('/auth/login', json={'email': 'org0@benchmark.com', 'senha': 'senha'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    url = f'/presenca/oportunidade/{id_oportunidade}/checkin'
+    intervalo = args.duracao / len(pins)
+    inicio = time.perf_counter()
+
+    def check_in(item):
+        i, (id_inscricao, pin) = item
+        # Chegada programada da i-ésima pessoa
+        espera = inicio + i * intervalo - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+        comeco = time.perf_counter()
+        status = cliente.post(url, json={'id_inscricao': id_inscricao, 'pin': pin}, headers=headers).status_code
+        return status, time.perf_counter() - comeco
+
+    with Cronometro() as total, ThreadPoolExecutor(args.threads) as executor:
+        resultados = list(executor.map(check_in, enumerate(pins.items())))
+
+    pendentes = escritor_presenca.pendentes()
+    escritor_presenca.flush()
+    with app.app_context():
+        gravados = db.session.scalar(db.select(db.func.count(RegistroPresenca.id)).where(RegistroPresenca.check_in_hora.isnot(None)))
+
+    latencias = [d for _, d in resultados]
+    print(f'{len(pins)} check-ins em {total.segundos:.2f}s ({len(pins) / total.segundos:.0f}/s), {args.threads} threads')
+    print(f'status: {dict(Counter(s for s, _ in resultados))}')
+    print(f'latência p50 {percentil(latencias, 0.5) * 1000:.1f} ms   p95 {percentil(latencias, 0.95) * 1000:.1f} ms')
+    print(f'na fila ao fim da carga: {pendentes}   gravados: {gravados}')
+    if gravados != len(pins):
+        raise SystemExit('Check-ins aceitos que não chegaram ao banco.')
+
+
+if __name__ == '__main__':
+    main()
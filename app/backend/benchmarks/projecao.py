@@ -0,0 +1,71 @@
+"""
+Serialização das listagens (RF010): o mesmo conjunto de oportunidades lido
+pelo ORM (objetos hidratados + to_dict) e pela projeção de colunas
+(repositories/projecao.py, linhas Core + dict_from_row), com 10 mil e 100
+mil linhas. Também mede uma página de GET /oportunidade/ e confere que os
+dois caminhos geram o mesmo JSON.
+
+    python -m benchmarks.projecao [--tamanhos 10000 100000] [--limit 100] [--repeticoes 200]
+"""
+import argparse
+import random
+from ._base import criar_app, inserir_usuarios, Cronometro
+from .busca import popular
+from extensions import db
+from models import Oportunidade, Organizacao
+from repositories import OportunidadeRepo
+from repositories.projecao import OPORTUNIDADE
+
+
+def orm(limit=None):
+    consulta = Oportunidade.query.order_by(Oportunidade.data_hora, Oportunidade.id)
+    if limit:
+        consulta = consulta.limit(limit)
+    return [oportunidade.to_dict() for oportunidade in consulta]
+
+
+def medir(funcao, repeticoes: int) -> float:
+    # Sessão limpa a cada rodada: o ORM não reaproveita objetos do identity map
+    with Cronometro() as cronometro:
+        for _ in range(repeticoes):
+            funcao()
+            db.session.expunge_all()
+    return cronometro.segundos / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    app = criar_app()
+    with app.app_context():
+        inserir_usuarios(1, tipo_usuario='organizacao')
+        organizacao = Organizacao(1, 'ONG', 'ong@benchmark.com', 'x', '12345678000190', 'd', 'Rua', '11999999999')
+        db.session.add(organizacao)
+        db.session.commit()
+        id_organizacao = organizacao.id
+
+        dumps = app.json.dumps
+        print(f"{'linhas':>8} | {'tudo ORM (ms)':>14} | {'tudo projeção':>14} | {'página ORM':>11} | {'página projeção':>15}")
+        atual = 0
+        for tamanho in sorted(args.tamanhos):
+            popular(tamanho, atual, id_organizacao)
+            atual = tamanho
+
+            por_id = lambda itens: sorted(itens, key=lambda item: item['id'])
+            if dumps(por_id(orm())) != dumps(por_id(OPORTUNIDADE.todos())):
+                raise SystemExit('A projeção gerou um JSON diferente do to_dict.')
+
+            tudo_orm = medir(orm, 1)
+            tudo_projecao = medir(lambda: OPORTUNIDADE.todos(), 1)
+            pagina_orm = medir(lambda: orm(args.limit), args.repeticoes)
+            pagina_projecao = medir(lambda: OportunidadeRepo.get_oportunidades_page(args.limit), args.repeticoes)
+            print(f'{tamanho:>8} | {tudo_orm:>14.0f} | {tudo_projecao:>14.0f} | {pagina_orm:>11.2f} | {pagina_projecao:>15.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Ranking de voluntários compatíveis (GET /oportunidade/<id>/voluntarios):
+o top-k por Jaccard calculado no banco (GROUP BY dos vínculos a cada
+consulta) e na matriz esparsa em memória (services/skill_match.py), com 10
+mil e 100 mil voluntários. Também mede a reconstrução da matriz a partir do
+banco e confere que os dois caminhos devolvem os mesmos voluntários.
+
+    python -m benchmarks.ranking [--tamanhos 10000 100000] [--habilidades 200] [--k 20] [--repeticoes 50]
+"""
+import argparse
+import random
+from itertools import count
+from ._base import criar_app, inserir_usuarios, percentil, Cronometro
+from extensions import db
+from models import Habilidade, VoluntarioHabilidade, Usuario
+from repositories import UserRepo
+from services.skill_match import skill_matrix
+
+# Prefixo distinto por lote: inserir_usuarios monta o cpf com os 3 primeiros caracteres
+_lotes = count()
+
+
+def popular(ate: int, atual: int, habilidades: int, lote: int = 50000) -> None:
+    # Voluntários com 1 a 8 habilidades, as primeiras bem mais comuns que as últimas
+    while atual < ate:
+        n = min(lote, ate - atual)
+        inserir_usuarios(n, prefixo=f'v{next(_lotes):02d}')
+        ids = db.session.scalars(db.select(Usuario.id).order_by(Usuario.id.desc()).limit(n)).all()
+        vinculos = []
+        for uid in ids:
+            escolhidas = {min(int(random.paretovariate(1.2)), habilidades) for _ in range(random.randint(1, 8))}
+            vinculos.extend({'id_usuario': uid, 'id_habilidade': hid} for hid in escolhidas)
+        db.session.execute(db.insert(VoluntarioHabilidade), vinculos)
+        db.session.commit()
+        atual += n
+
+
+def top_k_sql(pedidas, k):
+    vh = VoluntarioHabilidade
+    em_comum = (
+        db.select(vh.id_usuario, db.func.count().label('c'))
+        .where(vh.id_habilidade.in_(pedidas))
+        .group_by(vh.id_usuario)
+        .subquery()
+    )
+    totais = db.select(vh.id_usuario, db.func.count().label('t')).group_by(vh.id_usuario).subquery()
+    score = em_comum.c.c * 1.0 / (totais.c.t + len(pedidas) - em_comum.c.c)
+    return db.session.execute(
+        db.select(em_comum.c.id_usuario, score)
+        .join(totais, totais.c.id_usuario == em_comum.c.id_usuario)
+        .order_by(score.desc(), em_comum.c.id_usuario)
+        .limit(k)
+    ).all()
+
+
+def medir(funcao, consultas):
+    tempos = []
+    for pedidas in consultas:
+        with Cronometro() as cronometro:
+            funcao(pedidas)
+        tempos.append(cronometro.segundos * 1000)
+    return percentil(tempos, 0.5), percentil(tempos, 0.95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--habilidades', type=int, default=200)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(42)
+    app = criar_app()
+    with app.app_context():
+        db.session.execute(db.insert(Habilidade), [{'nome': f'Habilidade {i}'} for i in range(1, args.habilidades + 1)])
+        db.session.commit()
+
+        print(f"{'voluntários':>11} | {'rebuild (ms)':>12} | {'SQL p50':>8} | {'SQL p95':>8} | {'matriz p50':>10} | {'matriz p95':>10}")
+        atual = 0
+        for tamanho in sorted(args.tamanhos):
+            popular(tamanho, atual, args.habilidades)
+            atual = tamanho
+            db.session.execute(db.text('ANALYZE'))
+
+            with Cronometro() as rebuild:
+                UserRepo.rebuild_skill_matrix()
+
+            consultas = [random.sample(range(1, args.habilidades + 1), random.randint(2, 5)) for _ in range(args.repeticoes)]
+            for pedidas in consultas[:5]:
+                sql = [uid for uid, _ in top_k_sql(pedidas, args.k)]
+                matriz = [uid for uid, _, _ in skill_matrix.top_k(pedidas, None, args.k)]
+                if sql != matriz:
+                    raise SystemExit(f'Rankings diferentes para {pedidas}: SQL {sql} x matriz {matriz}')
+
+            sql_p50, sql_p95 = medir(lambda pedidas: top_k_sql(pedidas, args.k), consultas)
+            matriz_p50, matriz_p95 = medir(lambda pedidas: skill_matrix.top_k(pedidas, None, args.k), consultas)
+            print(f'{tamanho:>11} | {rebuild.segundos * 1000:>12.0f} | {sql_p50:>8.2f} | {sql_p95:>8.2f} | {matriz_p50:>10.2f} | {matriz_p95:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
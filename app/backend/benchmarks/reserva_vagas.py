@@ -0,0 +1,77 @@
+"""
+Disputa por vagas (InscricaoRepo.create_inscricao, RF011): centenas de
+voluntários se inscrevendo ao mesmo tempo numa oportunidade com poucas vagas.
+Confere que nenhuma vaga é vendida a mais (inscrições gravadas == vagas e
+vagas_restantes == 0) e mede a vazão das tentativas.
+
+    python -m benchmarks.reserva_vagas [--inscricoes 400] [--vagas 5] [--threads 50]
+"""
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from ._base import criar_app, inserir_usuarios, percentil, Cronometro
+from extensions import db
+from models import Inscricao, Oportunidade, Organizacao, Usuario
+from repositories import InscricaoRepo, VagasEsgotadas
+
+
+def preparar(inscricoes: int, vagas: int):
+    inserir_usuarios(1, prefixo='org', tipo_usuario='organizacao')
+    inserir_usuarios(inscricoes, prefixo='voluntario')
+    id_responsavel = db.session.scalar(db.select(Usuario.id).where(Usuario.email == 'org0@benchmark.com'))
+    organizacao = Organizacao(id_responsavel, 'ONG', 'ong@benchmark.com', 'x', '12345678000190', 'd', 'Rua', '11999999999')
+    db.session.add(organizacao)
+    db.session.flush()
+    oportunidade = Oportunidade(organizacao.id, 'Mutirão', 'Descrição', 'Rua', 'Bairro', datetime.now() + timedelta(days=7), 4, vagas)
+    db.session.add(oportunidade)
+    db.session.commit()
+    ids = db.session.scalars(db.select(Usuario.id).where(Usuario.id != id_responsavel)).all()
+    return oportunidade.id, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--inscricoes', type=int, default=400)
+    parser.add_argument('--vagas', type=int, default=5)
+    parser.add_argument('--threads', type=int, default=50)
+    args = parser.parse_args()
+
+    app = criar_app()
+    with app.app_context():
+        id_oportunidade, ids = preparar(args.inscricoes, args.vagas)
+
+    latencias = []
+
+    def inscrever(id_usuario):
+        with app.app_context():
+            with Cronometro() as cronometro:
+                try:
+                    resultado = 'inscrito' if InscricaoRepo.create_inscricao(id_usuario, id_oportunidade) else 'duplicada'
+                except VagasEsgotadas:
+                    resultado = 'esgotada'
+                except Exception as e:
+                    resultado = type(e).__name__
+                finally:
+                    db.session.remove()
+            latencias.append(cronometro.segundos)
+            return resultado
+
+    with Cronometro() as total:
+        with ThreadPoolExecutor(args.threads) as executor:
+            resultados = Counter(executor.map(inscrever, ids))
+
+    with app.app_context():
+        gravadas = db.session.scalar(db.select(db.func.count(Inscricao.id)).where(Inscricao.id_oportunidade == id_oportunidade))
+        restantes = db.session.get(Oportunidade, id_oportunidade).vagas_restantes
+
+    print(f'{len(ids)} tentativas, {args.vagas} vagas, {args.threads} threads')
+    print(f'resultados: {dict(resultados)}')
+    print(f'inscrições gravadas: {gravadas}   vagas_restantes: {restantes}')
+    print(f'{len(ids) / total.segundos:.0f} tentativas/s   p95 {percentil(latencias, 0.95) * 1000:.1f} ms')
+    if gravadas != args.vagas or restantes != 0 or resultados['inscrito'] != args.vagas:
+        raise SystemExit('Vagas vendidas a mais ou a menos.')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,126 @@
+import os
+import enum
 from secrets import token_hex
 import dotenv
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 
 db : SQLAlchemy = SQLAlchemy()
 
+_dotenv_values = dotenv.dotenv_values(dotenv.find_dotenv())
+
+def env(key, default=None):
+    """
+    Lê uma configuração das variáveis de ambiente ou, na falta delas, do arquivo .env.
+    """
+    return os.environ.get(key, _dotenv_values.get(key, default))
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Serializa os enums dos modelos (status, aprovada...) pelo nome, o mesmo valor aceito na entrada.
+    """
+    @staticmethod
+    def default(o):
+        if isinstance(o, enum.Enum):
+            return o.name
+        return DefaultJSONProvider.default(o)
+
 class Config:
-    SQLALCHEMY_DATABASE_URI = dotenv.get_key(dotenv.find_dotenv(), "DATABASE_URL")
+    SQLALCHEMY_DATABASE_URI = env("DATABASE_URL")
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-    SECRET_KEY = token_hex(32)
+    # Sem SECRET_KEY no ambiente, cada processo gera a sua e os tokens
+    # não são aceitos por outros workers
+    SECRET_KEY = env("SECRET_KEY") or token_hex(32)
+    SECRET_KEY_EPHEMERAL = not env("SECRET_KEY")
+
+    # Chaves de assinatura JWT com rotação por `kid` (middleware/keyring.py)
+    JWT_KEY_FILE = env("JWT_KEY_FILE")
+    JWT_KEYS = env("JWT_KEYS")
+    JWT_ACTIVE_KID = env("JWT_ACTIVE_KID")
+
+    # Validade dos tokens JWT, em segundos
+    TOKEN_TTL = 60 * 60 * 12
+
+    # Pool de verificação de senhas do login (services/password_pool.py).
+    # Com 0 workers a verificação roda na thread da requisição.
+    PASSWORD_POOL_WORKERS = int(env("PASSWORD_POOL_WORKERS", 2))
+    PASSWORD_POOL_QUEUE_DEPTH = int(env("PASSWORD_POOL_QUEUE_DEPTH", 32))
+    PASSWORD_VERIFY_TIMEOUT = float(env("PASSWORD_VERIFY_TIMEOUT", 5))
+    PASSWORD_HASH_METHOD = env("PASSWORD_HASH_METHOD", "scrypt")
+
+    # Proxies reversos confiáveis na frente do app (ProxyFix): com 1 ou mais, o IP
+    # do cliente vem do X-Forwarded-For escrito por eles; com 0, do socket
+    PROXY_FIX_X_FOR = int(env("PROXY_FIX_X_FOR", 0))
+
+    # Limite de tentativas de login falhas (middleware/rate_limit.py).
+    # LOGIN_THROTTLE_STORE aponta para um arquivo SQLite para compartilhar os
+    # contadores entre workers; vazio, cada processo mantém os seus.
+    # LOGIN_THROTTLE_MAX_IP=0 desliga o limite por IP (ex.: atrás de um proxy
+    # que não repassa o IP do cliente, onde todos teriam o mesmo endereço).
+    LOGIN_THROTTLE_WINDOW = int(env("LOGIN_THROTTLE_WINDOW", 300))
+    LOGIN_THROTTLE_BUCKETS = int(env("LOGIN_THROTTLE_BUCKETS", 10))
+    LOGIN_THROTTLE_MAX_EMAIL = int(env("LOGIN_THROTTLE_MAX_EMAIL", 5))
+    LOGIN_THROTTLE_MAX_IP = int(env("LOGIN_THROTTLE_MAX_IP", 50))
+    LOGIN_THROTTLE_MAX_KEYS = int(env("LOGIN_THROTTLE_MAX_KEYS", 100000))
+    LOGIN_THROTTLE_STORE = env("LOGIN_THROTTLE_STORE")
+
+    # Tempo máximo (s) que o catálogo de habilidades em memória fica sem recarregar
+    HABILIDADE_CATALOG_TTL = int(env("HABILIDADE_CATALOG_TTL", 60))
+
+    # Idade máxima (s) do índice de busca textual antes de reconstruí-lo a partir do banco
+    OPORTUNIDADE_INDEX_MAX_AGE = int(env("OPORTUNIDADE_INDEX_MAX_AGE", 300))
+
+    # Idade máxima (s) da matriz voluntário x habilidade antes de reconstruí-la a partir do banco
+    SKILL_MATRIX_MAX_AGE = int(env("SKILL_MATRIX_MAX_AGE", 600))
+
+    # Feed de oportunidades: tamanho de cada feed salvo, validade (s) de um feed salvo
+    # e das oportunidades candidatas carregadas em memória
+    FEED_TAMANHO = int(env("FEED_TAMANHO", 200))
+    FEED_TTL = int(env("FEED_TTL", 3600))
+    FEED_CANDIDATOS_TTL = int(env("FEED_CANDIDATOS_TTL", 60))
+
+    # Check-in/check-out por PIN (services/presenca.py): janela aceita em torno da
+    # data_hora do evento (s), validade da tabela de PINs em memória (s) e
+    # micro-lotes de gravação dos horários (itens, s); com até PRESENCA_SINCRONO_ATE
+    # marcações na fila, a requisição grava na hora
+    PRESENCA_JANELA_ANTES = int(env("PRESENCA_JANELA_ANTES", 7200))
+    PRESENCA_JANELA_DEPOIS = int(env("PRESENCA_JANELA_DEPOIS", 43200))
+    PRESENCA_TABELA_TTL = int(env("PRESENCA_TABELA_TTL", 3600))
+    PRESENCA_LOTE = int(env("PRESENCA_LOTE", 200))
+    PRESENCA_INTERVALO = float(env("PRESENCA_INTERVALO", 0.5))
+    PRESENCA_SINCRONO_ATE = int(env("PRESENCA_SINCRONO_ATE", 20))
+
+    # Feed da comunidade (RF017, services/timeline.py): publicações por timeline
+    # em memória, recarga completa (s), sincronização com outros processos (s),
+    # janela (s) abaixo da qual uma comunidade passa ao modo pull, máximo de
+    # timelines em memória e publicações mais novas relidas a cada sincronização
+    TIMELINE_TAMANHO = int(env("TIMELINE_TAMANHO", 500))
+    TIMELINE_TTL = int(env("TIMELINE_TTL", 300))
+    TIMELINE_SYNC = float(env("TIMELINE_SYNC", 2))
+    TIMELINE_JANELA_PULL = int(env("TIMELINE_JANELA_PULL", 3600))
+    TIMELINE_MAX_COMUNIDADES = int(env("TIMELINE_MAX_COMUNIDADES", 1000))
+    TIMELINE_JANELA_SYNC = int(env("TIMELINE_JANELA_SYNC", 50))
+
+    # Notificações (RF019): transporte de email ('smtp', 'memoria' ou 'console'),
+    # servidor SMTP e despachante da outbox (eventos por lote, espera (s) com a
+    # fila vazia, tentativas e intervalo base (s) do backoff exponencial)
+    EMAIL_TRANSPORT = env("EMAIL_TRANSPORT", "console")
+    MAIL_SERVER = env("MAIL_SERVER", "localhost")
+    MAIL_PORT = int(env("MAIL_PORT", 587))
+    MAIL_USERNAME = env("MAIL_USERNAME")
+    MAIL_PASSWORD = env("MAIL_PASSWORD")
+    MAIL_USE_TLS = env("MAIL_USE_TLS", "true").lower() == "true"
+    MAIL_REMETENTE = env("MAIL_REMETENTE")
+    OUTBOX_LOTE = int(env("OUTBOX_LOTE", 200))
+    OUTBOX_INTERVALO = float(env("OUTBOX_INTERVALO", 2))
+    OUTBOX_MAX_TENTATIVAS = int(env("OUTBOX_MAX_TENTATIVAS", 8))
+    OUTBOX_BACKOFF = float(env("OUTBOX_BACKOFF", 30))
+
+    # Cache de principals autenticados (middleware/principal_cache.py). A
+    # invalidação só vale no processo que alterou o usuário: nos outros workers,
+    # um usuário rebaixado ou removido continua autenticado por até
+    # PRINCIPAL_CACHE_TTL segundos, por isso o padrão é curto.
+    PRINCIPAL_CACHE_SIZE = int(env("PRINCIPAL_CACHE_SIZE", 10000))
+    PRINCIPAL_CACHE_TTL = float(env("PRINCIPAL_CACHE_TTL", 30))
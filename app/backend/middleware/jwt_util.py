@@ -1,30 +1,44 @@
 import jwt
 from functools import wraps
+from datetime import datetime, timedelta, timezone
 from flask import request, jsonify, current_app
 from repositories.user_repo import UserRepo
 from models.usuario import Usuario as User
+from middleware.principal_cache import principal_cache, Principal
+from middleware.keyring import keyring
 
 def generate_token(user: User):
     """
-    Gera um token JWT com payload básico (id, is_admin).
+    Gera um token JWT com as claims de autorização (id, tipo_usuario, is_admin, iat, exp),
+    assinado com a chave ativa do keyring e identificado pelo header `kid`.
     """
-    if not current_app.config.get('SECRET_KEY'):
-        raise RuntimeError("SECRET_KEY não configurada")
-
+    now = datetime.now(timezone.utc)
     payload = {
         'id': user.id,
-        'is_admin': UserRepo.is_user_admin(user.id),
-        # Poderia incluir 'exp' para expiração do token
+        'tipo_usuario': user.tipo_usuario,
+        'is_admin': user.tipo_usuario == 'admin',
+        'iat': now,
+        'exp': now + timedelta(seconds=current_app.config['TOKEN_TTL']),
     }
-    token = jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+    token = jwt.encode(payload, keyring.signing_key(), algorithm='HS256', headers={'kid': keyring.active_kid})
     return token
 
 def decode_token(token):
     """
     Decodifica o token JWT, retornando o payload se válido, ou None se inválido.
+    A chave de verificação é escolhida pelo `kid` do header.
     """
     try:
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        key = keyring.verification_key(jwt.get_unverified_header(token).get('kid'))
+        if not key:
+            return None
+
+        payload = jwt.decode(
+            token,
+            key,
+            algorithms=['HS256'],
+            options={'require': ['id', 'tipo_usuario', 'is_admin', 'iat', 'exp']}
+        )
         return payload
     except jwt.ExpiredSignatureError:
         # Token expirado
@@ -49,12 +63,42 @@ def token_required(f):
         if not payload:
             return jsonify({'error': 'Token is invalid or expired'}), 401
 
-        user : User = UserRepo.get_user_by_id(payload['id'])
-        if not user:
-            return jsonify({'error': 'User not found'}), 401
+        # Consulta o banco apenas quando o principal não está em cache
+        principal = principal_cache.get(payload['id'], token, endpoint=request.endpoint)
+        if not principal:
+            user : User = UserRepo.get_user_by_id(payload['id'])
+            if not user:
+                return jsonify({'error': 'User not found'}), 401
+
+            principal = Principal.from_user(user)
+            principal_cache.put(user.id, token, principal)
 
-        request.user = user
+        request.user = principal
         request.user_payload = payload
 
         return f(*args, **kwargs)
-    return decorated
\ No newline at end of file
+    return decorated
+
+# ================= CLAIMS-BASED AUTHORIZATION ===================
+# As verificações abaixo leem apenas as claims do token já decodificado
+# por `token_required`, então nunca custam uma consulta ao banco.
+
+def current_claims() -> dict:
+    return getattr(request, 'user_payload', None) or {}
+
+def is_admin() -> bool:
+    return bool(current_claims().get('is_admin', False))
+
+def has_role(*roles: str) -> bool:
+    """
+    Retorna True se o usuário autenticado for admin ou tiver um dos tipos informados.
+    """
+    claims = current_claims()
+    return bool(claims.get('is_admin')) or claims.get('tipo_usuario') in roles
+
+def is_owner_or_admin(owner_id: int) -> bool:
+    """
+    Retorna True se o usuário autenticado for o dono do recurso ou admin.
+    """
+    claims = current_claims()
+    return claims.get('id') == owner_id or bool(claims.get('is_admin'))
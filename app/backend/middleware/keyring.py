@@ -0,0 +1,71 @@
+import json
+from secrets import token_hex
+from typing import Optional, Dict
+
+class KeyRing:
+    """
+    Conjunto de chaves HMAC usadas nos tokens JWT, indexado pelo `kid`.
+
+    Apenas a chave ativa assina novos tokens; todas as chaves carregadas
+    continuam válidas para verificação, o que permite rotacionar a chave
+    sem invalidar os tokens já emitidos.
+    """
+    DEFAULT_KID = 'default'
+
+    def __init__(self):
+        self._keys : Dict[str, str] = {}
+        self.active_kid : Optional[str] = None
+        self.ephemeral = False
+
+    def load(self, config) -> None:
+        """
+        Carrega as chaves a partir da configuração, na seguinte ordem de prioridade:
+        JWT_KEY_FILE (arquivo JSON), JWT_KEYS ("kid:segredo,kid:segredo") e SECRET_KEY.
+        """
+        keys : Dict[str, str] = {}
+        active_kid = config.get('JWT_ACTIVE_KID')
+
+        key_file = config.get('JWT_KEY_FILE')
+        if key_file:
+            with open(key_file, encoding='utf-8') as f:
+                content = json.load(f)
+            keys.update(content['keys'])
+            active_kid = active_kid or content.get('active_kid')
+
+        elif config.get('JWT_KEYS'):
+            for item in config['JWT_KEYS'].split(','):
+                kid, _, secret = item.strip().partition(':')
+                if not kid or not secret:
+                    raise RuntimeError("JWT_KEYS deve seguir o formato 'kid:segredo,kid:segredo'")
+                keys[kid] = secret
+            # Sem JWT_ACTIVE_KID, a última chave listada é a de assinatura
+            active_kid = active_kid or list(keys)[-1]
+
+        # Sem chaves explícitas, usa SECRET_KEY; se ela foi gerada aleatoriamente,
+        # os tokens só valem no processo que os emitiu
+        self.ephemeral = not keys and bool(config.get('SECRET_KEY_EPHEMERAL'))
+        if not keys:
+            keys[self.DEFAULT_KID] = config.get('SECRET_KEY') or token_hex(32)
+            active_kid = self.DEFAULT_KID
+
+        if active_kid not in keys:
+            raise RuntimeError(f"JWT_ACTIVE_KID '{active_kid}' não está entre as chaves carregadas")
+
+        self._keys = keys
+        self.active_kid = active_kid
+
+    def signing_key(self) -> str:
+        if not self.active_kid:
+            raise RuntimeError("Nenhuma chave de assinatura JWT configurada")
+        return self._keys[self.active_kid]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[str]:
+        if not isinstance(kid, str):
+            return None
+        return self._keys.get(kid)
+
+    def kids(self):
+        return list(self._keys)
+
+
+keyring = KeyRing()
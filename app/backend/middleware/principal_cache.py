@@ -0,0 +1,136 @@
+import time
+from threading import Lock
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Set, Tuple
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Snapshot imutável do usuário autenticado, usado como `request.user`.
+    Não é uma instância ORM, então pode ser compartilhado entre requisições.
+    """
+    id: int
+    nome_completo: str
+    email: str
+    cidade: str
+    bairro: str
+    tipo_usuario: str
+    conta_ativa: bool
+
+    @staticmethod
+    def from_user(user) -> 'Principal':
+        return Principal(
+            id=user.id,
+            nome_completo=user.nome_completo,
+            email=user.email,
+            cidade=user.cidade,
+            bairro=user.bairro,
+            tipo_usuario=user.tipo_usuario,
+            conta_ativa=user.conta_ativa
+        )
+
+
+class PrincipalCache:
+    """
+    Cache LRU com TTL de principals autenticados, indexado por (id do usuário, token).
+    Evita a consulta ao banco em cada rota protegida. Cada processo tem o seu:
+    `invalidate_user` não alcança os outros workers, onde a entrada só some
+    quando o TTL vence.
+    """
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries : "OrderedDict[Tuple[int, str], Tuple[float, Principal]]" = OrderedDict()
+        self._keys_by_user : Dict[int, Set[Tuple[int, str]]] = {}
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._by_endpoint : Dict[str, Dict[str, int]] = {}
+
+    def configure(self, max_size: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            while len(self._entries) > self.max_size:
+                self._evict_oldest()
+
+    def get(self, user_id: int, token: str, endpoint: Optional[str] = None) -> Optional[Principal]:
+        key = (user_id, token)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._count('hits', endpoint)
+                return entry[1]
+
+            if entry:
+                self._remove(key)
+            self._count('misses', endpoint)
+            return None
+
+    def put(self, user_id: int, token: str, principal: Principal) -> None:
+        key = (user_id, token)
+        expires_at = time.monotonic() + self.ttl
+
+        with self._lock:
+            self._entries[key] = (expires_at, principal)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                self._evict_oldest()
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': (self._hits / total) if total else 0.0,
+                'endpoints': {name: dict(counts) for name, counts in self._by_endpoint.items()}
+            }
+
+    # Métodos internos: devem ser chamados com o lock adquirido
+
+    def _count(self, kind: str, endpoint: Optional[str]) -> None:
+        if kind == 'hits':
+            self._hits += 1
+        else:
+            self._misses += 1
+
+        if endpoint:
+            counts = self._by_endpoint.setdefault(endpoint, {'hits': 0, 'misses': 0})
+            counts[kind] += 1
+
+    def _remove(self, key: Tuple[int, str]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def _evict_oldest(self) -> None:
+        oldest_key = next(iter(self._entries))
+        self._remove(oldest_key)
+
+
+principal_cache = PrincipalCache()
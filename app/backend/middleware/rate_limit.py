@@ -0,0 +1,172 @@
+import time
+import sqlite3
+from array import array
+from threading import Lock
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# ================= BACKENDS ===================
+# Um backend guarda, para cada chave, contadores por "slot" (fatia de tempo de
+# largura fixa). A janela deslizante é a soma dos últimos `buckets` slots.
+
+class _Ring:
+    __slots__ = ('slots', 'counts')
+
+    def __init__(self, buckets: int):
+        self.slots = array('q', [-1] * buckets)
+        self.counts = array('I', [0] * buckets)
+
+
+class MemoryBackend:
+    """
+    Contadores em memória do processo: um ring buffer de `buckets` posições por
+    chave, com no máximo `max_keys` chaves (as menos recentes são descartadas).
+    """
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._rings : "OrderedDict[str, _Ring]" = OrderedDict()
+        self._lock = Lock()
+
+    def hit(self, key: str, slot: int, buckets: int) -> None:
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = _Ring(buckets)
+                if len(self._rings) > self.max_keys:
+                    self._rings.popitem(last=False)
+            else:
+                self._rings.move_to_end(key)
+
+            i = slot % buckets
+            if ring.slots[i] != slot:
+                ring.slots[i] = slot
+                ring.counts[i] = 0
+            ring.counts[i] += 1
+
+    def window(self, key: str, slot: int, buckets: int) -> Tuple[int, Optional[int]]:
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                return 0, None
+
+            total, oldest = 0, None
+            for s, c in zip(ring.slots, ring.counts):
+                if slot - buckets < s <= slot:
+                    total += c
+                    oldest = s if oldest is None else min(oldest, s)
+            return total, oldest
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._rings.pop(key, None)
+
+
+class SqliteBackend:
+    """
+    Contadores num arquivo SQLite local, compartilhados entre os workers do mesmo nó.
+    Slots expirados são removidos periodicamente, então o arquivo não cresce sem limite.
+    """
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS login_throttle ('
+            'chave TEXT NOT NULL, slot INTEGER NOT NULL, total INTEGER NOT NULL, '
+            'PRIMARY KEY (chave, slot)) WITHOUT ROWID'
+        )
+        self._lock = Lock()
+        self._writes = 0
+
+    def hit(self, key: str, slot: int, buckets: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO login_throttle (chave, slot, total) VALUES (?, ?, 1) '
+                'ON CONFLICT (chave, slot) DO UPDATE SET total = total + 1',
+                (key, slot)
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._conn.execute('DELETE FROM login_throttle WHERE slot <= ?', (slot - buckets,))
+
+    def window(self, key: str, slot: int, buckets: int) -> Tuple[int, Optional[int]]:
+        with self._lock:
+            total, oldest = self._conn.execute(
+                'SELECT COALESCE(SUM(total), 0), MIN(slot) FROM login_throttle '
+                'WHERE chave = ? AND slot > ? AND slot <= ?',
+                (key, slot - buckets, slot)
+            ).fetchone()
+            return total, oldest
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM login_throttle WHERE chave = ?', (key,))
+
+
+# ================= THROTTLE ===================
+
+class LoginThrottle:
+    """
+    Limita tentativas de login falhas por email e por IP numa janela deslizante
+    de `window` segundos, dividida em `buckets` fatias. Com `max_por_ip` 0 só
+    o email é limitado. O IP é o de request.remote_addr: atrás de um proxy
+    reverso, só é o do cliente com o ProxyFix configurado (PROXY_FIX_X_FOR).
+    """
+    def __init__(self, backend=None, window: int = 300, buckets: int = 10, max_por_email: int = 5, max_por_ip: int = 50):
+        self.configure(backend or MemoryBackend(), window, buckets, max_por_email, max_por_ip)
+
+    def configure(self, backend, window: int, buckets: int, max_por_email: int, max_por_ip: int) -> None:
+        self.backend = backend
+        self.window = window
+        self.buckets = buckets
+        self.bucket_width = window / buckets
+        self.max_por_email = max_por_email
+        self.max_por_ip = max_por_ip
+
+    def retry_after(self, email: str, ip: Optional[str]) -> Optional[int]:
+        """
+        Retorna em quantos segundos uma nova tentativa será aceita, ou None se
+        email e IP ainda estão dentro do limite.
+        """
+        now = time.time()
+        slot = int(now // self.bucket_width)
+        wait = None
+
+        for key, limit in self._keys(email, ip):
+            total, oldest = self.backend.window(key, slot, self.buckets)
+            if total >= limit:
+                # Libera quando a fatia mais antiga da janela expirar
+                expires_in = (oldest + self.buckets) * self.bucket_width - now
+                wait = max(wait or 0, int(expires_in) + 1)
+
+        return wait
+
+    def register_failure(self, email: str, ip: Optional[str]) -> None:
+        slot = int(time.time() // self.bucket_width)
+        for key, _ in self._keys(email, ip):
+            self.backend.hit(key, slot, self.buckets)
+
+    def register_success(self, email: str) -> None:
+        self.backend.clear(self._email_key(email))
+
+    def _email_key(self, email: str) -> str:
+        return 'email:' + email.strip().lower()
+
+    def _keys(self, email: str, ip: Optional[str]):
+        yield self._email_key(email), self.max_por_email
+        if ip and self.max_por_ip:
+            yield 'ip:' + ip, self.max_por_ip
+
+
+def create_backend(store: Optional[str], max_keys: int):
+    """
+    Sem `store`, os contadores ficam na memória do processo; com um caminho de
+    arquivo, ficam num SQLite compartilhado pelos workers do nó.
+    """
+    if store:
+        return SqliteBackend(store)
+    return MemoryBackend(max_keys=max_keys)
+
+
+login_throttle = LoginThrottle()
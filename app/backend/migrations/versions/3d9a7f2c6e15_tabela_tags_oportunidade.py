@@ -0,0 +1,47 @@
+"""tabelas tag e oportunidade_tag
+
+Revision ID: 3d9a7f2c6e15
+Revises: 8c3f4e6a1b27
+Create Date: 2026-10-18 12:20:41.507923
+
+Depois de aplicar, preencha os vínculos das oportunidades existentes com
+`flask backfill-tags`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9a7f2c6e15'
+down_revision = '8c3f4e6a1b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tag',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('nome')
+    )
+    op.create_table('oportunidade_tag',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_oportunidade', sa.Integer(), nullable=False),
+    sa.Column('id_tag', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_oportunidade'], ['oportunidade.id'], ),
+    sa.ForeignKeyConstraint(['id_tag'], ['tag.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_oportunidade', 'id_tag', name='uq_oportunidade_tag')
+    )
+    with op.batch_alter_table('oportunidade_tag', schema=None) as batch_op:
+        batch_op.create_index('ix_oportunidade_tag_tag_oportunidade', ['id_tag', 'id_oportunidade'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('oportunidade_tag', schema=None) as batch_op:
+        batch_op.drop_index('ix_oportunidade_tag_tag_oportunidade')
+
+    op.drop_table('oportunidade_tag')
+    op.drop_table('tag')
@@ -0,0 +1,26 @@
+"""indice para paginacao de oportunidades
+
+Revision ID: 5b7e1c9d2a40
+Revises: 22db028ccc89
+Create Date: 2026-10-18 10:12:31.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e1c9d2a40'
+down_revision = '22db028ccc89'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('oportunidade', schema=None) as batch_op:
+        batch_op.create_index('ix_oportunidade_data_hora_id', ['data_hora', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('oportunidade', schema=None) as batch_op:
+        batch_op.drop_index('ix_oportunidade_data_hora_id')
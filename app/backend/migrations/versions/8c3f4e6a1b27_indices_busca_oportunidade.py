@@ -0,0 +1,28 @@
+"""indices compostos para a busca de oportunidades
+
+Revision ID: 8c3f4e6a1b27
+Revises: 5b7e1c9d2a40
+Create Date: 2026-10-18 11:03:54.918342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3f4e6a1b27'
+down_revision = '5b7e1c9d2a40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('oportunidade', schema=None) as batch_op:
+        batch_op.create_index('ix_oportunidade_status_data_hora', ['status', 'data_hora'], unique=False)
+        batch_op.create_index('ix_oportunidade_comunidade_data_hora', ['comunidade', 'data_hora'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('oportunidade', schema=None) as batch_op:
+        batch_op.drop_index('ix_oportunidade_comunidade_data_hora')
+        batch_op.drop_index('ix_oportunidade_status_data_hora')
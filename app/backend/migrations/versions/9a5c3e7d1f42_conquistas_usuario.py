@@ -0,0 +1,43 @@
+"""conquistas do usuário e novos contadores em horas_usuario
+
+Revision ID: 9a5c3e7d1f42
+Revises: f2b8d4c6a913
+Create Date: 2026-10-18 16:21:09.402117
+
+Depois de aplicar, rode `flask reconciliar-horas` (preenche os novos
+contadores) e `flask backfill-conquistas`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a5c3e7d1f42'
+down_revision = 'f2b8d4c6a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('horas_usuario', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_oportunidades', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('total_organizacoes', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_table('conquista_usuario',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('codigo', sa.String(length=50), nullable=False),
+    sa.Column('concedida_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_usuario', 'codigo', name='uq_conquista_usuario_codigo')
+    )
+
+
+def downgrade():
+    op.drop_table('conquista_usuario')
+
+    with op.batch_alter_table('horas_usuario', schema=None) as batch_op:
+        batch_op.drop_column('total_organizacoes')
+        batch_op.drop_column('total_oportunidades')
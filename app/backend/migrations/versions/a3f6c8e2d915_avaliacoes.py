@@ -0,0 +1,57 @@
+"""avaliações entre voluntários e organizações e agregado por alvo
+
+Revision ID: a3f6c8e2d915
+Revises: e7b3c5d9a142
+Create Date: 2026-10-18 20:12:44.108392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f6c8e2d915'
+down_revision = 'e7b3c5d9a142'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('avaliacao',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_inscricao', sa.Integer(), nullable=False),
+    sa.Column('id_autor', sa.Integer(), nullable=False),
+    sa.Column('tipo_alvo', sa.Enum('organizacao', 'usuario', name='alvoavaliacao'), nullable=False),
+    sa.Column('id_alvo', sa.Integer(), nullable=False),
+    sa.Column('nota', sa.SmallInteger(), nullable=False),
+    sa.Column('comentario', sa.String(length=1024), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_inscricao'], ['inscricao.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_autor'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_inscricao', 'tipo_alvo', name='uq_avaliacao_inscricao_alvo')
+    )
+    with op.batch_alter_table('avaliacao', schema=None) as batch_op:
+        batch_op.create_index('ix_avaliacao_alvo', ['tipo_alvo', 'id_alvo', 'id'], unique=False)
+
+    op.create_table('avaliacao_agregada',
+    sa.Column('tipo_alvo', sa.Enum('organizacao', 'usuario', name='alvoavaliacao'), nullable=False),
+    sa.Column('id_alvo', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('soma', sa.Integer(), nullable=False),
+    sa.Column('nota_1', sa.Integer(), nullable=False),
+    sa.Column('nota_2', sa.Integer(), nullable=False),
+    sa.Column('nota_3', sa.Integer(), nullable=False),
+    sa.Column('nota_4', sa.Integer(), nullable=False),
+    sa.Column('nota_5', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tipo_alvo', 'id_alvo')
+    )
+
+
+def downgrade():
+    op.drop_table('avaliacao_agregada')
+    with op.batch_alter_table('avaliacao', schema=None) as batch_op:
+        batch_op.drop_index('ix_avaliacao_alvo')
+
+    op.drop_table('avaliacao')
@@ -0,0 +1,39 @@
+"""tabela feed_usuario (feed ranqueado por usuario)
+
+Revision ID: a41c6d8e9f30
+Revises: 3d9a7f2c6e15
+Create Date: 2026-10-18 13:05:12.774019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c6d8e9f30'
+down_revision = '3d9a7f2c6e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feed_usuario',
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('cidade', sa.String(length=100), nullable=False),
+    sa.Column('bairro', sa.String(length=255), nullable=False),
+    sa.Column('oportunidade_ids', sa.Text(), nullable=False),
+    sa.Column('gerado_em', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_usuario')
+    )
+    with op.batch_alter_table('feed_usuario', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_feed_usuario_cidade'), ['cidade'], unique=False)
+        batch_op.create_index(batch_op.f('ix_feed_usuario_bairro'), ['bairro'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('feed_usuario', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_feed_usuario_bairro'))
+        batch_op.drop_index(batch_op.f('ix_feed_usuario_cidade'))
+
+    op.drop_table('feed_usuario')
@@ -0,0 +1,26 @@
+"""índice (id_inscricao, codigo_validacao_pin) em registro_presenca
+
+Revision ID: b6d2f8a4c317
+Revises: 9a5c3e7d1f42
+Create Date: 2026-10-18 17:05:37.226481
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2f8a4c317'
+down_revision = '9a5c3e7d1f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('registro_presenca', schema=None) as batch_op:
+        batch_op.create_index('ix_registro_presenca_inscricao_pin', ['id_inscricao', 'codigo_validacao_pin'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('registro_presenca', schema=None) as batch_op:
+        batch_op.drop_index('ix_registro_presenca_inscricao_pin')
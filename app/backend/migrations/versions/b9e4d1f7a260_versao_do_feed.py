@@ -0,0 +1,35 @@
+"""versões do feed (feed_versao) e versão de cada feed salvo
+
+Revision ID: b9e4d1f7a260
+Revises: a3f6c8e2d915
+Create Date: 2026-10-18 21:05:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e4d1f7a260'
+down_revision = 'a3f6c8e2d915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feed_versao',
+    sa.Column('comunidade', sa.String(length=255), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('comunidade')
+    )
+    # Feeds são cache: os salvos com cidade/bairro sem normalizar são recalculados
+    op.execute('DELETE FROM feed_usuario')
+    with op.batch_alter_table('feed_usuario', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('feed_usuario', schema=None) as batch_op:
+        batch_op.drop_column('versao')
+
+    op.drop_table('feed_versao')
@@ -0,0 +1,40 @@
+"""emails pendentes do despacho da outbox, um por destinatário
+
+Revision ID: c5e9a2d7f184
+Revises: b9e4d1f7a260
+Create Date: 2026-10-18 22:40:12.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e9a2d7f184'
+down_revision = 'b9e4d1f7a260'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('email_pendente',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('para', sa.String(length=120), nullable=False),
+    sa.Column('assunto', sa.String(length=255), nullable=False),
+    sa.Column('corpo', sa.Text(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('proxima_tentativa', sa.DateTime(), nullable=False),
+    sa.Column('processado_em', sa.DateTime(), nullable=True),
+    sa.Column('erro', sa.String(length=1024), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('email_pendente', schema=None) as batch_op:
+        batch_op.create_index('ix_email_pendente_fila', ['processado_em', 'proxima_tentativa'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('email_pendente', schema=None) as batch_op:
+        batch_op.drop_index('ix_email_pendente_fila')
+
+    op.drop_table('email_pendente')
@@ -0,0 +1,44 @@
+"""vagas_restantes em oportunidade e inscricao unica por usuario
+
+Revision ID: c7e2b5a1d804
+Revises: a41c6d8e9f30
+Create Date: 2026-10-18 13:48:27.160385
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2b5a1d804'
+down_revision = 'a41c6d8e9f30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('oportunidade', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('vagas_restantes', sa.Integer(), nullable=False, server_default='0'))
+
+    # Vagas livres = total - inscrições que ocupam vaga (pendentes e aprovadas)
+    op.execute(
+        "UPDATE oportunidade SET vagas_restantes = num_vagas - ("
+        "SELECT COUNT(*) FROM inscricao WHERE inscricao.id_oportunidade = oportunidade.id "
+        "AND inscricao.status_inscricao IN ('pendente', 'aprovada'))"
+    )
+
+    # Mantém só a primeira inscrição de cada (usuário, oportunidade) antes da constraint única
+    op.execute(
+        "DELETE FROM inscricao WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MIN(id) AS id FROM inscricao GROUP BY id_usuario, id_oportunidade) AS primeiras)"
+    )
+    with op.batch_alter_table('inscricao', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_inscricao_usuario_oportunidade', ['id_usuario', 'id_oportunidade'])
+
+
+def downgrade():
+    with op.batch_alter_table('inscricao', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_inscricao_usuario_oportunidade', type_='unique')
+
+    with op.batch_alter_table('oportunidade', schema=None) as batch_op:
+        batch_op.drop_column('vagas_restantes')
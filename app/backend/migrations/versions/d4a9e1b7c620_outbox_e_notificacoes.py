@@ -0,0 +1,54 @@
+"""outbox de eventos e notificações in-app
+
+Revision ID: d4a9e1b7c620
+Revises: b6d2f8a4c317
+Create Date: 2026-10-18 18:12:50.907314
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9e1b7c620'
+down_revision = 'b6d2f8a4c317'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_evento',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('id_referencia', sa.Integer(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('proxima_tentativa', sa.DateTime(), nullable=False),
+    sa.Column('processado_em', sa.DateTime(), nullable=True),
+    sa.Column('erro', sa.String(length=1024), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('outbox_evento', schema=None) as batch_op:
+        batch_op.create_index('ix_outbox_evento_fila', ['processado_em', 'proxima_tentativa'], unique=False)
+
+    op.create_table('notificacao',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('id_referencia', sa.Integer(), nullable=False),
+    sa.Column('mensagem', sa.String(length=512), nullable=False),
+    sa.Column('lida', sa.Boolean(), nullable=False),
+    sa.Column('criada_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_usuario', 'tipo', 'id_referencia', name='uq_notificacao_usuario_tipo_ref')
+    )
+
+
+def downgrade():
+    op.drop_table('notificacao')
+
+    with op.batch_alter_table('outbox_evento', schema=None) as batch_op:
+        batch_op.drop_index('ix_outbox_evento_fila')
+
+    op.drop_table('outbox_evento')
@@ -0,0 +1,41 @@
+"""tabela lista_espera
+
+Revision ID: e18f3a9c2b56
+Revises: c7e2b5a1d804
+Create Date: 2026-10-18 14:22:09.331870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e18f3a9c2b56'
+down_revision = 'c7e2b5a1d804'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('lista_espera',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('id_oportunidade', sa.Integer(), nullable=False),
+    sa.Column('posicao', sa.Integer(), nullable=False),
+    sa.Column('prioridade', sa.Integer(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_oportunidade'], ['oportunidade.id'], ),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_usuario', 'id_oportunidade', name='uq_lista_espera_usuario_oportunidade'),
+    sa.UniqueConstraint('id_oportunidade', 'posicao', name='uq_lista_espera_oportunidade_posicao')
+    )
+    with op.batch_alter_table('lista_espera', schema=None) as batch_op:
+        batch_op.create_index('ix_lista_espera_fila', ['id_oportunidade', sa.text('prioridade DESC'), 'posicao'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('lista_espera', schema=None) as batch_op:
+        batch_op.drop_index('ix_lista_espera_fila')
+
+    op.drop_table('lista_espera')
@@ -0,0 +1,71 @@
+"""feed da comunidade: publicações, comentários e curtidas
+
+Revision ID: e7b3c5d9a142
+Revises: d4a9e1b7c620
+Create Date: 2026-10-18 19:31:06.551874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c5d9a142'
+down_revision = 'd4a9e1b7c620'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('publicacao',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('comunidade', sa.String(length=255), nullable=False),
+    sa.Column('cidade', sa.String(length=100), nullable=False),
+    sa.Column('conteudo', sa.String(length=2048), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('num_curtidas', sa.Integer(), nullable=False),
+    sa.Column('num_comentarios', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('publicacao', schema=None) as batch_op:
+        batch_op.create_index('ix_publicacao_comunidade_id', ['comunidade', 'id'], unique=False)
+        batch_op.create_index('ix_publicacao_cidade_id', ['cidade', 'id'], unique=False)
+
+    op.create_table('comentario',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_publicacao', sa.Integer(), nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('conteudo', sa.String(length=1024), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_publicacao'], ['publicacao.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('comentario', schema=None) as batch_op:
+        batch_op.create_index('ix_comentario_publicacao_id', ['id_publicacao', 'id'], unique=False)
+
+    op.create_table('curtida',
+    sa.Column('id_publicacao', sa.Integer(), nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_publicacao'], ['publicacao.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_publicacao', 'id_usuario')
+    )
+
+
+def downgrade():
+    op.drop_table('curtida')
+
+    with op.batch_alter_table('comentario', schema=None) as batch_op:
+        batch_op.drop_index('ix_comentario_publicacao_id')
+
+    op.drop_table('comentario')
+
+    with op.batch_alter_table('publicacao', schema=None) as batch_op:
+        batch_op.drop_index('ix_publicacao_cidade_id')
+        batch_op.drop_index('ix_publicacao_comunidade_id')
+
+    op.drop_table('publicacao')
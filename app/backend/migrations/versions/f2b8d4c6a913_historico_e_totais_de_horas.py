@@ -0,0 +1,48 @@
+"""tabelas historico_servico e horas_usuario
+
+Revision ID: f2b8d4c6a913
+Revises: e18f3a9c2b56
+Create Date: 2026-10-18 15:02:44.618251
+
+O model HistoricoServico existia sem tabela nas migrações; ela é criada aqui
+junto com os totais por usuário. Em bancos que já tinham historico_servico,
+rode `flask reconciliar-horas` depois de aplicar.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d4c6a913'
+down_revision = 'e18f3a9c2b56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('historico_servico'):
+        op.create_table('historico_servico',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('id_inscricao', sa.Integer(), nullable=False),
+        sa.Column('horas_confirmadas', sa.Float(), nullable=False),
+        sa.Column('data_validacao', sa.DateTime(), nullable=True),
+        sa.Column('certificado_url', sa.String(length=1024), nullable=True),
+        sa.ForeignKeyConstraint(['id_inscricao'], ['inscricao.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    op.create_table('horas_usuario',
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('total_horas', sa.Float(), nullable=False),
+    sa.Column('total_servicos', sa.Integer(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_usuario')
+    )
+
+
+def downgrade():
+    op.drop_table('horas_usuario')
+    op.drop_table('historico_servico')
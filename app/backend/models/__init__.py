@@ -1,6 +1,14 @@
 from .usuario import Usuario
 from .habilidade import Habilidade, OportunidadeHabilidade, VoluntarioHabilidade
 from .inscricao import Inscricao
+from .lista_espera import ListaEspera
+from .historico import HistoricoServico, HorasUsuario
+from .conquista import ConquistaUsuario
 from .oportunidade import Oportunidade
 from .organizacao import Organizacao
+from .tag import Tag, OportunidadeTag
+from .feed import FeedUsuario, FeedVersao
+from .notificacao import OutboxEvento, EmailPendente, Notificacao
+from .comunidade import Publicacao, Comentario, Curtida
+from .avaliacao import Avaliacao, AvaliacaoAgregada
 #from .enums import StatusInscricao, StatusOrganizacao, StatusOportunidades
\ No newline at end of file
@@ -0,0 +1,106 @@
+from extensions import db
+from .enums import AlvoAvaliacao
+
+NOTAS = range(1, 6)
+# Chaves do histograma na API
+CHAVES_NOTAS = tuple(str(nota) for nota in NOTAS)
+
+class Avaliacao(db.Model):
+    """
+    Avaliação mútua (RF018) feita a partir de uma inscrição: o voluntário
+    avalia a organização e a organização avalia o voluntário, uma vez cada.
+    """
+    __tablename__ = 'avaliacao'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_inscricao = db.Column(db.Integer, db.ForeignKey('inscricao.id', ondelete='CASCADE'), nullable=False)
+    id_autor = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), nullable=False)
+    tipo_alvo = db.Column(db.Enum(AlvoAvaliacao), nullable=False)
+    id_alvo = db.Column(db.Integer, nullable=False)
+    nota = db.Column(db.SmallInteger, nullable=False)
+    comentario = db.Column(db.String(1024), nullable=True)
+    criado_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+    atualizado_em = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('id_inscricao', 'tipo_alvo', name='uq_avaliacao_inscricao_alvo'),
+        # Listagem das avaliações de um alvo
+        db.Index('ix_avaliacao_alvo', 'tipo_alvo', 'id_alvo', 'id'),
+    )
+
+    def __init__(self, id_inscricao, id_autor, tipo_alvo, id_alvo, nota, comentario=None):
+        self.id_inscricao = id_inscricao
+        self.id_autor = id_autor
+        self.tipo_alvo = tipo_alvo
+        self.id_alvo = id_alvo
+        self.nota = nota
+        self.comentario = comentario
+
+    def __repr__(self):
+        return f'<Avaliacao {self.tipo_alvo} {self.id_alvo} - nota {self.nota}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'id_inscricao': self.id_inscricao,
+            'id_autor': self.id_autor,
+            'tipo_alvo': self.tipo_alvo,
+            'id_alvo': self.id_alvo,
+            'nota': self.nota,
+            'comentario': self.comentario,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
+        }
+
+
+class AvaliacaoAgregada(db.Model):
+    """
+    Agregado das avaliações de um alvo (quantidade, soma e histograma das
+    notas 1–5), mantido por UPDATEs atômicos a cada avaliação criada,
+    alterada ou removida (AvaliacaoRepo). A média sai daqui sem AVG().
+    """
+    __tablename__ = 'avaliacao_agregada'
+
+    tipo_alvo = db.Column(db.Enum(AlvoAvaliacao), primary_key=True)
+    id_alvo = db.Column(db.Integer, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    soma = db.Column(db.Integer, nullable=False, default=0)
+    nota_1 = db.Column(db.Integer, nullable=False, default=0)
+    nota_2 = db.Column(db.Integer, nullable=False, default=0)
+    nota_3 = db.Column(db.Integer, nullable=False, default=0)
+    nota_4 = db.Column(db.Integer, nullable=False, default=0)
+    nota_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, tipo_alvo, id_alvo, total=0, soma=0, **notas):
+        self.tipo_alvo = tipo_alvo
+        self.id_alvo = id_alvo
+        self.total = total
+        self.soma = soma
+        for nota in NOTAS:
+            setattr(self, f'nota_{nota}', notas.get(f'nota_{nota}', 0))
+
+    def __repr__(self):
+        return f'<AvaliacaoAgregada {self.tipo_alvo} {self.id_alvo} - {self.total}>'
+
+    def to_dict(self):
+        return resumo_avaliacao(self.total, self.soma, [getattr(self, f'nota_{nota}') for nota in NOTAS])
+
+
+def resumo_avaliacao(total=0, soma=0, histograma=(0, 0, 0, 0, 0)):
+    # Formato devolvido pela API, também para alvos ainda sem avaliações
+    return {
+        'total': total,
+        'media': round(soma / total, 2) if total else None,
+        'histograma': dict(zip(CHAVES_NOTAS, histograma))
+    }
+
+
+def colunas_resumo():
+    # Colunas do agregado lidas pelas listagens projetadas, na ordem de resumo_da_linha
+    return [AvaliacaoAgregada.total, AvaliacaoAgregada.soma] + [getattr(AvaliacaoAgregada, f'nota_{nota}') for nota in NOTAS]
+
+
+def resumo_da_linha(valores) -> dict:
+    # Valores de colunas_resumo(); todos None quando o alvo não tem agregado (LEFT JOIN)
+    total, soma, *histograma = valores
+    return resumo_avaliacao(total, soma, histograma) if total is not None else resumo_avaliacao()
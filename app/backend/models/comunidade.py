@@ -0,0 +1,94 @@
+from extensions import db
+
+class Publicacao(db.Model):
+    """
+    Publicação do feed local (RF017). Os índices (comunidade, id) e (cidade, id)
+    são as timelines persistidas: recarregar uma timeline é uma leitura de
+    intervalo em um deles. num_curtidas e num_comentarios são contadores
+    desnormalizados, atualizados por UPDATE atômico.
+    """
+    __tablename__ = 'publicacao'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), nullable=False)
+    comunidade = db.Column(db.String(255), nullable=False)
+    cidade = db.Column(db.String(100), nullable=False)
+    conteudo = db.Column(db.String(2048), nullable=False)
+    criado_em = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    num_curtidas = db.Column(db.Integer, nullable=False, default=0)
+    num_comentarios = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_publicacao_comunidade_id', 'comunidade', 'id'),
+        db.Index('ix_publicacao_cidade_id', 'cidade', 'id'),
+    )
+
+    def __init__(self, id_usuario, comunidade, cidade, conteudo, criado_em=None):
+        self.id_usuario = id_usuario
+        self.comunidade = comunidade
+        self.cidade = cidade
+        self.conteudo = conteudo
+        self.criado_em = criado_em
+        self.num_curtidas = 0
+        self.num_comentarios = 0
+
+    def __repr__(self):
+        return f'<Publicacao {self.id} - {self.comunidade}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'id_usuario': self.id_usuario,
+            'comunidade': self.comunidade,
+            'cidade': self.cidade,
+            'conteudo': self.conteudo,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'num_curtidas': self.num_curtidas,
+            'num_comentarios': self.num_comentarios
+        }
+
+
+class Comentario(db.Model):
+    __tablename__ = 'comentario'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_publicacao = db.Column(db.Integer, db.ForeignKey('publicacao.id', ondelete='CASCADE'), nullable=False)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), nullable=False)
+    conteudo = db.Column(db.String(1024), nullable=False)
+    criado_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.Index('ix_comentario_publicacao_id', 'id_publicacao', 'id'),
+    )
+
+    def __init__(self, id_publicacao, id_usuario, conteudo):
+        self.id_publicacao = id_publicacao
+        self.id_usuario = id_usuario
+        self.conteudo = conteudo
+
+    def __repr__(self):
+        return f'<Comentario {self.id} - Publicacao {self.id_publicacao}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'id_publicacao': self.id_publicacao,
+            'id_usuario': self.id_usuario,
+            'conteudo': self.conteudo,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None
+        }
+
+
+class Curtida(db.Model):
+    __tablename__ = 'curtida'
+
+    id_publicacao = db.Column(db.Integer, db.ForeignKey('publicacao.id', ondelete='CASCADE'), primary_key=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), primary_key=True)
+    criado_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    def __init__(self, id_publicacao, id_usuario):
+        self.id_publicacao = id_publicacao
+        self.id_usuario = id_usuario
+
+    def __repr__(self):
+        return f'<Curtida usuario_id={self.id_usuario} - Publicacao {self.id_publicacao}>'
@@ -0,0 +1,32 @@
+from extensions import db
+
+class ConquistaUsuario(db.Model):
+    """
+    Conquista (RF016) concedida a um usuário. `codigo` identifica a regra em
+    services/conquistas.py; a constraint única torna a concessão idempotente.
+    """
+    __tablename__ = 'conquista_usuario'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), nullable=False)
+    codigo = db.Column(db.String(50), nullable=False)
+    concedida_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.UniqueConstraint('id_usuario', 'codigo', name='uq_conquista_usuario_codigo'),
+    )
+
+    def __init__(self, id_usuario, codigo):
+        self.id_usuario = id_usuario
+        self.codigo = codigo
+
+    def __repr__(self):
+        return f'<ConquistaUsuario usuario_id={self.id_usuario} - {self.codigo}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'id_usuario': self.id_usuario,
+            'codigo': self.codigo,
+            'concedida_em': self.concedida_em.isoformat() if self.concedida_em else None
+        }
@@ -15,3 +15,6 @@ class StatusInscricao(enum.Enum):
     recusada = 'RECUSADA'
 
 
+class AlvoAvaliacao(enum.Enum):
+    organizacao = 'ORGANIZACAO'
+    usuario = 'USUARIO'
@@ -0,0 +1,50 @@
+from extensions import db
+
+class FeedUsuario(db.Model):
+    """
+    Feed ranqueado de um usuário: ids das oportunidades em ordem de score.
+    Guarda cidade e bairro do usuário (normalizados com fold) para invalidar
+    por área sem join, e a versão da área na fotografia de onde o ranking saiu.
+    """
+    __tablename__ = 'feed_usuario'
+
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), primary_key=True)
+    cidade = db.Column(db.String(100), nullable=False, index=True)
+    bairro = db.Column(db.String(255), nullable=False, index=True)
+    oportunidade_ids = db.Column(db.Text, nullable=False)
+    gerado_em = db.Column(db.DateTime, nullable=False)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, id_usuario, cidade, bairro, oportunidade_ids, gerado_em, versao=0):
+        self.id_usuario = id_usuario
+        self.cidade = cidade
+        self.bairro = bairro
+        self.oportunidade_ids = oportunidade_ids
+        self.gerado_em = gerado_em
+        self.versao = versao
+
+    def __repr__(self):
+        return f'<FeedUsuario usuario_id={self.id_usuario}>'
+
+    def get_ids(self):
+        return [int(id) for id in self.oportunidade_ids.split(',') if id]
+
+
+class FeedVersao(db.Model):
+    """
+    Versões das oportunidades que entram nos feeds, compartilhadas entre os
+    processos: um contador por comunidade (normalizada com fold), incrementado
+    a cada mudança que afeta as candidatas dela. Um feed salvo com versão menor
+    que a da sua área está desatualizado.
+    """
+    __tablename__ = 'feed_versao'
+
+    comunidade = db.Column(db.String(255), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, comunidade, versao=0):
+        self.comunidade = comunidade
+        self.versao = versao
+
+    def __repr__(self):
+        return f'<FeedVersao {self.comunidade!r} v{self.versao}>'
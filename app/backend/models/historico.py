@@ -30,3 +30,39 @@ class HistoricoServico(db.Model):
         for field in ['id_inscricao', 'horas_confirmadas', 'certificado_url']:
             if field in data:
                 setattr(self, field, data[field])
+
+
+class HorasUsuario(db.Model):
+    """
+    Totais de serviço confirmados por usuário (RF008), mantidos pelo HistoricoRepo
+    na mesma transação de cada alteração em historico_servico. Também são os
+    contadores avaliados pelas regras de conquistas (RF016).
+    """
+    __tablename__ = 'horas_usuario'
+
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), primary_key=True)
+    total_horas = db.Column(db.Float, nullable=False, default=0)
+    total_servicos = db.Column(db.Integer, nullable=False, default=0)
+    # Inscrições (oportunidades) e organizações distintas com serviço confirmado
+    total_oportunidades = db.Column(db.Integer, nullable=False, default=0)
+    total_organizacoes = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    def __init__(self, id_usuario, total_horas=0, total_servicos=0, total_oportunidades=0, total_organizacoes=0):
+        self.id_usuario = id_usuario
+        self.total_horas = total_horas
+        self.total_servicos = total_servicos
+        self.total_oportunidades = total_oportunidades
+        self.total_organizacoes = total_organizacoes
+
+    def __repr__(self):
+        return f'<HorasUsuario usuario_id={self.id_usuario} - Horas {self.total_horas}>'
+
+    def to_dict(self):
+        return {
+            'id_usuario': self.id_usuario,
+            'total_horas': self.total_horas,
+            'total_servicos': self.total_servicos,
+            'total_oportunidades': self.total_oportunidades,
+            'total_organizacoes': self.total_organizacoes
+        }
@@ -11,6 +11,10 @@ class Inscricao(db.Model):
     status_inscricao = db.Column(db.Enum(StatusInscricao), default=StatusInscricao.pendente, nullable=False)
     data_aprovacao_recusa = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        db.UniqueConstraint('id_usuario', 'id_oportunidade', name='uq_inscricao_usuario_oportunidade'),
+    )
+
     #RELACIONAMENTOS
     voluntario = db.relationship('Usuario', back_populates='inscricoes', lazy='select')
     oportunidade = db.relationship('Oportunidade', back_populates='inscricoes', lazy='select')
@@ -26,13 +30,18 @@ class Inscricao(db.Model):
         return f'<Inscricao Usuario {self.id_usuario} - Oportunidade {self.id_oportunidade}>'
     
     def to_dict(self):
+        return Inscricao.dict_from_row(self)
+
+    @staticmethod
+    def dict_from_row(row) -> dict:
+        # Sem registro_presenca: serve tanto ao objeto quanto às linhas projetadas das listagens
         return {
-            'id': self.id,
-            'id_usuario': self.id_usuario,
-            'id_oportunidade': self.id_oportunidade,
-            'data_inscricao': self.data_inscricao.isoformat() if self.data_inscricao else None,
-            'status_inscricao': self.status_inscricao if self.status_inscricao else StatusInscricao.pendente,
-            'data_aprovacao_recusa': self.data_aprovacao_recusa.isoformat() if self.data_aprovacao_recusa else None
+            'id': row.id,
+            'id_usuario': row.id_usuario,
+            'id_oportunidade': row.id_oportunidade,
+            'data_inscricao': row.data_inscricao.isoformat() if row.data_inscricao else None,
+            'status_inscricao': row.status_inscricao if row.status_inscricao else StatusInscricao.pendente,
+            'data_aprovacao_recusa': row.data_aprovacao_recusa.isoformat() if row.data_aprovacao_recusa else None
         }
 
     def update_from_dict(self, data):
@@ -47,9 +56,14 @@ class RegistroPresenca(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     id_inscricao = db.Column(db.Integer, db.ForeignKey('inscricao.id'), unique=True, nullable=False)
     codigo_validacao_pin = db.Column(db.String(100), nullable=False)
-    check_in_hora = db.Column(db.DateTime, default=db.func.current_timestamp())
+    check_in_hora = db.Column(db.DateTime, nullable=True)
     check_out_hora = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        # Validação do PIN no check-in quando a inscrição não está na tabela em memória
+        db.Index('ix_registro_presenca_inscricao_pin', 'id_inscricao', 'codigo_validacao_pin'),
+    )
+
     #RELACIONAMENTOS
     inscricao = db.relationship('Inscricao', back_populates='registro_presenca', lazy='joined')
 
@@ -0,0 +1,42 @@
+from extensions import db
+
+class ListaEspera(db.Model):
+    """
+    Fila de espera de uma oportunidade lotada. Sai primeiro quem tem maior
+    `prioridade`; dentro da mesma prioridade, a menor `posicao` (ordem de chegada).
+    """
+    __tablename__ = 'lista_espera'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    id_oportunidade = db.Column(db.Integer, db.ForeignKey('oportunidade.id'), nullable=False)
+    posicao = db.Column(db.Integer, nullable=False)
+    prioridade = db.Column(db.Integer, nullable=False, default=0)
+    criado_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.UniqueConstraint('id_usuario', 'id_oportunidade', name='uq_lista_espera_usuario_oportunidade'),
+        # Fim da fila (MAX(posicao)) em O(log n); único para barrar posições repetidas em entradas concorrentes
+        db.UniqueConstraint('id_oportunidade', 'posicao', name='uq_lista_espera_oportunidade_posicao'),
+        # Cabeça da fila em O(log n): primeira entrada do índice para a oportunidade
+        db.Index('ix_lista_espera_fila', 'id_oportunidade', db.text('prioridade DESC'), 'posicao'),
+    )
+
+    def __init__(self, id_usuario, id_oportunidade, posicao, prioridade=0):
+        self.id_usuario = id_usuario
+        self.id_oportunidade = id_oportunidade
+        self.posicao = posicao
+        self.prioridade = prioridade
+
+    def __repr__(self):
+        return f'<ListaEspera Usuario {self.id_usuario} - Oportunidade {self.id_oportunidade} #{self.posicao}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'id_usuario': self.id_usuario,
+            'id_oportunidade': self.id_oportunidade,
+            'posicao': self.posicao,
+            'prioridade': self.prioridade,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None
+        }
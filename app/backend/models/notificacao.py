@@ -0,0 +1,104 @@
+from extensions import db
+
+class OutboxEvento(db.Model):
+    """
+    Evento de domínio (RF019) gravado na mesma transação da mudança que o
+    gerou. O despachante (`flask despachar-notificacoes`) consome a fila em
+    lotes, fora das requisições; `proxima_tentativa` adia as retentativas.
+    """
+    __tablename__ = 'outbox_evento'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    id_referencia = db.Column(db.Integer, nullable=False)
+    criado_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    proxima_tentativa = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    processado_em = db.Column(db.DateTime, nullable=True)
+    erro = db.Column(db.String(1024), nullable=True)
+
+    __table_args__ = (
+        # Fila do despachante: pendentes em ordem de próxima tentativa
+        db.Index('ix_outbox_evento_fila', 'processado_em', 'proxima_tentativa'),
+    )
+
+    def __init__(self, tipo, id_referencia):
+        self.tipo = tipo
+        self.id_referencia = id_referencia
+
+    def __repr__(self):
+        return f'<OutboxEvento {self.tipo} {self.id_referencia}>'
+
+
+class EmailPendente(db.Model):
+    """
+    Email gerado pelo despacho de um evento da outbox, um por destinatário.
+    O envio acontece depois do commit do despacho, fora do lock dos eventos,
+    e cada email tem as próprias tentativas: uma falha não reenvia os outros.
+    Como na outbox, `processado_em` marca o fim (entregue, ou desistido com
+    o `erro` registrado).
+    """
+    __tablename__ = 'email_pendente'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    para = db.Column(db.String(120), nullable=False)
+    assunto = db.Column(db.String(255), nullable=False)
+    corpo = db.Column(db.Text, nullable=False)
+    criado_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    proxima_tentativa = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    processado_em = db.Column(db.DateTime, nullable=True)
+    erro = db.Column(db.String(1024), nullable=True)
+
+    __table_args__ = (
+        # Fila de envio: pendentes em ordem de próxima tentativa
+        db.Index('ix_email_pendente_fila', 'processado_em', 'proxima_tentativa'),
+    )
+
+    def __init__(self, para, assunto, corpo):
+        self.para = para
+        self.assunto = assunto
+        self.corpo = corpo
+
+    def __repr__(self):
+        return f'<EmailPendente {self.para}: {self.assunto}>'
+
+
+class Notificacao(db.Model):
+    """
+    Notificação in-app de um usuário. A constraint única (usuário, tipo,
+    referência) descarta duplicatas quando um evento é reprocessado.
+    """
+    __tablename__ = 'notificacao'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='CASCADE'), nullable=False)
+    tipo = db.Column(db.String(50), nullable=False)
+    id_referencia = db.Column(db.Integer, nullable=False)
+    mensagem = db.Column(db.String(512), nullable=False)
+    lida = db.Column(db.Boolean, nullable=False, default=False)
+    criada_em = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.UniqueConstraint('id_usuario', 'tipo', 'id_referencia', name='uq_notificacao_usuario_tipo_ref'),
+    )
+
+    def __init__(self, id_usuario, tipo, id_referencia, mensagem):
+        self.id_usuario = id_usuario
+        self.tipo = tipo
+        self.id_referencia = id_referencia
+        self.mensagem = mensagem
+
+    def __repr__(self):
+        return f'<Notificacao usuario_id={self.id_usuario} - {self.tipo} {self.id_referencia}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'id_usuario': self.id_usuario,
+            'tipo': self.tipo,
+            'id_referencia': self.id_referencia,
+            'mensagem': self.mensagem,
+            'lida': self.lida,
+            'criada_em': self.criada_em.isoformat() if self.criada_em else None
+        }
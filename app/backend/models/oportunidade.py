@@ -1,5 +1,6 @@
 from extensions import db
-from .enums import StatusOportunidades
+from .enums import StatusOportunidades, AlvoAvaliacao
+from .avaliacao import AvaliacaoAgregada, resumo_avaliacao
 
 class Oportunidade(db.Model):
     __tablename__ = 'oportunidade'
@@ -13,18 +14,39 @@ class Oportunidade(db.Model):
     data_hora = db.Column(db.DateTime, nullable=False)
     duracao_horas = db.Column(db.Integer, nullable=False)
     num_vagas = db.Column(db.Integer, nullable=False)
+    # Vagas ainda livres, decrementadas atomicamente a cada inscrição (InscricaoRepo.create_inscricao)
+    vagas_restantes = db.Column(db.Integer, nullable=False, default=0)
     foto_local = db.Column(db.String(255), nullable=True)
 
 
-    #OPÇÃO CORRETA SERIA RETIRAR ESSE COLUNA E COLOCA-LA COMO TABELA SEPARADA
+    # Texto original das tags, devolvido pela API; as buscas usam a tabela oportunidade_tag
     tags = db.Column(db.String(512), nullable=True)
     status = db.Column(db.Enum(StatusOportunidades), default=StatusOportunidades.aberta, nullable=False)
     criado_em = db.Column(db.DateTime, default=db.func.current_timestamp())
 
+    __table_args__ = (
+        # Paginação por keyset em (data_hora, id)
+        db.Index('ix_oportunidade_data_hora_id', 'data_hora', 'id'),
+        # Busca de oportunidades (OportunidadeRepo.search_oportunidades)
+        db.Index('ix_oportunidade_status_data_hora', 'status', 'data_hora'),
+        db.Index('ix_oportunidade_comunidade_data_hora', 'comunidade', 'data_hora'),
+    )
+
     #RELACIONAMENTOS
     organizacao = db.relationship('Organizacao', back_populates='oportunidades', lazy='select')
     habilidades = db.relationship('OportunidadeHabilidade', back_populates='oportunidade', lazy='dynamic', cascade='all, delete-orphan')
     inscricoes = db.relationship('Inscricao', back_populates='oportunidade', lazy='dynamic', cascade='all, delete-orphan')
+    tag_links = db.relationship('OportunidadeTag', back_populates='oportunidade', lazy='dynamic', cascade='all, delete-orphan')
+    lista_espera = db.relationship('ListaEspera', lazy='dynamic', cascade='all, delete-orphan')
+    # Avaliação da organização, no mesmo SELECT das listagens (LEFT JOIN pela chave primária)
+    avaliacao_organizacao = db.relationship(
+        AvaliacaoAgregada,
+        primaryjoin=lambda: db.and_(
+            db.foreign(AvaliacaoAgregada.id_alvo) == Oportunidade.id_organizacao,
+            AvaliacaoAgregada.tipo_alvo == AlvoAvaliacao.organizacao
+        ),
+        uselist=False, viewonly=True, lazy='joined'
+    )
 
 
     def __init__(self, id_organizacao, titulo, descricao, local_endereco, comunidade, data_hora, duracao_horas, num_vagas, tags=None):
@@ -36,28 +58,38 @@ class Oportunidade(db.Model):
         self.data_hora = data_hora
         self.duracao_horas = duracao_horas
         self.num_vagas = num_vagas
+        self.vagas_restantes = num_vagas
         self.tags = tags
 
     def __repr__(self):
         return f'<Oportunidade {self.titulo} - Org {self.id_organizacao}>'
     
     def to_dict(self):
+        avaliacao = self.avaliacao_organizacao.to_dict() if self.avaliacao_organizacao else resumo_avaliacao()
+        return Oportunidade.dict_from_row(self, avaliacao)
+
+    @staticmethod
+    def dict_from_row(row, avaliacao_organizacao: dict) -> dict:
+        # Aceita o objeto ou uma linha Core com as mesmas colunas (listagens projetadas, repositories/projecao.py)
         return {
-            'id': self.id,
-            'id_organizacao': self.id_organizacao,
-            'titulo': self.titulo,
-            'descricao': self.descricao,
-            'local_endereco': self.local_endereco,
-            'comunidade': self.comunidade,
-            'data_hora': self.data_hora.isoformat() if self.data_hora else None,
-            'duracao_horas': self.duracao_horas,
-            'num_vagas': self.num_vagas,
-            'tags': self.tags,
-            'status': self.status,
-            'criado_em': self.criado_em.isoformat() if self.criado_em else None
+            'id': row.id,
+            'id_organizacao': row.id_organizacao,
+            'titulo': row.titulo,
+            'descricao': row.descricao,
+            'local_endereco': row.local_endereco,
+            'comunidade': row.comunidade,
+            'data_hora': row.data_hora.isoformat() if row.data_hora else None,
+            'duracao_horas': row.duracao_horas,
+            'num_vagas': row.num_vagas,
+            'vagas_restantes': row.vagas_restantes,
+            'tags': row.tags,
+            'status': row.status,
+            'criado_em': row.criado_em.isoformat() if row.criado_em else None,
+            'avaliacao_organizacao': avaliacao_organizacao
         }
 
     def update_from_dict(self, data):
-        for field in ['id_organizacao', 'titulo', 'descricao', 'local_endereco', 'comunidade', 'data_hora', 'duracao_horas', 'num_vagas', 'tags', 'status']:
+        # num_vagas é alterado por OportunidadeRepo.update_num_vagas, que também ajusta vagas_restantes
+        for field in ['id_organizacao', 'titulo', 'descricao', 'local_endereco', 'comunidade', 'data_hora', 'duracao_horas', 'tags', 'status']:
             if field in data:
                 setattr(self, field, data[field])
@@ -1,5 +1,6 @@
 from extensions import db
-from .enums import StatusOrganizacao
+from .enums import StatusOrganizacao, AlvoAvaliacao
+from .avaliacao import AvaliacaoAgregada, resumo_avaliacao
 
 class Organizacao(db.Model):
     __tablename__ = 'organizacao'
@@ -21,6 +22,15 @@ class Organizacao(db.Model):
     #RELACIONAMENTOS
     responsavel = db.relationship('Usuario', back_populates='organizacoes_responsaveis', lazy='select')
     oportunidades = db.relationship('Oportunidade', back_populates='organizacao', lazy='dynamic', cascade='all, delete-orphan')
+    # Agregado das avaliações, carregado no mesmo SELECT (LEFT JOIN pela chave primária)
+    avaliacao = db.relationship(
+        AvaliacaoAgregada,
+        primaryjoin=lambda: db.and_(
+            db.foreign(AvaliacaoAgregada.id_alvo) == Organizacao.id,
+            AvaliacaoAgregada.tipo_alvo == AlvoAvaliacao.organizacao
+        ),
+        uselist=False, viewonly=True, lazy='joined'
+    )
 
     def __init__(self, id_responsavel, razao_social, email_institucional, senha, cnpj, descricao, endereco_matriz, contato, documento=None, aprovada=StatusOrganizacao.pendente):
         self.id_responsavel = id_responsavel
@@ -38,18 +48,25 @@ class Organizacao(db.Model):
         return f'<Organizacao {self.razao_social} - {self.email_institucional}>'
     
     def to_dict(self):
+        avaliacao = self.avaliacao.to_dict() if self.avaliacao else resumo_avaliacao()
+        return Organizacao.dict_from_row(self, avaliacao)
+
+    @staticmethod
+    def dict_from_row(row, avaliacao: dict) -> dict:
+        # `row` pode ser o objeto ou uma linha Core da listagem projetada (repositories/projecao.py)
         return {
-            'id': self.id,
-            'id_responsavel': self.id_responsavel,
-            'razao_social': self.razao_social,
-            'email_institucional': self.email_institucional,
-            'cnpj': self.cnpj,
-            'descricao': self.descricao,
-            'endereco_matriz': self.endereco_matriz,
-            'contato': self.contato,
-            'documento': self.documento if self.documento else None,
-            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
-            'aprovada': self.aprovada if self.aprovada else StatusOrganizacao.pendente
+            'id': row.id,
+            'id_responsavel': row.id_responsavel,
+            'razao_social': row.razao_social,
+            'email_institucional': row.email_institucional,
+            'cnpj': row.cnpj,
+            'descricao': row.descricao,
+            'endereco_matriz': row.endereco_matriz,
+            'contato': row.contato,
+            'documento': row.documento if row.documento else None,
+            'criado_em': row.criado_em.isoformat() if row.criado_em else None,
+            'aprovada': row.aprovada if row.aprovada else StatusOrganizacao.pendente,
+            'avaliacao': avaliacao
         }
     
     def update_from_dict(self, data):
@@ -0,0 +1,53 @@
+from extensions import db
+
+class Tag(db.Model):
+    __tablename__ = 'tag'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    nome = db.Column(db.String(100), unique=True, nullable=False)
+
+    #RELACIONAMENTOS
+    oportunidades = db.relationship('OportunidadeTag', back_populates='tag', lazy='dynamic', cascade='all, delete-orphan')
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __repr__(self):
+        return f'<Tag {self.nome}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nome': self.nome
+        }
+
+class OportunidadeTag(db.Model):
+    __tablename__ = 'oportunidade_tag'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_oportunidade = db.Column(db.Integer, db.ForeignKey('oportunidade.id'), nullable=False)
+    id_tag = db.Column(db.Integer, db.ForeignKey('tag.id'), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('id_oportunidade', 'id_tag', name='uq_oportunidade_tag'),
+        # Índice invertido: tag -> oportunidades
+        db.Index('ix_oportunidade_tag_tag_oportunidade', 'id_tag', 'id_oportunidade'),
+    )
+
+    #RELACIONAMENTOS
+    oportunidade = db.relationship('Oportunidade', back_populates='tag_links', lazy='select')
+    tag = db.relationship('Tag', back_populates='oportunidades', lazy='select')
+
+    def __init__(self, id_oportunidade, id_tag):
+        self.id_oportunidade = id_oportunidade
+        self.id_tag = id_tag
+
+    def __repr__(self):
+        return f'<OportunidadeTag oportunidade_id={self.id_oportunidade}, tag_id={self.id_tag}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'id_oportunidade': self.id_oportunidade,
+            'id_tag': self.id_tag
+        }
@@ -22,6 +22,7 @@ class Usuario(db.Model):
     organizacoes_responsaveis = db.relationship('Organizacao', back_populates='responsavel', lazy='dynamic', cascade='all, delete-orphan')
     habilidades = db.relationship('VoluntarioHabilidade', back_populates='voluntario', lazy='dynamic', cascade='all, delete-orphan')
     inscricoes = db.relationship('Inscricao', back_populates='voluntario', lazy='dynamic', cascade='all, delete-orphan')
+    lista_espera = db.relationship('ListaEspera', lazy='dynamic', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Usuario {self.nome_completo} - {self.email}>'
@@ -53,19 +54,24 @@ class Usuario(db.Model):
         self.conta_ativa = conta_ativa
 
     def to_dict(self):
+        return Usuario.dict_from_row(self)
+
+    @staticmethod
+    def dict_from_row(row) -> dict:
+        # Também recebe linhas Core com essas colunas (UserRepo.get_users_page)
         return {
-            'id': self.id,
-            'nome_completo': self.nome_completo,
-            'cpf': self.cpf,
-            'email': self.email,
-            'cidade': self.cidade,
-            'bairro': self.bairro,
-            'telefone': self.telefone,
-            'data_nasc': self.data_nasc.isoformat(),
-            'foto_perfil': self.foto_perfil,
-            'tipo_usuario': self.tipo_usuario,
-            'criado_em': self.criado_em.isoformat(),
-            'conta_ativa': self.conta_ativa
+            'id': row.id,
+            'nome_completo': row.nome_completo,
+            'cpf': row.cpf,
+            'email': row.email,
+            'cidade': row.cidade,
+            'bairro': row.bairro,
+            'telefone': row.telefone,
+            'data_nasc': row.data_nasc.isoformat(),
+            'foto_perfil': row.foto_perfil,
+            'tipo_usuario': row.tipo_usuario,
+            'criado_em': row.criado_em.isoformat(),
+            'conta_ativa': row.conta_ativa
         }
 
     def update_from_dict(self, data):
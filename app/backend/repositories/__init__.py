@@ -2,4 +2,12 @@ from .user_repo import UserRepo
 from .organizacao_repo import OrganizacaoRepo
 from .oportunidade_repo import OportunidadeRepo
 from .habilidades_repo import HabilidadeRepo
-from .inscricao_repo import InscricaoRepo
+from .inscricao_repo import InscricaoRepo, VagasEsgotadas, OportunidadeIndisponivel
+from .tag_repo import TagRepo
+from .feed_repo import FeedRepo
+from .conquista_repo import ConquistaRepo
+from .historico_repo import HistoricoRepo
+from .presenca_repo import PresencaRepo
+from .notificacao_repo import NotificacaoRepo
+from .comunidade_repo import ComunidadeRepo
+from .avaliacao_repo import AvaliacaoRepo
@@ -0,0 +1,164 @@
+from extensions import db
+from datetime import datetime
+from typing import Optional, Dict, Iterable, Tuple
+from sqlalchemy.exc import IntegrityError
+from models import Avaliacao, AvaliacaoAgregada, Inscricao, Oportunidade, Organizacao
+from models.avaliacao import NOTAS, resumo_avaliacao
+from models.enums import AlvoAvaliacao, StatusInscricao
+from .pagination import Page, paginate
+
+class AvaliacaoRepo:
+    def create_avaliacao(id_inscricao: int, id_autor: int, tipo_alvo: AlvoAvaliacao, id_alvo: int, nota: int, comentario: Optional[str] = None) -> Optional[Avaliacao]:
+        """
+        Grava a avaliação e soma a nota no agregado do alvo no mesmo commit.
+        Retorna None se essa inscrição já avaliou esse alvo.
+        """
+        avaliacao = Avaliacao(id_inscricao, id_autor, tipo_alvo, id_alvo, nota, comentario)
+        try:
+            with db.session.begin_nested():
+                db.session.add(avaliacao)
+        except IntegrityError:
+            return None
+
+        AvaliacaoRepo._ajustar(tipo_alvo, id_alvo, {'total': 1, 'soma': nota, f'nota_{nota}': 1})
+        db.session.commit()
+        return avaliacao
+
+    def get_avaliacao_by_id(id: int) -> Optional[Avaliacao]:
+        return db.session.get(Avaliacao, id)
+
+    def get_avaliacoes_page(tipo_alvo: AlvoAvaliacao, id_alvo: int, limit: int, cursor: Optional[str] = None) -> Page:
+        return paginate(Avaliacao.query.filter_by(tipo_alvo=tipo_alvo, id_alvo=id_alvo), [Avaliacao.id], limit, cursor)
+
+    def update_avaliacao(id: int, nota: Optional[int] = None, comentario: Optional[str] = None) -> Optional[Avaliacao]:
+        avaliacao = AvaliacaoRepo.get_avaliacao_by_id(id)
+        if not avaliacao:
+            return None
+
+        if nota is not None and nota != avaliacao.nota:
+            # A nota troca de faixa no histograma; o total não muda
+            AvaliacaoRepo._ajustar(avaliacao.tipo_alvo, avaliacao.id_alvo, {
+                'soma': nota - avaliacao.nota,
+                f'nota_{avaliacao.nota}': -1,
+                f'nota_{nota}': 1
+            })
+            avaliacao.nota = nota
+        if comentario is not None:
+            avaliacao.comentario = comentario
+
+        avaliacao.atualizado_em = datetime.now()
+        db.session.commit()
+        return avaliacao
+
+    def delete_avaliacao(id: int) -> bool:
+        avaliacao = AvaliacaoRepo.get_avaliacao_by_id(id)
+        if not avaliacao:
+            return False
+
+        AvaliacaoRepo._ajustar(avaliacao.tipo_alvo, avaliacao.id_alvo, {'total': -1, 'soma': -avaliacao.nota, f'nota_{avaliacao.nota}': -1})
+        db.session.delete(avaliacao)
+        db.session.commit()
+        return True
+
+    # AGREGADO RELATED METHODS
+
+    def get_agregado(tipo_alvo: AlvoAvaliacao, id_alvo: int) -> dict:
+        # Leitura por chave primária: nenhum AVG() no momento da consulta
+        agregado = db.session.get(AvaliacaoAgregada, (tipo_alvo, id_alvo))
+        return agregado.to_dict() if agregado else resumo_avaliacao()
+
+    def get_alvo(inscricao: Inscricao, id_autor: int) -> Optional[tuple]:
+        """
+        (tipo_alvo, id_alvo) que o autor pode avaliar a partir da inscrição: o
+        voluntário avalia a organização e o responsável pela organização avalia
+        o voluntário. None se o autor não participa da inscrição.
+        """
+        id_organizacao, id_responsavel = db.session.execute(
+            db.select(Organizacao.id, Organizacao.id_responsavel)
+            .join(Oportunidade, Oportunidade.id_organizacao == Organizacao.id)
+            .where(Oportunidade.id == inscricao.id_oportunidade)
+        ).one()
+
+        if id_autor == inscricao.id_usuario:
+            return AlvoAvaliacao.organizacao, id_organizacao
+        if id_autor == id_responsavel:
+            return AlvoAvaliacao.usuario, inscricao.id_usuario
+        return None
+
+    def pode_avaliar(inscricao: Inscricao, agora: datetime) -> bool:
+        # Só depois do evento e com a participação aprovada
+        return (
+            inscricao.status_inscricao == StatusInscricao.aprovada
+            and inscricao.oportunidade.data_hora <= agora
+        )
+
+    def recalcular_agregados() -> int:
+        """
+        Regrava avaliacao_agregada a partir das avaliações (uma consulta
+        agrupada por alvo). Para corrigir divergências ou popular a tabela pela
+        primeira vez. Retorna quantos alvos foram gravados.
+        """
+        rows = AvaliacaoRepo._agrupar_por_alvo()
+
+        db.session.execute(db.delete(AvaliacaoAgregada))
+        if rows:
+            db.session.execute(db.insert(AvaliacaoAgregada), [
+                {'tipo_alvo': tipo_alvo, 'id_alvo': id_alvo, 'total': total, 'soma': soma, **{f'nota_{nota}': n for nota, n in zip(NOTAS, histograma)}}
+                for tipo_alvo, id_alvo, total, soma, *histograma in rows
+            ])
+        db.session.commit()
+        return len(rows)
+
+    def remover_em_cascata(criterio, alvos_removidos: Iterable[Tuple[AlvoAvaliacao, int]] = ()) -> None:
+        """
+        Para remoções que levam avaliações junto (usuário, organização,
+        oportunidade ou inscrição): desconta as avaliações que atendem ao
+        `criterio` do agregado de cada alvo (uma consulta agrupada e um UPDATE
+        por alvo), apaga essas avaliações e os agregados dos `alvos_removidos`.
+        Não faz commit.
+        """
+        for tipo_alvo, id_alvo, total, soma, *histograma in AvaliacaoRepo._agrupar_por_alvo(criterio):
+            AvaliacaoRepo._ajustar(tipo_alvo, id_alvo, {
+                'total': -total, 'soma': -soma, **{f'nota_{nota}': -n for nota, n in zip(NOTAS, histograma) if n}
+            })
+        db.session.execute(db.delete(Avaliacao).where(criterio).execution_options(synchronize_session=False))
+
+        for tipo_alvo, id_alvo in alvos_removidos:
+            db.session.execute(
+                db.delete(AvaliacaoAgregada)
+                .where(AvaliacaoAgregada.tipo_alvo == tipo_alvo, AvaliacaoAgregada.id_alvo == id_alvo)
+            )
+
+    def _agrupar_por_alvo(*criterios) -> list:
+        # (tipo_alvo, id_alvo, total, soma, nota_1..nota_5) das avaliações, por alvo
+        colunas = [db.func.count(Avaliacao.id), db.func.sum(Avaliacao.nota)] + [
+            db.func.sum(db.case((Avaliacao.nota == nota, 1), else_=0)) for nota in NOTAS
+        ]
+        return (
+            db.session.query(Avaliacao.tipo_alvo, Avaliacao.id_alvo, *colunas)
+            .filter(*criterios)
+            .group_by(Avaliacao.tipo_alvo, Avaliacao.id_alvo)
+            .all()
+        )
+
+    def _ajustar(tipo_alvo: AlvoAvaliacao, id_alvo: int, deltas: Dict[str, int]) -> None:
+        """
+        Aplica os deltas ao agregado do alvo com um UPDATE atômico (sem ler os
+        valores atuais). Na primeira avaliação, cria a linha num savepoint; se
+        outra transação a criou antes, repete o UPDATE. Não faz commit.
+        """
+        atualizar = (
+            db.update(AvaliacaoAgregada)
+            .where(AvaliacaoAgregada.tipo_alvo == tipo_alvo, AvaliacaoAgregada.id_alvo == id_alvo)
+            .values({getattr(AvaliacaoAgregada, c): getattr(AvaliacaoAgregada, c) + d for c, d in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+
+        if db.session.execute(atualizar).rowcount:
+            return
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(AvaliacaoAgregada(tipo_alvo, id_alvo, **deltas))
+        except IntegrityError:
+            db.session.execute(atualizar)
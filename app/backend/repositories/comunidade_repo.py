@@ -0,0 +1,149 @@
+from extensions import db
+from datetime import datetime
+from typing import Optional, List
+from models import Publicacao, Comentario, Curtida
+from services.timeline import timeline_cache, Chave, Item
+from .pagination import Page, paginate, encode_cursor, decode_cursor
+
+CAMPOS = {'comunidade': Publicacao.comunidade, 'cidade': Publicacao.cidade}
+
+class ComunidadeRepo:
+    def create_publicacao(id_usuario: int, conteudo: str, comunidade: str, cidade: str) -> Publicacao:
+        publicacao = Publicacao(id_usuario, comunidade, cidade, conteudo, criado_em=datetime.now())
+        db.session.add(publicacao)
+        db.session.commit()
+
+        # Fan-out na escrita: entra nas timelines da comunidade e da cidade já em memória
+        timeline_cache.publicar(ComunidadeRepo._chaves(publicacao), publicacao.id, publicacao.criado_em)
+        return publicacao
+
+    def get_publicacao_by_id(id: int) -> Optional[Publicacao]:
+        return db.session.get(Publicacao, id)
+
+    def delete_publicacao(id: int) -> bool:
+        publicacao = ComunidadeRepo.get_publicacao_by_id(id)
+        if not publicacao:
+            return False
+
+        chaves = ComunidadeRepo._chaves(publicacao)
+        db.session.delete(publicacao)
+        db.session.commit()
+        timeline_cache.remover(chaves, id)
+        return True
+
+    def get_feed(campo: str, valor: str, limit: int, cursor: Optional[str] = None) -> Page:
+        """
+        Uma página do feed da comunidade (ou cidade), da mais nova para a mais
+        antiga. Os ids vêm da timeline em memória; o banco só é lido para
+        páginas além do buffer ou em modo pull, sempre pelo índice (campo, id).
+        Lança ValueError se o cursor for inválido.
+        """
+        chave = (campo, valor)
+        antes = decode_cursor(cursor, [Publicacao.id])[0] if cursor else None
+        timeline = timeline_cache.get(chave, ComunidadeRepo._carregar, ComunidadeRepo._novos)
+
+        if timeline.pull:
+            ids = ComunidadeRepo._ids(chave, antes, limit)
+        else:
+            ids, continuar = timeline.pagina(antes, limit)
+            if continuar is not None:
+                ids += ComunidadeRepo._ids(chave, continuar, limit - len(ids))
+
+        if not ids:
+            return Page([], None)
+
+        # Uma leitura por chave primária para a página inteira, com os contadores atuais
+        por_id = {p.id: p for p in Publicacao.query.filter(Publicacao.id.in_(ids))}
+        publicacoes = [por_id[id] for id in ids if id in por_id]
+        return Page(publicacoes, encode_cursor([ids[-1]]) if len(ids) == limit else None)
+
+    # CURTIDAS E COMENTÁRIOS RELATED METHODS
+
+    def curtir(id_publicacao: int, id_usuario: int) -> bool:
+        """
+        Registra a curtida e incrementa num_curtidas na mesma transação; curtir
+        de novo não conta duas vezes. Retorna False se já estava curtida.
+        """
+        inserida = db.session.execute(
+            db.insert(Curtida)
+            .prefix_with('IGNORE', dialect='mysql')
+            .prefix_with('OR IGNORE', dialect='sqlite')
+            .values(id_publicacao=id_publicacao, id_usuario=id_usuario, criado_em=datetime.now())
+        ).rowcount == 1
+
+        if inserida:
+            ComunidadeRepo._contar(id_publicacao, Publicacao.num_curtidas, 1)
+        db.session.commit()
+        return inserida
+
+    def descurtir(id_publicacao: int, id_usuario: int) -> bool:
+        removida = db.session.execute(
+            db.delete(Curtida).where(Curtida.id_publicacao == id_publicacao, Curtida.id_usuario == id_usuario)
+        ).rowcount == 1
+
+        if removida:
+            ComunidadeRepo._contar(id_publicacao, Publicacao.num_curtidas, -1)
+        db.session.commit()
+        return removida
+
+    def create_comentario(id_publicacao: int, id_usuario: int, conteudo: str) -> Comentario:
+        comentario = Comentario(id_publicacao, id_usuario, conteudo)
+        db.session.add(comentario)
+        ComunidadeRepo._contar(id_publicacao, Publicacao.num_comentarios, 1)
+        db.session.commit()
+        return comentario
+
+    def get_comentario_by_id(id: int) -> Optional[Comentario]:
+        return db.session.get(Comentario, id)
+
+    def get_comentarios_page(id_publicacao: int, limit: int, cursor: Optional[str] = None) -> Page:
+        return paginate(Comentario.query.filter_by(id_publicacao=id_publicacao), [Comentario.id], limit, cursor)
+
+    def delete_comentario(id: int) -> bool:
+        comentario = ComunidadeRepo.get_comentario_by_id(id)
+        if not comentario:
+            return False
+
+        ComunidadeRepo._contar(comentario.id_publicacao, Publicacao.num_comentarios, -1)
+        db.session.delete(comentario)
+        db.session.commit()
+        return True
+
+    def _contar(id_publicacao: int, coluna, delta: int) -> None:
+        # UPDATE atômico no contador desnormalizado (sem ler o valor atual). Não faz commit.
+        db.session.execute(
+            db.update(Publicacao)
+            .where(Publicacao.id == id_publicacao)
+            .values({coluna: coluna + delta})
+            .execution_options(synchronize_session=False)
+        )
+
+    # TIMELINE RELATED METHODS
+
+    def _chaves(publicacao: Publicacao) -> List[Chave]:
+        return [('comunidade', publicacao.comunidade), ('cidade', publicacao.cidade)]
+
+    def _ids(chave: Chave, antes: Optional[int], limit: int) -> List[int]:
+        return [id for id, _ in ComunidadeRepo._itens(chave, antes, limit)]
+
+    def _itens(chave: Chave, antes: Optional[int], limit: int) -> List[Item]:
+        campo, valor = chave
+        query = (
+            db.session.query(Publicacao.id, Publicacao.criado_em)
+            .filter(CAMPOS[campo] == valor)
+        )
+        if antes is not None:
+            query = query.filter(Publicacao.id < antes)
+        return [tuple(row) for row in query.order_by(Publicacao.id.desc()).limit(limit)]
+
+    def _carregar(chave: Chave, tamanho: int) -> List[Item]:
+        return ComunidadeRepo._itens(chave, None, tamanho)
+
+    def _novos(chave: Chave, desde: int) -> List[Item]:
+        campo, valor = chave
+        return [
+            tuple(row) for row in
+            db.session.query(Publicacao.id, Publicacao.criado_em)
+            .filter(CAMPOS[campo] == valor, Publicacao.id > desde)
+            .order_by(Publicacao.id)
+        ]
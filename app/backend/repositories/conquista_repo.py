@@ -0,0 +1,53 @@
+from extensions import db
+from typing import List, Dict, Tuple, Iterable
+from models import ConquistaUsuario, HorasUsuario
+from services.conquistas import motor_conquistas
+
+class ConquistaRepo:
+    def get_conquistas_by_usuario(id_usuario: int) -> List[dict]:
+        conquistas = ConquistaUsuario.query.filter_by(id_usuario=id_usuario).order_by(ConquistaUsuario.concedida_em).all()
+
+        resultado = []
+        for conquista in conquistas:
+            regra = motor_conquistas.por_codigo.get(conquista.codigo)
+            resultado.append({**conquista.to_dict(), 'nome': regra.nome if regra else conquista.codigo})
+        return resultado
+
+    def avaliar(id_usuario: int, deltas: Dict[str, float]) -> List[str]:
+        """
+        Consome um evento de histórico: relê só os contadores que aumentaram e
+        concede as regras cujo limite foi cruzado. Não faz commit.
+        """
+        positivos = {c: d for c, d in deltas.items() if d > 0 and c in motor_conquistas.contadores}
+        if not positivos:
+            return []
+
+        # SELECT explícito: o UPDATE dos totais não passa pelo identity map da sessão
+        atuais = db.session.execute(
+            db.select(*[getattr(HorasUsuario, c) for c in positivos]).where(HorasUsuario.id_usuario == id_usuario)
+        ).one_or_none()
+        if atuais is None:
+            return []
+
+        mudancas = {c: (valor - positivos[c], valor) for c, valor in zip(positivos, atuais)}
+        codigos = [regra.codigo for regra in motor_conquistas.cruzadas(mudancas)]
+
+        ConquistaRepo.conceder([(id_usuario, codigo) for codigo in codigos])
+        return codigos
+
+    def conceder(pares: Iterable[Tuple[int, str]]) -> None:
+        """
+        Grava (id_usuario, codigo) num INSERT em lote que ignora as conquistas já
+        concedidas (constraint única), então repetir um evento não duplica nada.
+        Não faz commit.
+        """
+        pares = list(pares)
+        if not pares:
+            return
+
+        db.session.execute(
+            db.insert(ConquistaUsuario)
+            .prefix_with('IGNORE', dialect='mysql')
+            .prefix_with('OR IGNORE', dialect='sqlite'),
+            [{'id_usuario': id_usuario, 'codigo': codigo} for id_usuario, codigo in pares]
+        )
@@ -0,0 +1,187 @@
+from extensions import db
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict
+from sqlalchemy.exc import IntegrityError
+from models import Oportunidade, OportunidadeHabilidade, VoluntarioHabilidade, Usuario
+from models.feed import FeedUsuario, FeedVersao
+from models.enums import StatusOportunidades
+from services.feed_ranking import feed_candidatos, FeedCandidatos
+from services.text_index import fold
+
+class FeedRepo:
+    def get_feed(user_id: int, cidade: str, bairro: str, limit: int) -> List[Oportunidade]:
+        """
+        Feed do usuário: lê a lista ranqueada salva (ou calcula e salva) e carrega
+        as oportunidades num único SELECT, descartando as que fecharam ou já passaram.
+        O feed salvo também é recalculado quando a área do usuário mudou depois da
+        versão de onde ele saiu, mesmo que a mudança tenha sido em outro processo.
+        """
+        agora = datetime.now()
+        feed : Optional[FeedUsuario] = db.session.get(FeedUsuario, user_id)
+
+        if (
+            feed is None
+            or feed.gerado_em < agora - timedelta(seconds=feed_candidatos.feed_ttl)
+            or FeedRepo._versao_da_area(feed.cidade, feed.bairro) > feed.versao
+        ):
+            # As versões da área são lidas antes das candidatas: a fotografia nunca é mais velha que elas
+            area = (fold(cidade or ''), fold(bairro or ''))
+            candidatos = FeedRepo._candidatos(FeedRepo._versoes(*area))
+            habilidades = frozenset(
+                hid for (hid,) in VoluntarioHabilidade.query.with_entities(VoluntarioHabilidade.id_habilidade).filter_by(id_usuario=user_id)
+            )
+            ids = candidatos.ranquear(habilidades, cidade, bairro, agora, feed_candidatos.tamanho)
+            feed = FeedRepo._salvar(user_id, cidade, bairro, ids, agora, candidatos.versao_de(*area))
+            db.session.commit()
+
+        ids = feed.get_ids()[:limit]
+        if not ids:
+            return []
+
+        por_id = {
+            o.id: o for o in Oportunidade.query.filter(
+                Oportunidade.id.in_(ids),
+                Oportunidade.status == StatusOportunidades.aberta,
+                Oportunidade.data_hora >= agora
+            )
+        }
+        return [por_id[id] for id in ids if id in por_id]
+
+    def warm_feeds(batch_size: int = 500) -> int:
+        """
+        Calcula e salva o feed de todos os voluntários ativos, em lotes por id com
+        um commit por lote. Feito para rodar fora do pico (`flask aquecer-feed`).
+        Retorna quantos feeds foram gerados.
+        """
+        agora = datetime.now()
+        candidatos = FeedRepo._candidatos()
+        ultimo_id, total = 0, 0
+
+        while True:
+            usuarios = (
+                Usuario.query
+                .with_entities(Usuario.id, Usuario.cidade, Usuario.bairro)
+                .filter(Usuario.id > ultimo_id, Usuario.tipo_usuario == 'regular', Usuario.conta_ativa.is_(True))
+                .order_by(Usuario.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not usuarios:
+                return total
+
+            ids = [uid for uid, _, _ in usuarios]
+            habilidades = {uid: set() for uid in ids}
+            for uid, hid in VoluntarioHabilidade.query.with_entities(VoluntarioHabilidade.id_usuario, VoluntarioHabilidade.id_habilidade).filter(VoluntarioHabilidade.id_usuario.in_(ids)):
+                habilidades[uid].add(hid)
+
+            FeedUsuario.query.filter(FeedUsuario.id_usuario.in_(ids)).delete(synchronize_session=False)
+            db.session.execute(db.insert(FeedUsuario), [
+                {
+                    'id_usuario': uid,
+                    'cidade': fold(cidade or ''),
+                    'bairro': fold(bairro or ''),
+                    'oportunidade_ids': ','.join(map(str, candidatos.ranquear(frozenset(habilidades[uid]), cidade, bairro, agora, feed_candidatos.tamanho))),
+                    'gerado_em': agora,
+                    'versao': candidatos.versao_de(fold(cidade or ''), fold(bairro or ''))
+                }
+                for uid, cidade, bairro in usuarios
+            ])
+            db.session.commit()
+
+            ultimo_id = ids[-1]
+            total += len(ids)
+
+    # INVALIDATION RELATED METHODS
+
+    def invalidate_user(user_id: int) -> None:
+        # Chamado quando habilidades ou local do usuário mudam. Não faz commit.
+        FeedUsuario.query.filter_by(id_usuario=user_id).delete()
+
+    def invalidate_area(*comunidades: str) -> None:
+        """
+        Sobe a versão de cada comunidade (comparando sem acentos nem maiúsculas)
+        e descarta a fotografia de candidatas do processo. Os feeds salvos da
+        área ficam com versão menor que a dela e são recalculados na próxima
+        leitura, e os outros processos recarregam as candidatas quando um
+        usuário da área pede o feed. Só as linhas das comunidades são travadas,
+        então mudanças em áreas diferentes não se serializam.
+        Chamado quando uma oportunidade é criada ou removida, ou quando muda algo
+        que a faz entrar ou sair dos feeds ou mudar de score. Não faz commit.
+        """
+        for comunidade in sorted({fold(c) for c in comunidades if c}):
+            FeedRepo._atualizar_versao(comunidade, FeedVersao.versao + 1, 1)
+        feed_candidatos.invalidate()
+
+    def _salvar(user_id: int, cidade: str, bairro: str, ids: List[int], agora: datetime, versao: int) -> FeedUsuario:
+        """
+        Grava o feed do usuário. Na primeira vez, cria a linha num savepoint; se
+        uma requisição concorrente criou antes, relê a linha travada e a
+        sobrescreve. Não faz commit.
+        """
+        feed = db.session.get(FeedUsuario, user_id)
+        if feed is None:
+            try:
+                with db.session.begin_nested():
+                    feed = FeedUsuario(user_id, fold(cidade or ''), fold(bairro or ''), ','.join(map(str, ids)), agora, versao)
+                    db.session.add(feed)
+                return feed
+            except IntegrityError:
+                feed = db.session.get(FeedUsuario, user_id, with_for_update=True, populate_existing=True)
+
+        feed.cidade = fold(cidade or '')
+        feed.bairro = fold(bairro or '')
+        feed.oportunidade_ids = ','.join(map(str, ids))
+        feed.gerado_em = agora
+        feed.versao = versao
+        return feed
+
+    # VERSION RELATED METHODS
+
+    def _versao_da_area(cidade: str, bairro: str) -> int:
+        # Até duas linhas, pela chave primária
+        return max(FeedRepo._versoes(cidade, bairro).values(), default=0)
+
+    def _versoes(*comunidades: str) -> Dict[str, int]:
+        return dict(db.session.execute(
+            db.select(FeedVersao.comunidade, FeedVersao.versao).where(FeedVersao.comunidade.in_({c for c in comunidades if c}))
+        ).all())
+
+    def _atualizar_versao(comunidade: str, valor, inicial: int) -> int:
+        """
+        Grava `valor` na versão da comunidade com um UPDATE (o lock da linha
+        serializa mudanças concorrentes até o commit). Na primeira vez, cria a
+        linha com `inicial` num savepoint; se outra transação a criou antes,
+        repete o UPDATE. Retorna a versão gravada. Não faz commit.
+        """
+        atualizar = (
+            db.update(FeedVersao)
+            .where(FeedVersao.comunidade == comunidade)
+            .values(versao=valor)
+            .execution_options(synchronize_session=False)
+        )
+
+        if not db.session.execute(atualizar).rowcount:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(FeedVersao(comunidade, inicial))
+            except IntegrityError:
+                db.session.execute(atualizar)
+
+        return db.session.scalar(db.select(FeedVersao.versao).where(FeedVersao.comunidade == comunidade))
+
+    def _candidatos(versoes: Optional[Dict[str, int]] = None) -> FeedCandidatos:
+        def loader():
+            # Versões antes das candidatas: uma mudança no meio da carga recarrega de novo depois
+            lidas = dict(db.session.execute(db.select(FeedVersao.comunidade, FeedVersao.versao)).all())
+            filtros = (Oportunidade.status == StatusOportunidades.aberta, Oportunidade.data_hora >= datetime.now())
+            rows = Oportunidade.query.with_entities(Oportunidade.id, Oportunidade.comunidade, Oportunidade.data_hora).filter(*filtros).all()
+            vinculos = (
+                OportunidadeHabilidade.query
+                .join(Oportunidade, Oportunidade.id == OportunidadeHabilidade.id_oportunidade)
+                .with_entities(OportunidadeHabilidade.id_oportunidade, OportunidadeHabilidade.id_habilidade)
+                .filter(*filtros)
+                .all()
+            )
+            return lidas, rows, vinculos
+
+        return feed_candidatos.get(loader, versoes)
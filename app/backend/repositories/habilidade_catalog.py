@@ -0,0 +1,88 @@
+import time
+from threading import Lock
+from typing import Optional, Dict, List
+from flask import current_app
+from sqlalchemy import event
+from bisect import bisect_right
+from models import Habilidade
+from services.text_index import fold
+from .pagination import Page, decode_cursor, encode_cursor
+
+class CatalogSnapshot:
+    """
+    Fotografia imutável da tabela `habilidade`, com índices por id e por nome
+    e o JSON da listagem completa já serializado.
+    """
+    __slots__ = ('version', 'carregado_em', 'lista', 'ids', 'por_id', 'por_nome', 'lista_json')
+
+    def __init__(self, version: int, lista: List[dict], lista_json: bytes):
+        self.version = version
+        self.carregado_em = time.monotonic()
+        self.lista = lista
+        self.ids = [h['id'] for h in lista]
+        self.por_id : Dict[int, dict] = {h['id']: h for h in lista}
+        # O MySQL compara nomes sem diferenciar maiúsculas nem acentos, então o índice também não diferencia
+        self.por_nome : Dict[str, dict] = {fold(h['nome']): h for h in lista}
+        self.lista_json = lista_json
+
+    def get_by_id(self, id: int) -> Optional[dict]:
+        return self.por_id.get(id)
+
+    def get_by_nome(self, nome: str) -> Optional[dict]:
+        return self.por_nome.get(fold(nome))
+
+    def page(self, limit: int, cursor: Optional[str] = None) -> Page:
+        # Keyset por id sobre a lista ordenada: busca binária em vez de banco
+        inicio = bisect_right(self.ids, decode_cursor(cursor, [Habilidade.id])[0]) if cursor else 0
+        items = self.lista[inicio:inicio + limit]
+
+        next_cursor = None
+        if inicio + limit < len(self.lista):
+            next_cursor = encode_cursor([items[-1]['id']])
+        return Page(items, next_cursor)
+
+
+class HabilidadeCatalog:
+    """
+    Catálogo de habilidades em memória do processo. Leituras usam o snapshot
+    atual sem consultar o banco; escritas via HabilidadeRepo chamam `reload`,
+    que incrementa a versão e troca o snapshot (ou `invalidate_on_commit`,
+    quando o commit fica com quem chamou). O `ttl` limita por quanto tempo
+    um worker pode servir um snapshot desatualizado por escritas de outro processo.
+    """
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._snapshot : Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._lock = Lock()
+
+    def configure(self, ttl: float) -> None:
+        self.ttl = ttl
+
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.carregado_em > self.ttl:
+            snapshot = self.reload()
+        return snapshot
+
+    def invalidate(self) -> None:
+        # A próxima leitura recarrega (e incrementa a versão)
+        self._snapshot = None
+
+    def invalidate_on_commit(self, session) -> None:
+        # Depois do commit a sessão não pode consultar o banco; só descarta o snapshot
+        event.listen(session, 'after_commit', lambda _: self.invalidate(), once=True)
+
+    def reload(self) -> CatalogSnapshot:
+        with self._lock:
+            rows = Habilidade.query.with_entities(Habilidade.id, Habilidade.nome).order_by(Habilidade.id).all()
+            lista = [{'id': id, 'nome': nome} for id, nome in rows]
+
+            self._version += 1
+            # Serializa como o jsonify faria, para a listagem ser só uma cópia de bytes
+            lista_json = current_app.json.response(lista).get_data()
+            self._snapshot = CatalogSnapshot(self._version, lista, lista_json)
+            return self._snapshot
+
+
+habilidade_catalog = HabilidadeCatalog()
@@ -1,18 +1,25 @@
 from extensions import db
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 from models import Habilidade
 from . import UserRepo, OportunidadeRepo
+from .habilidade_catalog import habilidade_catalog, CatalogSnapshot
+from services.text_index import fold
+from .pagination import Page
+
+# Tamanho da coluna habilidade.nome: acima disso o INSERT IGNORE do MySQL truncaria o nome
+TAMANHO_NOME = Habilidade.__table__.c.nome.type.length
 
 class HabilidadeRepo:
     def create_habilidade(nome:str) -> Habilidade:
         hab = Habilidade(nome=nome)
 
-        if HabilidadeRepo.habilidade_exists(nome):
+        if HabilidadeRepo.get_habilidade_by_name(nome):
             return None
 
         db.session.add(hab)
         db.session.commit()
 
+        habilidade_catalog.reload()
         return hab
     
     def get_habilidade_by_id(id:int) -> Habilidade:
@@ -24,9 +31,15 @@ class HabilidadeRepo:
     def get_all_habilidades() -> List[Habilidade]:
         return Habilidade.query.all()
     
+    def get_habilidades_page(limit: int, cursor: Optional[str] = None) -> Page:
+        return HabilidadeRepo.get_catalog().page(limit, cursor)
+
     def habilidade_exists(name:str) -> bool:
-        hab = HabilidadeRepo.get_habilidade_by_name(name=name)
-        return hab is not None
+        return HabilidadeRepo.get_catalog().get_by_nome(name) is not None
+
+    def get_catalog() -> CatalogSnapshot:
+        # Leitura em memória: não consulta o banco enquanto o snapshot estiver válido
+        return habilidade_catalog.snapshot()
     
     def update_habilidade(id:str, data:dict) -> Optional[Habilidade]:
         hab = HabilidadeRepo.get_habilidade_by_id(id=id)
@@ -36,6 +49,8 @@ class HabilidadeRepo:
         data.pop("id", None)
         hab.update_from_dict(data)
         db.session.commit()
+
+        habilidade_catalog.reload()
         return hab
     
     def delete_habilidade(id:str) -> Optional[Habilidade]:
@@ -45,8 +60,54 @@ class HabilidadeRepo:
 
         db.session.delete(hab)
         db.session.commit()
+
+        habilidade_catalog.reload()
         return True
-    
+
+    def get_or_create_ids_by_names(nomes: Iterable[str]) -> Dict[str, int]:
+        """
+        Resolve uma lista de nomes para {nome: id}, criando os que não existem.
+        Os nomes conhecidos vêm do catálogo em memória; os demais são criados com
+        um único INSERT que ignora duplicatas (seguro contra cadastros concorrentes)
+        e resolvidos por uma consulta ao banco. A comparação ignora acentos e
+        maiúsculas, como a collation do MySQL: "musica" resolve para "Música" em
+        vez de ser descartado pelo INSERT. Não faz commit; o catálogo é
+        recarregado depois do commit de quem chamou.
+
+        Lança ValueError se algum nome passar de TAMANHO_NOME caracteres.
+        """
+        nomes = {nome.strip() for nome in nomes if nome and nome.strip()}
+        if any(len(nome) > TAMANHO_NOME for nome in nomes):
+            raise ValueError(f'Nomes de habilidade devem ter no máximo {TAMANHO_NOME} caracteres.')
+
+        catalogo = HabilidadeRepo.get_catalog()
+        resultado, faltando = {}, []
+        for nome in nomes:
+            hab = catalogo.get_by_nome(nome)
+            if hab:
+                resultado[nome] = hab['id']
+            else:
+                faltando.append(nome)
+
+        if faltando:
+            db.session.execute(
+                db.insert(Habilidade)
+                .prefix_with('IGNORE', dialect='mysql')
+                .prefix_with('OR IGNORE', dialect='sqlite'),
+                [{'nome': nome} for nome in faltando]
+            )
+            por_nome = {
+                fold(nome): id for id, nome in
+                Habilidade.query.with_entities(Habilidade.id, Habilidade.nome).filter(Habilidade.nome.in_(faltando))
+            }
+            for nome in faltando:
+                if fold(nome) in por_nome:
+                    resultado[nome] = por_nome[fold(nome)]
+
+            # Nomes novos (ou que o snapshot ainda não tinha): o catálogo recarrega quando a transação for confirmada
+            habilidade_catalog.invalidate_on_commit(db.session())
+        return resultado
+
     def get_habilidades_by_user(user_id: int) -> List[Habilidade]:
         return UserRepo.get_user_habilidades(user_id)
     
@@ -0,0 +1,239 @@
+from extensions import db
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy.exc import IntegrityError
+from models import HistoricoServico, HorasUsuario, Inscricao, Usuario, Oportunidade, Organizacao
+from services.conquistas import motor_conquistas
+from .conquista_repo import ConquistaRepo
+
+# Diferença tolerada entre o total salvo e o recalculado (soma de floats)
+TOLERANCIA_HORAS = 1e-6
+
+CONTADORES = ('total_horas', 'total_servicos', 'total_oportunidades', 'total_organizacoes')
+
+class HistoricoRepo:
+    def create_historico(id_inscricao: int, horas_confirmadas: float, certificado_url: Optional[str] = None) -> Optional[HistoricoServico]:
+        if HistoricoRepo._contexto(id_inscricao) is None:
+            return None
+
+        historico = HistoricoServico(
+            id_inscricao=id_inscricao,
+            horas_confirmadas=horas_confirmadas,
+            certificado_url=certificado_url
+        )
+
+        # Histórico, totais do usuário e conquistas entram no mesmo commit
+        db.session.add(historico)
+        db.session.flush()
+        HistoricoRepo._evento(historico.id, id_inscricao, horas_confirmadas, 1)
+        db.session.commit()
+        return historico
+
+    def get_historico_by_id(id: int) -> Optional[HistoricoServico]:
+        return db.session.get(HistoricoServico, id)
+
+    def get_historico_by_usuario(id_usuario: int) -> List[HistoricoServico]:
+        return (
+            HistoricoServico.query
+            .join(Inscricao, Inscricao.id == HistoricoServico.id_inscricao)
+            .filter(Inscricao.id_usuario == id_usuario)
+            .all()
+        )
+
+    def update_historico(id: int, data: dict) -> Optional[HistoricoServico]:
+        historico = HistoricoRepo.get_historico_by_id(id)
+        if not historico:
+            return None
+
+        inscricao_antes, horas_antes = historico.id_inscricao, historico.horas_confirmadas
+        historico.update_from_dict(data)
+
+        if historico.id_inscricao == inscricao_antes:
+            contexto = HistoricoRepo._contexto(inscricao_antes)
+            if contexto is None:
+                db.session.rollback()
+                return None
+            id_usuario = contexto[0]
+            delta = historico.horas_confirmadas - horas_antes
+            HistoricoRepo._somar(id_usuario, {'total_horas': delta})
+            ConquistaRepo.avaliar(id_usuario, {'total_horas': delta})
+        else:
+            if HistoricoRepo._contexto(historico.id_inscricao) is None:
+                db.session.rollback()
+                return None
+            # O registro mudou de inscrição: sai dos totais antigos e entra nos novos
+            db.session.flush()
+            HistoricoRepo._evento(historico.id, inscricao_antes, horas_antes, -1)
+            HistoricoRepo._evento(historico.id, historico.id_inscricao, historico.horas_confirmadas, 1)
+
+        db.session.commit()
+        return historico
+
+    def delete_historico(id: int) -> bool:
+        historico = HistoricoRepo.get_historico_by_id(id)
+        if not historico:
+            return False
+
+        HistoricoRepo._evento(historico.id, historico.id_inscricao, historico.horas_confirmadas, -1)
+        db.session.delete(historico)
+        db.session.commit()
+        return True
+
+    def get_id_responsavel(id_inscricao: int) -> Optional[int]:
+        # Responsável pela organização da oportunidade: quem confirma as horas da inscrição
+        return db.session.scalar(
+            db.select(Organizacao.id_responsavel)
+            .join(Oportunidade, Oportunidade.id_organizacao == Organizacao.id)
+            .join(Inscricao, Inscricao.id_oportunidade == Oportunidade.id)
+            .where(Inscricao.id == id_inscricao)
+        )
+
+    # TOTAIS RELATED METHODS
+
+    def get_totais(id_usuario: int) -> dict:
+        # Leitura por chave primária: nenhuma agregação no momento da consulta
+        totais = db.session.get(HorasUsuario, id_usuario)
+        if not totais:
+            return {contador: 0 for contador in CONTADORES}
+        return {contador: getattr(totais, contador) for contador in CONTADORES}
+
+    def reconciliar_totais(batch_size: int = 500, corrigir: bool = True) -> dict:
+        """
+        Recalcula os totais a partir de historico_servico em lotes de usuários
+        (keyset por id) e compara com horas_usuario. Com `corrigir`, regrava os
+        divergentes, um commit por lote. Retorna quantos usuários foram verificados
+        e a lista de divergências encontradas.
+        """
+        verificados = 0
+        divergencias : List[dict] = []
+
+        for ids, reais in HistoricoRepo._totais_em_lotes(batch_size):
+            salvos = {t.id_usuario: t for t in HorasUsuario.query.filter(HorasUsuario.id_usuario.in_(ids))}
+
+            for uid in ids:
+                real = reais.get(uid, dict.fromkeys(CONTADORES, 0))
+                totais = salvos.get(uid)
+                salvo = {c: getattr(totais, c) if totais else 0 for c in CONTADORES}
+
+                if all(abs(real[c] - salvo[c]) <= TOLERANCIA_HORAS for c in CONTADORES):
+                    continue
+
+                divergencias.append({'id_usuario': uid, **salvo, **{c + '_real': real[c] for c in CONTADORES}})
+                if corrigir:
+                    if totais is None:
+                        db.session.add(HorasUsuario(uid, **real))
+                    else:
+                        for c in CONTADORES:
+                            setattr(totais, c, real[c])
+
+            db.session.commit()
+            verificados += len(ids)
+
+        return {'verificados': verificados, 'divergentes': len(divergencias), 'divergencias': divergencias}
+
+    def backfill_conquistas(batch_size: int = 500) -> int:
+        """
+        Concede as conquistas do histórico já existente, percorrendo os usuários
+        em lotes por id com os contadores agregados pelo banco; a concessão é
+        idempotente, então pode ser executado de novo. Retorna quantas regras
+        atingidas foram encontradas (inclui as já concedidas).
+        """
+        total = 0
+        for _, reais in HistoricoRepo._totais_em_lotes(batch_size):
+            pares = [(uid, regra.codigo) for uid, contadores in reais.items() for regra in motor_conquistas.atingidas(contadores)]
+            ConquistaRepo.conceder(pares)
+            db.session.commit()
+            total += len(pares)
+        return total
+
+    def _totais_em_lotes(batch_size: int):
+        """
+        Gera (ids, {id_usuario: contadores}) para lotes de usuários em ordem de id,
+        com os contadores calculados direto de historico_servico.
+        """
+        ultimo_id = 0
+        while True:
+            ids = [
+                uid for (uid,) in Usuario.query
+                .with_entities(Usuario.id)
+                .filter(Usuario.id > ultimo_id)
+                .order_by(Usuario.id)
+                .limit(batch_size)
+            ]
+            if not ids:
+                return
+
+            rows = (
+                db.session.query(
+                    Inscricao.id_usuario,
+                    db.func.sum(HistoricoServico.horas_confirmadas),
+                    db.func.count(HistoricoServico.id),
+                    db.func.count(db.distinct(HistoricoServico.id_inscricao)),
+                    db.func.count(db.distinct(Oportunidade.id_organizacao))
+                )
+                .join(HistoricoServico, HistoricoServico.id_inscricao == Inscricao.id)
+                .join(Oportunidade, Oportunidade.id == Inscricao.id_oportunidade)
+                .filter(Inscricao.id_usuario.in_(ids))
+                .group_by(Inscricao.id_usuario)
+            )
+            yield ids, {uid: dict(zip(CONTADORES, (horas or 0, *contagens))) for uid, horas, *contagens in rows}
+            ultimo_id = ids[-1]
+
+    def _contexto(id_inscricao: int) -> Optional[Tuple[int, int]]:
+        # (id_usuario, id_organizacao) da inscrição
+        return db.session.execute(
+            db.select(Inscricao.id_usuario, Oportunidade.id_organizacao)
+            .join(Oportunidade, Oportunidade.id == Inscricao.id_oportunidade)
+            .where(Inscricao.id == id_inscricao)
+        ).one_or_none()
+
+    def _evento(id_historico: int, id_inscricao: int, horas: float, sinal: int) -> None:
+        """
+        Aplica a entrada (sinal=1) ou saída (sinal=-1) de um registro de histórico
+        nos contadores do usuário e avalia as conquistas afetadas. Inscrição e
+        organização só contam no primeiro registro / saem no último, o que é
+        verificado com EXISTS sobre os outros registros. Não faz commit.
+        """
+        id_usuario, id_organizacao = HistoricoRepo._contexto(id_inscricao)
+        outros = HistoricoServico.id != id_historico
+
+        mesma_inscricao = db.session.scalar(db.select(db.exists().where(
+            HistoricoServico.id_inscricao == id_inscricao, outros
+        )))
+        mesma_organizacao = db.session.scalar(db.select(db.exists().where(
+            HistoricoServico.id_inscricao == Inscricao.id,
+            Inscricao.id_oportunidade == Oportunidade.id,
+            Inscricao.id_usuario == id_usuario,
+            Oportunidade.id_organizacao == id_organizacao,
+            outros
+        )))
+
+        deltas = {
+            'total_horas': sinal * horas,
+            'total_servicos': sinal,
+            'total_oportunidades': 0 if mesma_inscricao else sinal,
+            'total_organizacoes': 0 if mesma_organizacao else sinal
+        }
+        HistoricoRepo._somar(id_usuario, deltas)
+        ConquistaRepo.avaliar(id_usuario, deltas)
+
+    def _somar(id_usuario: int, deltas: Dict[str, float]) -> None:
+        """
+        Aplica os deltas aos totais do usuário com um UPDATE atômico (sem ler os
+        valores atuais). Na primeira vez, cria a linha num savepoint; se outra
+        transação a criou antes, repete o UPDATE. Não faz commit.
+        """
+        atualizar = (
+            db.update(HorasUsuario)
+            .where(HorasUsuario.id_usuario == id_usuario)
+            .values({getattr(HorasUsuario, c): getattr(HorasUsuario, c) + d for c, d in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+
+        if db.session.execute(atualizar).rowcount:
+            return
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(HorasUsuario(id_usuario, **deltas))
+        except IntegrityError:
+            db.session.execute(atualizar)
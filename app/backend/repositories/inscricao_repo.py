@@ -1,6 +1,31 @@
 from extensions import db
-from typing import Optional, List
-from models import Inscricao
+from datetime import datetime
+from typing import Optional, List, Dict, Iterable
+from sqlalchemy.exc import IntegrityError
+from models import Inscricao, Oportunidade, ListaEspera, Avaliacao
+from models.enums import StatusInscricao, StatusOportunidades
+from .pagination import Page
+from .projecao import INSCRICAO
+from .notificacao_repo import NotificacaoRepo, INSCRICAO_CRIADA, INSCRICAO_PROMOVIDA, DECISOES
+from .avaliacao_repo import AvaliacaoRepo
+
+class VagasEsgotadas(Exception):
+    """
+    Lançada quando a oportunidade não tem mais vagas livres.
+    """
+
+class OportunidadeIndisponivel(Exception):
+    """
+    Lançada quando a oportunidade não existe ou não está aberta.
+    """
+
+
+def _ocupa_vaga(status) -> bool:
+    # Inscrições pendentes e aprovadas seguram uma vaga; recusadas não
+    if isinstance(status, str):
+        status = StatusInscricao[status]
+    return status in (StatusInscricao.pendente, StatusInscricao.aprovada)
+
 
 class InscricaoRepo:
     def create_inscricao(
@@ -9,11 +34,28 @@ class InscricaoRepo:
         status_inscricao: str = 'pendente',
         data_aprovacao_recusa = None
     ) -> Optional[Inscricao]:
+        """
+        Reserva a vaga e cria a inscrição na mesma transação. A vaga é tomada por
+        um UPDATE condicional em vagas_restantes (sem contar inscrições) e a
+        duplicidade é barrada pela constraint única (id_usuario, id_oportunidade),
+        cujo erro desfaz também a reserva.
 
-        # Verifica se o usuário já está inscrito na oportunidade
-        inscricao_existente = InscricaoRepo.get_inscricao_by_usuario_oportunidade(id_usuario, id_oportunidade)
-        if inscricao_existente:
-            return None
+        Se o usuário estava na lista de espera da oportunidade, sai dela na
+        mesma transação.
+
+        Retorna None se o usuário já está inscrito; lança VagasEsgotadas ou
+        OportunidadeIndisponivel quando não há vaga a reservar.
+        """
+        if _ocupa_vaga(status_inscricao) and not InscricaoRepo._reservar_vaga(id_oportunidade):
+            db.session.rollback()
+
+            # Caminho de falha: descobre o motivo só agora
+            if InscricaoRepo.get_inscricao_by_usuario_oportunidade(id_usuario, id_oportunidade):
+                return None
+            oportunidade = db.session.get(Oportunidade, id_oportunidade)
+            if not oportunidade or oportunidade.status != StatusOportunidades.aberta:
+                raise OportunidadeIndisponivel()
+            raise VagasEsgotadas()
 
         inscricao = Inscricao(
             id_usuario=id_usuario,
@@ -23,7 +65,18 @@ class InscricaoRepo:
         )
 
         db.session.add(inscricao)
-        db.session.commit()
+        try:
+            db.session.flush()
+            db.session.execute(
+                db.delete(ListaEspera)
+                .where(ListaEspera.id_usuario == id_usuario, ListaEspera.id_oportunidade == id_oportunidade)
+            )
+            NotificacaoRepo.registrar(INSCRICAO_CRIADA, inscricao.id)
+            db.session.commit()
+        except IntegrityError:
+            # Já inscrito: o rollback devolve a vaga reservada acima
+            db.session.rollback()
+            return None
         return inscricao
 
     def get_inscricao_by_id(id: int) -> Optional[Inscricao]:   
@@ -32,11 +85,16 @@ class InscricaoRepo:
     def get_all_inscricoes() -> List[Inscricao]:
         return Inscricao.query.all()
 
+    def get_inscricoes_page(limit: int, cursor: Optional[str] = None, id_usuario: Optional[int] = None) -> Page:
+        # Itens já serializados (dicts), sem carregar o registro_presenca de cada inscrição
+        criterios = [] if id_usuario is None else [Inscricao.id_usuario == id_usuario]
+        return INSCRICAO.pagina(criterios, [Inscricao.id], limit, cursor)
+
     def get_inscricoes_by_usuario(id_usuario: int) -> List[Inscricao]:
         return Inscricao.query.filter_by(id_usuario=id_usuario).all()
 
-    def get_inscricoes_by_oportunidade(id_oportunidade: int) -> List[Inscricao]: 
-        return Inscricao.query.filter_by(id_oportunidade=id_oportunidade).all()
+    def get_inscricoes_by_oportunidade(id_oportunidade: int) -> List[dict]:
+        return INSCRICAO.todos(Inscricao.id_oportunidade == id_oportunidade)
 
     def get_inscricao_by_usuario_oportunidade(id_usuario: int, id_oportunidade: int) -> Optional[Inscricao]:   
         return Inscricao.query.filter_by(id_usuario=id_usuario, id_oportunidade=id_oportunidade).first()
@@ -49,15 +107,330 @@ class InscricaoRepo:
         if not inscricao:
             return None
 
-        inscricao.update_from_dict(data)
+        # Mudança de status pode tomar ou devolver a vaga (ex.: recusada -> aprovada)
+        if 'status_inscricao' in data:
+            novo = StatusInscricao[data['status_inscricao']]
+            antes = InscricaoRepo._trocar_status(id, novo)
+            if antes is None:
+                db.session.rollback()
+                return None
+            if _ocupa_vaga(novo) and not _ocupa_vaga(antes) and not InscricaoRepo._reservar_vaga(inscricao.id_oportunidade):
+                db.session.rollback()
+                raise VagasEsgotadas()
+            if _ocupa_vaga(antes) and not _ocupa_vaga(novo):
+                InscricaoRepo._liberar_vaga(inscricao.id_oportunidade)
+
+            # Aprovação ou recusa avisa o voluntário pela outbox, no mesmo commit
+            if novo != antes and novo in DECISOES:
+                NotificacaoRepo.registrar(DECISOES[novo], inscricao.id)
+
+        inscricao.update_from_dict({campo: valor for campo, valor in data.items() if campo != 'status_inscricao'})
         db.session.commit()
         return inscricao
 
+    def decidir_em_lote(id_organizacao: int, ids: Iterable[int], status: str, agora: datetime) -> Dict[int, str]:
+        """
+        Aprova ou recusa várias inscrições das oportunidades da organização com um
+        único UPDATE, carimbando a mesma data_aprovacao_recusa em todas. As vagas
+        são acertadas por oportunidade: recusas devolvem vagas (promovendo a lista
+        de espera) e aprovações de recusadas reservam as que houver.
+
+        Retorna o resultado de cada id: o novo status, 'inalterada',
+        'sem_vagas' ou 'nao_encontrada' (inexistente ou de outra organização).
+        Os eventos de notificação das decisões entram na outbox no mesmo
+        commit, num INSERT em lote.
+        """
+        ids = list(dict.fromkeys(ids))
+        novo = StatusInscricao[status]
+
+        # Uma leitura para o lote inteiro, já restrita à organização
+        rows = (
+            db.session.query(Inscricao.id, Inscricao.id_usuario, Inscricao.id_oportunidade, Inscricao.status_inscricao)
+            .join(Oportunidade, Oportunidade.id == Inscricao.id_oportunidade)
+            .filter(Inscricao.id.in_(ids), Oportunidade.id_organizacao == id_organizacao)
+            .order_by(Inscricao.id)
+            .with_for_update(of=Inscricao)
+            .all()
+        )
+
+        resultados = {id: 'nao_encontrada' for id in ids}
+        reservar : Dict[int, List[int]] = {}
+        liberar : Dict[int, int] = {}
+        aplicar = []
+
+        for id, _, id_oportunidade, atual in rows:
+            if atual == novo:
+                resultados[id] = 'inalterada'
+                continue
+            if _ocupa_vaga(novo) and not _ocupa_vaga(atual):
+                reservar.setdefault(id_oportunidade, []).append(id)
+                continue
+            if _ocupa_vaga(atual) and not _ocupa_vaga(novo):
+                liberar[id_oportunidade] = liberar.get(id_oportunidade, 0) + 1
+            aplicar.append(id)
+
+        for id_oportunidade, pendentes in reservar.items():
+            reservadas = InscricaoRepo._reservar_vagas(id_oportunidade, len(pendentes))
+            aplicar.extend(pendentes[:reservadas])
+            for id in pendentes[reservadas:]:
+                resultados[id] = 'sem_vagas'
+
+        if aplicar:
+            db.session.execute(
+                db.update(Inscricao)
+                .where(Inscricao.id.in_(aplicar))
+                .values(status_inscricao=novo, data_aprovacao_recusa=agora)
+            )
+
+        for id_oportunidade, quantidade in liberar.items():
+            InscricaoRepo._liberar_vagas(id_oportunidade, quantidade)
+
+        NotificacaoRepo.registrar_lote(DECISOES[novo], aplicar)
+        db.session.commit()
+
+        for id in aplicar:
+            resultados[id] = novo.name
+        return resultados
+
     def delete_inscricao(id: int) -> bool:
         inscricao = InscricaoRepo.get_inscricao_by_id(id)
         if not inscricao:
             return False
 
+        # Recusar antes de apagar: só quem tirou a inscrição de um status que
+        # segura vaga devolve essa vaga, mesmo com remoções simultâneas
+        antes = InscricaoRepo._trocar_status(id, StatusInscricao.recusada)
+        if antes is None:
+            db.session.rollback()
+            return False
+        if _ocupa_vaga(antes):
+            InscricaoRepo._liberar_vaga(inscricao.id_oportunidade)
+
+        # As avaliações da inscrição saem junto; os agregados dos alvos são descontados
+        AvaliacaoRepo.remover_em_cascata(Avaliacao.id_inscricao == id)
         db.session.delete(inscricao)
         db.session.commit()
         return True
+
+    def _trocar_status(id: int, novo: StatusInscricao) -> Optional[StatusInscricao]:
+        """
+        Troca o status com um UPDATE condicional no status lido (com FOR UPDATE
+        onde há suporte) e retorna o anterior, ou None se a inscrição não existe
+        mais. Se outra transação mudou o status no meio, relê e tenta de novo:
+        só quem efetivamente trocou acerta as vagas, então mudanças simultâneas
+        da mesma inscrição não tomam nem devolvem a vaga duas vezes.
+        Não faz commit.
+        """
+        while True:
+            atual = db.session.scalar(
+                db.select(Inscricao.status_inscricao).where(Inscricao.id == id).with_for_update()
+            )
+            if atual is None or atual == novo:
+                return atual
+
+            trocada = db.session.execute(
+                db.update(Inscricao)
+                .where(Inscricao.id == id, Inscricao.status_inscricao == atual)
+                .values(status_inscricao=novo)
+                .execution_options(synchronize_session='fetch')
+            ).rowcount == 1
+            if trocada:
+                return atual
+
+    # VAGAS RELATED METHODS
+
+    def _reservar_vaga(id_oportunidade: int) -> bool:
+        """
+        Toma uma vaga com um UPDATE condicional: só decrementa se ainda houver
+        vaga e a oportunidade estiver aberta. No MySQL o lock da linha fica até o
+        commit, então reservas concorrentes da mesma oportunidade nunca passam
+        de num_vagas. Não faz commit.
+        """
+        result = db.session.execute(
+            db.update(Oportunidade)
+            .where(
+                Oportunidade.id == id_oportunidade,
+                Oportunidade.status == StatusOportunidades.aberta,
+                Oportunidade.vagas_restantes > 0
+            )
+            .values(vagas_restantes=Oportunidade.vagas_restantes - 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def _liberar_vaga(id_oportunidade: int) -> None:
+        # A vaga passa direto para o primeiro da fila de espera; sem fila, volta ao contador
+        if InscricaoRepo._promover(id_oportunidade):
+            return
+
+        db.session.execute(
+            db.update(Oportunidade)
+            .where(Oportunidade.id == id_oportunidade)
+            .values(vagas_restantes=Oportunidade.vagas_restantes + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _reservar_vagas(id_oportunidade: int, quantidade: int) -> int:
+        """
+        Reserva até `quantidade` vagas de uma vez: trava a linha da oportunidade,
+        toma o que houver livre num único UPDATE e retorna quantas conseguiu.
+        Não faz commit.
+        """
+        livres = db.session.scalar(
+            db.select(Oportunidade.vagas_restantes)
+            .where(Oportunidade.id == id_oportunidade, Oportunidade.status == StatusOportunidades.aberta)
+            .with_for_update()
+        )
+        reservadas = min(quantidade, livres or 0)
+        if reservadas:
+            db.session.execute(
+                db.update(Oportunidade)
+                .where(Oportunidade.id == id_oportunidade)
+                .values(vagas_restantes=Oportunidade.vagas_restantes - reservadas)
+                .execution_options(synchronize_session=False)
+            )
+        return reservadas
+
+    def _liberar_vagas(id_oportunidade: int, quantidade: int) -> List[Inscricao]:
+        """
+        Versão em lote de _liberar_vaga: promove da lista de espera enquanto houver
+        fila e devolve o resto ao contador num único UPDATE. Retorna as inscrições
+        criadas pelas promoções. Não faz commit.
+        """
+        promovidas = []
+        while len(promovidas) < quantidade:
+            inscricao = InscricaoRepo._promover(id_oportunidade)
+            if not inscricao:
+                break
+            promovidas.append(inscricao)
+
+        if quantidade > len(promovidas):
+            db.session.execute(
+                db.update(Oportunidade)
+                .where(Oportunidade.id == id_oportunidade)
+                .values(vagas_restantes=Oportunidade.vagas_restantes + quantidade - len(promovidas))
+                .execution_options(synchronize_session=False)
+            )
+        return promovidas
+
+    def liberar_vagas_do_usuario(id_usuario: int) -> None:
+        # Antes de remover o usuário (as inscrições vão em cascata), devolve as vagas que ele ocupava
+        ocupadas = (
+            Inscricao.query
+            .with_entities(Inscricao.id_oportunidade)
+            .filter(
+                Inscricao.id_usuario == id_usuario,
+                Inscricao.status_inscricao.in_([StatusInscricao.pendente, StatusInscricao.aprovada])
+            )
+        )
+        for (id_oportunidade,) in ocupadas.all():
+            InscricaoRepo._liberar_vaga(id_oportunidade)
+
+    def preencher_vagas(id_oportunidade: int) -> int:
+        """
+        Passa vagas livres (ex.: após aumentar num_vagas) para a fila de espera,
+        uma reserva e uma promoção por vez. Retorna quantos foram promovidos.
+        Não faz commit.
+        """
+        promovidos = 0
+        while InscricaoRepo._reservar_vaga(id_oportunidade):
+            if not InscricaoRepo._promover(id_oportunidade):
+                InscricaoRepo._liberar_vaga(id_oportunidade)
+                break
+            promovidos += 1
+        return promovidos
+
+    # LISTA DE ESPERA RELATED METHODS
+
+    def entrar_lista_espera(id_usuario: int, id_oportunidade: int, prioridade: int = 0) -> Optional[ListaEspera]:
+        """
+        Coloca o usuário no fim da fila. A posição é calculada no próprio INSERT
+        (MAX(posicao) + 1 pelo índice único (id_oportunidade, posicao)); se outra
+        entrada concorrente pegar a mesma posição, tenta de novo.
+        Retorna None se o usuário já está na fila ou inscrito.
+        """
+        if InscricaoRepo.get_inscricao_by_usuario_oportunidade(id_usuario, id_oportunidade):
+            return None
+
+        proxima_posicao = (
+            db.select(
+                db.literal(id_usuario),
+                db.literal(id_oportunidade),
+                db.func.coalesce(db.func.max(ListaEspera.posicao), 0) + 1,
+                db.literal(prioridade)
+            )
+            .where(ListaEspera.id_oportunidade == id_oportunidade)
+        )
+
+        for _ in range(3):
+            try:
+                db.session.execute(
+                    db.insert(ListaEspera).from_select(['id_usuario', 'id_oportunidade', 'posicao', 'prioridade'], proxima_posicao)
+                )
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                if InscricaoRepo.get_lista_espera_entry(id_usuario, id_oportunidade):
+                    return None
+                continue
+
+            return InscricaoRepo.get_lista_espera_entry(id_usuario, id_oportunidade)
+        return None
+
+    def get_lista_espera_entry(id_usuario: int, id_oportunidade: int) -> Optional[ListaEspera]:
+        return ListaEspera.query.filter_by(id_usuario=id_usuario, id_oportunidade=id_oportunidade).first()
+
+    def get_lista_espera_by_id(id: int) -> Optional[ListaEspera]:
+        return db.session.get(ListaEspera, id)
+
+    def get_lista_espera(id_oportunidade: int, limit: int) -> List[ListaEspera]:
+        # Na ordem de promoção, lida direto do índice da fila
+        return (
+            ListaEspera.query
+            .filter_by(id_oportunidade=id_oportunidade)
+            .order_by(ListaEspera.prioridade.desc(), ListaEspera.posicao)
+            .limit(limit)
+            .all()
+        )
+
+    def sair_lista_espera(id: int) -> bool:
+        entrada = InscricaoRepo.get_lista_espera_by_id(id)
+        if not entrada:
+            return False
+
+        db.session.delete(entrada)
+        db.session.commit()
+        return True
+
+    def _promover(id_oportunidade: int) -> Optional[Inscricao]:
+        """
+        Tira a cabeça da fila (uma leitura no índice da fila, com SKIP LOCKED para
+        liberações concorrentes pegarem pessoas diferentes) e a inscreve com a vaga
+        que acabou de ser liberada. Quem já está inscrito (por outro caminho) só
+        sai da fila, e a vaga vai para o seguinte. O aviso ao promovido entra na
+        outbox na mesma transação. Não faz commit.
+        """
+        while True:
+            proximo : Optional[ListaEspera] = (
+                ListaEspera.query
+                .filter_by(id_oportunidade=id_oportunidade)
+                .order_by(ListaEspera.prioridade.desc(), ListaEspera.posicao)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if not proximo:
+                return None
+
+            db.session.delete(proximo)
+            db.session.flush()
+
+            # A constraint única barra quem já tem inscrição; o savepoint preserva a saída da fila
+            inscricao = Inscricao(id_usuario=proximo.id_usuario, id_oportunidade=id_oportunidade)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(inscricao)
+            except IntegrityError:
+                continue
+
+            NotificacaoRepo.registrar(INSCRICAO_PROMOVIDA, inscricao.id)
+            return inscricao
@@ -0,0 +1,311 @@
+from extensions import db
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from models import OutboxEvento, EmailPendente, Notificacao, Usuario, Oportunidade, Organizacao, Inscricao, OportunidadeHabilidade, VoluntarioHabilidade
+from models.enums import StatusOportunidades, StatusInscricao
+from services.email import Mensagem, correio
+from .pagination import Page, paginate
+
+OPORTUNIDADE_CRIADA = 'oportunidade_criada'
+INSCRICAO_CRIADA = 'inscricao_criada'
+INSCRICAO_APROVADA = 'inscricao_aprovada'
+INSCRICAO_RECUSADA = 'inscricao_recusada'
+INSCRICAO_PROMOVIDA = 'inscricao_promovida'
+
+# Tipo do evento de cada decisão da organização sobre uma inscrição
+DECISOES = {
+    StatusInscricao.aprovada: INSCRICAO_APROVADA,
+    StatusInscricao.recusada: INSCRICAO_RECUSADA,
+}
+
+# Teto do intervalo entre retentativas (s)
+BACKOFF_MAXIMO = 6 * 60 * 60
+
+# Por quanto tempo (s) os emails tomados por um despachante ficam fora da fila
+# enquanto ele envia; se o processo morrer no meio, voltam depois desse prazo
+PRAZO_ENVIO = 10 * 60
+
+class NotificacaoRepo:
+    def registrar(tipo: str, id_referencia: int) -> None:
+        # Grava o evento na transação de quem chamou. Não faz commit.
+        db.session.add(OutboxEvento(tipo, id_referencia))
+
+    def registrar_lote(tipo: str, ids_referencia: List[int]) -> None:
+        # Vários eventos do mesmo tipo num INSERT em lote, na transação de quem chamou. Não faz commit.
+        if ids_referencia:
+            db.session.execute(db.insert(OutboxEvento), [{'tipo': tipo, 'id_referencia': id} for id in ids_referencia])
+
+    def get_notificacoes_page(id_usuario: int, limit: int, cursor=None, apenas_nao_lidas: bool = False) -> Page:
+        query = Notificacao.query.filter_by(id_usuario=id_usuario)
+        if apenas_nao_lidas:
+            query = query.filter_by(lida=False)
+        return paginate(query, [Notificacao.id], limit, cursor)
+
+    def marcar_lidas(id_usuario: int, ids: List[int]) -> int:
+        result = db.session.execute(
+            db.update(Notificacao)
+            .where(Notificacao.id_usuario == id_usuario, Notificacao.id.in_(ids))
+            .values(lida=True)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    # DESPACHANTE RELATED METHODS
+
+    def despachar_lote(lote: int, max_tentativas: int, backoff: float) -> int:
+        """
+        Consome até `lote` eventos pendentes (SKIP LOCKED, então vários
+        despachantes podem rodar juntos). Eventos repetidos do mesmo tipo e
+        referência são tratados uma vez só, e cada tipo é processado em
+        conjunto: notificações in-app com um INSERT em lote e os emails, um
+        por destinatário, na fila de email_pendente (enviados por
+        `enviar_emails`, depois do commit). Um tipo que falha não grava nada
+        e volta para a fila com backoff exponencial; após `max_tentativas`, é
+        encerrado com o erro registrado. Retorna quantos eventos foram
+        consumidos.
+
+        Os horários da outbox usam só o relógio do banco (o mesmo do
+        CURRENT_TIMESTAMP que preenche criado_em e proxima_tentativa), para que
+        a fila não dependa do fuso ou do relógio de cada processo.
+        """
+        agora = NotificacaoRepo._agora()
+        eventos : List[OutboxEvento] = (
+            OutboxEvento.query
+            .filter(OutboxEvento.processado_em.is_(None), OutboxEvento.proxima_tentativa <= agora)
+            .order_by(OutboxEvento.proxima_tentativa, OutboxEvento.id)
+            .limit(lote)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not eventos:
+            return 0
+
+        por_tipo : Dict[str, List[OutboxEvento]] = {}
+        for evento in eventos:
+            por_tipo.setdefault(evento.tipo, []).append(evento)
+
+        for tipo, grupo in por_tipo.items():
+            try:
+                with db.session.begin_nested():
+                    NotificacaoRepo._enfileirar(HANDLERS[tipo]({e.id_referencia for e in grupo}))
+            except Exception as erro:
+                for evento in grupo:
+                    NotificacaoRepo._falhou(evento, erro, agora, max_tentativas, backoff)
+            else:
+                for evento in grupo:
+                    evento.processado_em = agora
+                    evento.erro = None
+
+        db.session.commit()
+        return len(eventos)
+
+    def enviar_emails(lote: int, max_tentativas: int, backoff: float) -> int:
+        """
+        Envia até `lote` emails pendentes. Os emails são tomados com SKIP
+        LOCKED e adiados por PRAZO_ENVIO num commit curto, então o envio
+        acontece sem nenhum lock aberto no banco. Cada email conta as próprias
+        tentativas: um destinatário recusado volta para a fila sozinho, com o
+        mesmo backoff da outbox. Retorna quantos emails foram tentados.
+        """
+        agora = NotificacaoRepo._agora()
+        pendentes : List[EmailPendente] = (
+            EmailPendente.query
+            .filter(EmailPendente.processado_em.is_(None), EmailPendente.proxima_tentativa <= agora)
+            .order_by(EmailPendente.proxima_tentativa, EmailPendente.id)
+            .limit(lote)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not pendentes:
+            return 0
+
+        mensagens = [Mensagem(e.para, e.assunto, e.corpo) for e in pendentes]
+        for email in pendentes:
+            email.proxima_tentativa = agora + timedelta(seconds=PRAZO_ENVIO)
+        db.session.commit()
+
+        erros = correio.enviar(mensagens)
+
+        agora = NotificacaoRepo._agora()
+        enviados = [email.id for email, erro in zip(pendentes, erros) if erro is None]
+        if enviados:
+            db.session.execute(
+                db.update(EmailPendente)
+                .where(EmailPendente.id.in_(enviados))
+                .values(processado_em=agora, erro=None)
+                .execution_options(synchronize_session=False)
+            )
+        for email, erro in zip(pendentes, erros):
+            if erro is not None:
+                NotificacaoRepo._falhou(email, erro, agora, max_tentativas, backoff)
+
+        db.session.commit()
+        return len(pendentes)
+
+    def limpar_outbox(dias: int = 7) -> int:
+        # Remove eventos e emails já processados há mais de `dias` dias
+        limite = NotificacaoRepo._agora() - timedelta(days=dias)
+        removidos = sum(
+            modelo.query.filter(modelo.processado_em < limite).delete(synchronize_session=False)
+            for modelo in (OutboxEvento, EmailPendente)
+        )
+        db.session.commit()
+        return removidos
+
+    def _agora() -> datetime:
+        return db.session.scalar(db.select(db.func.now()))
+
+    def _enfileirar(mensagens: List[Mensagem]) -> None:
+        # Emails do despacho num INSERT em lote, na mesma transação das notificações in-app
+        if mensagens:
+            db.session.execute(db.insert(EmailPendente), [m._asdict() for m in mensagens])
+
+    def _falhou(evento, erro: Exception, agora: datetime, max_tentativas: int, backoff: float) -> None:
+        # Vale para eventos da outbox e emails pendentes: mesmas colunas de tentativa
+        evento.tentativas += 1
+        evento.erro = f'{type(erro).__name__}: {erro}'[:1024]
+        if evento.tentativas >= max_tentativas:
+            evento.processado_em = agora
+        else:
+            evento.proxima_tentativa = agora + timedelta(seconds=min(backoff * 2 ** (evento.tentativas - 1), BACKOFF_MAXIMO))
+
+    def _inserir(linhas: List[dict]) -> None:
+        # INSERT em lote que ignora as notificações já existentes (reprocessamento)
+        if linhas:
+            db.session.execute(
+                db.insert(Notificacao)
+                .prefix_with('IGNORE', dialect='mysql')
+                .prefix_with('OR IGNORE', dialect='sqlite'),
+                linhas
+            )
+
+    def _oportunidades_criadas(ids: set) -> List[Mensagem]:
+        """
+        Notifica os voluntários ativos que moram na comunidade da oportunidade
+        ou têm alguma das habilidades pedidas: uma consulta para o lote inteiro,
+        um INSERT em lote e um email por voluntário listando as novidades.
+        """
+        tem_habilidade = db.exists().where(
+            VoluntarioHabilidade.id_usuario == Usuario.id,
+            VoluntarioHabilidade.id_habilidade == OportunidadeHabilidade.id_habilidade,
+            OportunidadeHabilidade.id_oportunidade == Oportunidade.id
+        )
+        rows = (
+            db.session.query(Usuario.id, Usuario.email, Oportunidade.id, Oportunidade.titulo)
+            .join(Oportunidade, db.or_(
+                Oportunidade.comunidade == Usuario.cidade,
+                Oportunidade.comunidade == Usuario.bairro,
+                tem_habilidade
+            ))
+            .filter(
+                Oportunidade.id.in_(ids),
+                Oportunidade.status == StatusOportunidades.aberta,
+                Usuario.tipo_usuario == 'regular',
+                Usuario.conta_ativa.is_(True)
+            )
+            .all()
+        )
+
+        NotificacaoRepo._inserir([
+            {'id_usuario': uid, 'tipo': OPORTUNIDADE_CRIADA, 'id_referencia': oid, 'mensagem': f'Nova oportunidade: {titulo}'[:512]}
+            for uid, _, oid, titulo in rows
+        ])
+
+        por_email : Dict[str, List[str]] = {}
+        for _, email, _, titulo in rows:
+            por_email.setdefault(email, []).append(titulo)
+        return [
+            Mensagem(email, 'Novas oportunidades para você', 'Novas oportunidades de voluntariado:\n\n' + '\n'.join(f'- {t}' for t in titulos))
+            for email, titulos in por_email.items()
+        ]
+
+    def _inscricoes_criadas(ids: set) -> List[Mensagem]:
+        """
+        Avisa o responsável de cada organização sobre as novas inscrições: uma
+        notificação in-app por inscrição e um único email por organização.
+        """
+        rows : List[Tuple] = (
+            db.session.query(Inscricao.id, Organizacao.id_responsavel, Organizacao.email_institucional, Oportunidade.titulo, Usuario.nome_completo)
+            .join(Oportunidade, Oportunidade.id == Inscricao.id_oportunidade)
+            .join(Organizacao, Organizacao.id == Oportunidade.id_organizacao)
+            .join(Usuario, Usuario.id == Inscricao.id_usuario)
+            .filter(Inscricao.id.in_(ids))
+            .all()
+        )
+
+        NotificacaoRepo._inserir([
+            {'id_usuario': id_responsavel, 'tipo': INSCRICAO_CRIADA, 'id_referencia': iid, 'mensagem': f'Nova inscrição de {nome} em {titulo}'[:512]}
+            for iid, id_responsavel, _, titulo, nome in rows
+        ])
+
+        por_email : Dict[str, List[str]] = {}
+        for _, _, email, titulo, nome in rows:
+            por_email.setdefault(email, []).append(f'- {nome} em {titulo}')
+        return [
+            Mensagem(email, f'{len(linhas)} nova(s) inscrição(ões)', 'Novas inscrições nas suas oportunidades:\n\n' + '\n'.join(linhas))
+            for email, linhas in por_email.items()
+        ]
+
+    def _inscricoes_decididas(ids: set, status: StatusInscricao) -> List[Mensagem]:
+        """
+        Avisa cada voluntário da decisão sobre a inscrição: uma notificação
+        in-app por inscrição e um único email por voluntário. Inscrições cujo
+        status mudou de novo antes do despacho ficam para o evento da mudança
+        seguinte.
+        """
+        rows : List[Tuple] = (
+            db.session.query(Inscricao.id, Usuario.id, Usuario.email, Oportunidade.titulo)
+            .join(Oportunidade, Oportunidade.id == Inscricao.id_oportunidade)
+            .join(Usuario, Usuario.id == Inscricao.id_usuario)
+            .filter(Inscricao.id.in_(ids), Inscricao.status_inscricao == status)
+            .all()
+        )
+
+        situacao = status.name
+        NotificacaoRepo._inserir([
+            {'id_usuario': uid, 'tipo': DECISOES[status], 'id_referencia': iid, 'mensagem': f'Sua inscrição em {titulo} foi {situacao}'[:512]}
+            for iid, uid, _, titulo in rows
+        ])
+
+        por_email : Dict[str, List[str]] = {}
+        for _, _, email, titulo in rows:
+            por_email.setdefault(email, []).append(f'- {titulo}')
+        return [
+            Mensagem(email, f'Inscrição {situacao}', f'Inscrições {situacao}s pela organização:\n\n' + '\n'.join(linhas))
+            for email, linhas in por_email.items()
+        ]
+
+    def _inscricoes_promovidas(ids: set) -> List[Mensagem]:
+        """
+        Avisa quem saiu da lista de espera e ganhou a vaga: uma notificação
+        in-app e um email por voluntário.
+        """
+        rows : List[Tuple] = (
+            db.session.query(Inscricao.id, Usuario.id, Usuario.email, Oportunidade.titulo)
+            .join(Oportunidade, Oportunidade.id == Inscricao.id_oportunidade)
+            .join(Usuario, Usuario.id == Inscricao.id_usuario)
+            .filter(Inscricao.id.in_(ids))
+            .all()
+        )
+
+        NotificacaoRepo._inserir([
+            {'id_usuario': uid, 'tipo': INSCRICAO_PROMOVIDA, 'id_referencia': iid, 'mensagem': f'Abriu uma vaga em {titulo} e você saiu da lista de espera'[:512]}
+            for iid, uid, _, titulo in rows
+        ])
+
+        por_email : Dict[str, List[str]] = {}
+        for _, _, email, titulo in rows:
+            por_email.setdefault(email, []).append(f'- {titulo}')
+        return [
+            Mensagem(email, 'Você saiu da lista de espera', 'Abriram vagas e você foi inscrito em:\n\n' + '\n'.join(linhas))
+            for email, linhas in por_email.items()
+        ]
+
+
+HANDLERS = {
+    OPORTUNIDADE_CRIADA: NotificacaoRepo._oportunidades_criadas,
+    INSCRICAO_CRIADA: NotificacaoRepo._inscricoes_criadas,
+    INSCRICAO_APROVADA: lambda ids: NotificacaoRepo._inscricoes_decididas(ids, StatusInscricao.aprovada),
+    INSCRICAO_RECUSADA: lambda ids: NotificacaoRepo._inscricoes_decididas(ids, StatusInscricao.recusada),
+    INSCRICAO_PROMOVIDA: NotificacaoRepo._inscricoes_promovidas,
+}
@@ -1,8 +1,25 @@
 from extensions import db
+from datetime import datetime
 from typing import Optional, List
 from models import Oportunidade
 from models import OportunidadeHabilidade
 from models import Habilidade
+from models import OportunidadeTag
+from models import Inscricao, Avaliacao
+from models.enums import StatusOportunidades
+from .pagination import Page
+from .projecao import OPORTUNIDADE
+from .tag_repo import TagRepo, normalizar_tag
+from .feed_repo import FeedRepo
+from .inscricao_repo import InscricaoRepo
+from .notificacao_repo import NotificacaoRepo, OPORTUNIDADE_CRIADA
+from .avaliacao_repo import AvaliacaoRepo
+from .segundo_plano import em_segundo_plano
+from .vinculos import sync_links
+from services.text_index import oportunidade_index
+
+# Campos que mudam o conjunto de candidatas do feed ou o score delas
+CAMPOS_DO_FEED = ('comunidade', 'data_hora', 'status')
 
 class OportunidadeRepo:
     def create_oportunidade(
@@ -20,7 +37,7 @@ class OportunidadeRepo:
     ) -> Optional[Oportunidade]:
         
         oportunidade = Oportunidade(
-            organizaçao_id=id_organizacao,
+            id_organizacao=id_organizacao,
             titulo=titulo,
             descricao=descricao,
             local_endereco=local_endereco,
@@ -28,13 +45,20 @@ class OportunidadeRepo:
             data_hora=data_hora,
             duracao_horas=duracao_horas,
             num_vagas=num_vagas,
-            requisitos=requisitos,
             tags=tags
         )
 
-        OportunidadeRepo.update_oportunidade_habilidades(oportunidade, habilidades or [])
+        # Oportunidade e habilidades entram no mesmo commit
         db.session.add(oportunidade)
+        db.session.flush()
+
+        OportunidadeRepo.sync_habilidades(oportunidade.id, habilidades or [], nova_oportunidade=True)
+        TagRepo.sync_oportunidade_tags(oportunidade.id, tags, nova_oportunidade=True)
+        FeedRepo.invalidate_area(comunidade)
+        NotificacaoRepo.registrar(OPORTUNIDADE_CRIADA, oportunidade.id)
         db.session.commit()
+
+        OportunidadeRepo._indexar(oportunidade)
         return oportunidade
 
     def get_oportunidade_by_id(id: int) -> Optional[Oportunidade]:
@@ -43,34 +67,196 @@ class OportunidadeRepo:
     def get_all_oportunidades() -> List[Oportunidade]:
         return Oportunidade.query.all()
 
-    def get_oportunidades_by_organizacao(id_organizacao: int) -> List[Oportunidade]:
-        return Oportunidade.query.filter_by(organizaçao_id=id_organizacao).all()
+    def get_oportunidades_page(limit: int, cursor: Optional[str] = None) -> Page:
+        # Itens já serializados (dicts), lidos só com as colunas do to_dict
+        return OPORTUNIDADE.pagina([], [Oportunidade.data_hora, Oportunidade.id], limit, cursor)
+
+    def get_oportunidades_by_organizacao(id_organizacao: int) -> List[dict]:
+        return OPORTUNIDADE.todos(Oportunidade.id_organizacao == id_organizacao)
 
     def get_oportunidades_abertas() -> List[Oportunidade]:
-        return Oportunidade.query.filter_by(status='aberto').all()
+        return Oportunidade.query.filter_by(status=StatusOportunidades.aberta).all()
+
+    def search_oportunidades(
+        limit: int,
+        cursor: Optional[str] = None,
+        comunidade: Optional[str] = None,
+        habilidade_ids: Optional[List[int]] = None,
+        tags: Optional[List[str]] = None,
+        todas_tags: bool = False,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        duracao_min: Optional[int] = None,
+        duracao_max: Optional[int] = None,
+        apenas_abertas: bool = True
+    ) -> Page:
+        """
+        Busca paginada (keyset em data_hora, id) que só emite os predicados dos
+        filtros informados, para o otimizador escolher o índice composto adequado:
+        (status, data_hora) ou (comunidade, data_hora). Com `tags`, filtra as
+        oportunidades que têm alguma delas (ou todas, com `todas_tags`). Os
+        itens vêm serializados (dicts), pela leitura projetada.
+        """
+        filtros = []
+
+        if tags:
+            filtro_tags = OportunidadeRepo._filtro_tags(tags, todas_tags)
+            if filtro_tags is None:
+                return Page([], None)
+            filtros.append(filtro_tags)
+
+        if apenas_abertas:
+            filtros.append(Oportunidade.status == StatusOportunidades.aberta)
+        if comunidade:
+            filtros.append(Oportunidade.comunidade == comunidade)
+        if data_inicio:
+            filtros.append(Oportunidade.data_hora >= data_inicio)
+        if data_fim:
+            filtros.append(Oportunidade.data_hora <= data_fim)
+        if duracao_min is not None:
+            filtros.append(Oportunidade.duracao_horas >= duracao_min)
+        if duracao_max is not None:
+            filtros.append(Oportunidade.duracao_horas <= duracao_max)
+        if habilidade_ids:
+            # Oportunidades que pedem ao menos uma das habilidades (usa o índice único do vínculo)
+            filtros.append(
+                db.exists().where(
+                    OportunidadeHabilidade.id_oportunidade == Oportunidade.id,
+                    OportunidadeHabilidade.id_habilidade.in_(habilidade_ids)
+                )
+            )
+
+        return OPORTUNIDADE.pagina(filtros, [Oportunidade.data_hora, Oportunidade.id], limit, cursor)
+
+    def get_oportunidades_by_tags(tags: List[str], todas: bool, limit: int, cursor: Optional[str] = None) -> Page:
+        return OportunidadeRepo.search_oportunidades(limit, cursor, tags=tags, todas_tags=todas, apenas_abertas=False)
+
+    def _filtro_tags(tags: List[str], todas: bool):
+        """
+        Monta o predicado de tags sobre oportunidade_tag, ou None quando nenhuma
+        oportunidade pode satisfazê-lo (tags inexistentes).
+        """
+        nomes = {normalizar_tag(nome) for nome in tags if nome and nome.strip()}
+        ids = set(TagRepo.get_ids_by_names(nomes).values())
+
+        if not ids or (todas and len(ids) < len(nomes)):
+            return None
+
+        if not todas:
+            # Alguma das tags: EXISTS pelo índice único (id_oportunidade, id_tag)
+            return db.exists().where(
+                OportunidadeTag.id_oportunidade == Oportunidade.id,
+                OportunidadeTag.id_tag.in_(ids)
+            )
+
+        # Todas as tags: agrupa o índice invertido (id_tag, id_oportunidade)
+        com_todas = (
+            db.select(OportunidadeTag.id_oportunidade)
+            .where(OportunidadeTag.id_tag.in_(ids))
+            .group_by(OportunidadeTag.id_oportunidade)
+            .having(db.func.count() == len(ids))
+        )
+        return Oportunidade.id.in_(com_todas)
 
     def update_oportunidade(id: int, data: dict) -> Optional[Oportunidade]:
         oportunidade = OportunidadeRepo.get_oportunidade_by_id(id)
 
         if not oportunidade:
             return None
+
+        num_vagas = data.pop("num_vagas", None)
+        if num_vagas is not None:
+            OportunidadeRepo.update_num_vagas(oportunidade.id, num_vagas)
+            InscricaoRepo.preencher_vagas(oportunidade.id)
         
         # tu ja sabe pra que serve
-        OportunidadeRepo.update_oportunidade_habilidades(oportunidade, data.get("habilidades", []))
-        data.pop("habilidades", None)
+        habilidades = data.pop("habilidades", None)
+        if habilidades is not None:
+            OportunidadeRepo.sync_habilidades(oportunidade.id, habilidades)
+
+        if 'tags' in data:
+            TagRepo.sync_oportunidade_tags(oportunidade.id, data['tags'])
+
+        # Feeds da área antiga e da nova (se a comunidade mudou), só quando muda algo que o feed usa
+        if habilidades is not None or any(campo in data and data[campo] != getattr(oportunidade, campo) for campo in CAMPOS_DO_FEED):
+            FeedRepo.invalidate_area(oportunidade.comunidade, data.get('comunidade'))
 
         oportunidade.update_from_dict(data)
         db.session.commit()
+
+        OportunidadeRepo._indexar(oportunidade)
         return oportunidade
 
+    def update_num_vagas(id: int, num_vagas: int) -> None:
+        """
+        Altera num_vagas e desloca vagas_restantes pela mesma diferença num único
+        UPDATE condicional, sem contar inscrições. Lança ValueError (após rollback)
+        se o novo total for menor que as vagas já ocupadas. Não faz commit.
+        """
+        ocupadas = Oportunidade.num_vagas - Oportunidade.vagas_restantes
+        result = db.session.execute(
+            db.update(Oportunidade)
+            .where(Oportunidade.id == id, ocupadas <= num_vagas)
+            .values(
+                vagas_restantes=Oportunidade.vagas_restantes + (num_vagas - Oportunidade.num_vagas),
+                num_vagas=num_vagas
+            )
+            .execution_options(synchronize_session='fetch')
+        )
+        if result.rowcount == 0:
+            db.session.rollback()
+            raise ValueError('num_vagas menor que as vagas ocupadas')
+
     def delete_oportunidade(id: int) -> bool:
         oportunidade = OportunidadeRepo.get_oportunidade_by_id(id)
         if not oportunidade:
             return False
 
+        FeedRepo.invalidate_area(oportunidade.comunidade)
+        # Inscrições vão em cascata, e as avaliações delas também
+        AvaliacaoRepo.remover_em_cascata(Avaliacao.id_inscricao.in_(
+            db.select(Inscricao.id).where(Inscricao.id_oportunidade == id)
+        ))
         db.session.delete(oportunidade)
         db.session.commit()
+
+        oportunidade_index.remove(id)
         return True
+
+    # FULL-TEXT SEARCH RELATED METHODS
+
+    def buscar_texto(consulta: str, limit: int) -> List[Oportunidade]:
+        """
+        Busca por palavras-chave no índice invertido em memória e carrega as
+        oportunidades encontradas, na ordem de relevância.
+        """
+        oportunidade_index.garantir(OportunidadeRepo._documentos, lambda tarefa: em_segundo_plano(tarefa, 'reindexar-busca'))
+
+        ids = [doc_id for doc_id, _ in oportunidade_index.search(consulta, limit)]
+        if not ids:
+            return []
+
+        por_id = {o.id: o for o in Oportunidade.query.filter(Oportunidade.id.in_(ids))}
+        return [por_id[i] for i in ids if i in por_id]
+
+    def rebuild_text_index() -> None:
+        oportunidade_index.rebuild(OportunidadeRepo._documentos())
+
+    def _documentos():
+        # (id, titulo, descricao, tags) das oportunidades abertas, lidos em blocos
+        return (
+            Oportunidade.query
+            .with_entities(Oportunidade.id, Oportunidade.titulo, Oportunidade.descricao, Oportunidade.tags)
+            .filter(Oportunidade.status == StatusOportunidades.aberta)
+            .yield_per(1000)
+        )
+
+    def _indexar(oportunidade: Oportunidade) -> None:
+        # Só oportunidades abertas ficam no índice de busca
+        if oportunidade.status == StatusOportunidades.aberta:
+            oportunidade_index.upsert(oportunidade.id, oportunidade.titulo, oportunidade.descricao, oportunidade.tags)
+        else:
+            oportunidade_index.remove(oportunidade.id)
     
     # HABILIDADES RELATED METHODS
     
@@ -100,22 +286,25 @@ class OportunidadeRepo:
         db.session.commit()
         return True
     
-    def update_oportunidade_habilidades(oportunidade_id: int, habilidade_ids: List[int]) -> None:
-        oportunidade = OportunidadeRepo.get_oportunidade_by_id(oportunidade_id)
+    def update_oportunidade_habilidades(oportunidade_id: int, habilidade_ids: List[int]) -> bool:
+        oportunidade = db.session.get(Oportunidade, oportunidade_id)
         if not oportunidade:
             return False
-        current_habilidades = OportunidadeRepo.get_oportunidade_habilidades(oportunidade)
-        current_habilidade_ids = {oh.id_habilidade for oh in current_habilidades}
-
-        # Add new habilidades
-        for hab_id in habilidade_ids:
-            if hab_id not in current_habilidade_ids:
-                OportunidadeRepo.add_habilidade_to_oportunidade(oportunidade, hab_id)
-
-        # Remove old habilidades
-        for oh in current_habilidades:
-            if oh.id_habilidade not in habilidade_ids:
-                OportunidadeRepo.remove_habilidade_from_oportunidade(oportunidade, oh.id_habilidade)
+
+        OportunidadeRepo.sync_habilidades(oportunidade.id, habilidade_ids)
+        db.session.commit()
+        return True
+
+    def sync_habilidades(oportunidade_id: int, habilidade_ids: List[int], nova_oportunidade: bool = False) -> None:
+        """
+        Sincroniza as habilidades da oportunidade com `habilidade_ids`, ignorando
+        ids inexistentes (um SELECT a mais). Não faz commit.
+        """
+        desejadas = set(habilidade_ids)
+        if desejadas:
+            desejadas = {hid for (hid,) in Habilidade.query.with_entities(Habilidade.id).filter(Habilidade.id.in_(desejadas))}
+
+        sync_links(OportunidadeHabilidade.id_oportunidade, OportunidadeHabilidade.id_habilidade, oportunidade_id, desejadas, nova_oportunidade)
     
     def get_oportunidade_habilidade_by_id(oportunidade_id: str, habilidade_id: int) -> Optional[int]:
         oportunidade = OportunidadeRepo.get_oportunidade_by_id(oportunidade_id)
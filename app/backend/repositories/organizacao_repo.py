@@ -1,7 +1,11 @@
 from extensions import db
 from typing import Optional, List
 from datetime import datetime
-from models import Organizacao
+from models import Organizacao, Oportunidade, Inscricao, Avaliacao
+from models.enums import AlvoAvaliacao
+from .pagination import Page
+from .projecao import ORGANIZACAO
+from .avaliacao_repo import AvaliacaoRepo
 
 class OrganizacaoRepo:
     def create_organizacao(
@@ -46,8 +50,15 @@ class OrganizacaoRepo:
     def get_organizacao_by_cnpj(cnpj) -> Optional[Organizacao]:
         return Organizacao.query.filter_by(cnpj=cnpj).first()
 
+    def get_organizacoes_by_responsavel(id_responsavel: int) -> List[Organizacao]:
+        return Organizacao.query.filter_by(id_responsavel=id_responsavel).order_by(Organizacao.id).all()
+
     def get_all_organizacoes() -> List[Organizacao]:
         return Organizacao.query.all()
+
+    def get_organizacoes_page(limit: int, cursor: Optional[str] = None) -> Page:
+        # Itens já serializados (dicts), com o resumo de avaliações no mesmo SELECT
+        return ORGANIZACAO.pagina([], [Organizacao.id], limit, cursor)
     
     def update_organizacao(id: Organizacao, data: dict) -> Organizacao:
         organizacao = OrganizacaoRepo.get_organizacao_by_id(id)
@@ -63,10 +74,23 @@ class OrganizacaoRepo:
         organizacao = OrganizacaoRepo.get_organizacao_by_id(id)
         if not organizacao:
             return False
-        
+
+        # Oportunidades e inscrições vão em cascata, e as avaliações delas também
+        AvaliacaoRepo.remover_em_cascata(
+            Avaliacao.id_inscricao.in_(OrganizacaoRepo.select_inscricoes(id)),
+            alvos_removidos=[(AlvoAvaliacao.organizacao, id)]
+        )
         db.session.delete(organizacao)
         db.session.commit()
         
         return True
 
     
+
+    def select_inscricoes(*ids_organizacao: int):
+        # SELECT dos ids das inscrições nas oportunidades das organizações
+        return (
+            db.select(Inscricao.id)
+            .join(Oportunidade, Oportunidade.id == Inscricao.id_oportunidade)
+            .where(Oportunidade.id_organizacao.in_(ids_organizacao))
+        )
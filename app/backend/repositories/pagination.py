@@ -0,0 +1,102 @@
+import json
+import base64
+from datetime import datetime, date
+from typing import Optional, List, Any, Mapping, Tuple
+from sqlalchemy.sql import Select
+from extensions import db
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+class Page:
+    """
+    Uma página de resultados e o cursor opaco da próxima (None na última página).
+    """
+    def __init__(self, items: List[Any], next_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+
+
+def page_args(args: Mapping) -> Tuple[int, Optional[str]]:
+    """
+    Lê `limit` e `cursor` da query string. Lança ValueError se `limit` for inválido.
+    """
+    limit = int(args.get('limit', DEFAULT_LIMIT))
+    if limit < 1:
+        raise ValueError('limit deve ser positivo')
+    return min(limit, MAX_LIMIT), args.get('cursor') or None
+
+
+def page_headers(page: Page) -> dict:
+    # O corpo continua sendo a lista de itens; o cursor da próxima página vai no header
+    return {'X-Next-Cursor': page.next_cursor} if page.next_cursor else {}
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (datetime, date)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, columns) -> List[Any]:
+    """
+    Decodifica o cursor convertendo cada valor para o tipo Python da coluna
+    correspondente. Lança ValueError se o cursor for inválido.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError('cursor inválido')
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('cursor inválido')
+
+    decoded = []
+    for value, column in zip(values, columns):
+        python_type = column.type.python_type
+        if python_type in (datetime, date):
+            # fromisoformat lança TypeError para o que não é texto (ex.: um número no lugar da data)
+            if not isinstance(value, str):
+                raise ValueError('cursor inválido')
+            value = python_type.fromisoformat(value)
+        elif not isinstance(value, python_type) or isinstance(value, bool):
+            raise ValueError('cursor inválido')
+        decoded.append(value)
+    return decoded
+
+
+def keyset_filter(columns, values):
+    """
+    Monta (a > x) OR (a = x AND b > y) ..., forma que o MySQL resolve como
+    range no índice composto, ao contrário da comparação de tuplas.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(db.and_(*equal_prefix, column > values[i]))
+    return db.or_(*clauses)
+
+
+def paginate(query, columns, limit: int, cursor: Optional[str] = None, row_values=None) -> Page:
+    """
+    Paginação por keyset: ordena por `columns` (a última deve ser única, ex.: id)
+    e continua a partir do cursor, então o custo de uma página não depende de
+    quantas vieram antes. `query` pode ser uma Query ORM ou um Select Core
+    (executado direto, devolvendo linhas). `row_values` extrai os valores de
+    ordenação de um item (por padrão, os atributos de mesmo nome das colunas).
+    """
+    if cursor:
+        query = query.filter(keyset_filter(columns, decode_cursor(cursor, columns)))
+
+    query = query.order_by(*columns).limit(limit + 1)
+    # Select vai direto para a conexão: linhas Core, sem passar pela camada de carga do ORM
+    items = db.session.connection().execute(query).all() if isinstance(query, Select) else query.all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        values = row_values(last) if row_values else [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(values)
+
+    return Page(items, next_cursor)
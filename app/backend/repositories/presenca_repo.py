@@ -0,0 +1,132 @@
+from extensions import db
+from secrets import randbelow
+from datetime import datetime
+from typing import Optional, List, Tuple
+from models import Inscricao, Oportunidade, Organizacao
+from models.inscricao import RegistroPresenca
+from models.enums import StatusInscricao
+from services.presenca import TabelaPresenca, presenca_cache, escritor_presenca, ENTRADA, SAIDA, ForaDaJanela, SemCheckIn
+
+class PresencaRepo:
+    def get_or_create_pin(inscricao: Inscricao) -> Tuple[RegistroPresenca, bool]:
+        """
+        PIN de presença da inscrição, gerado na primeira vez. Retorna
+        (registro, criado). Se a tabela do evento já está em memória, o PIN
+        novo entra nela também.
+        """
+        registro = RegistroPresenca.query.filter_by(id_inscricao=inscricao.id).first()
+        if registro:
+            return registro, False
+
+        registro = RegistroPresenca(id_inscricao=inscricao.id, codigo_validacao_pin=f'{randbelow(10 ** 6):06d}')
+        db.session.add(registro)
+        db.session.commit()
+
+        tabela = presenca_cache.get_loaded(inscricao.id_oportunidade)
+        if tabela:
+            tabela.adicionar(registro.id_inscricao, registro.codigo_validacao_pin)
+        return registro, True
+
+    def get_tabela(id_oportunidade: int) -> Optional[TabelaPresenca]:
+        # Tabela do evento, carregada do banco só na primeira validação
+        presenca_cache.descartar_encerrados(datetime.now())
+        return presenca_cache.get(id_oportunidade, PresencaRepo._carregar)
+
+    def marcar(tabela: TabelaPresenca, tipo: str, id_inscricao: int, pin: str, agora: datetime) -> datetime:
+        """
+        Check-in (tipo=ENTRADA) ou check-out (tipo=SAIDA) validado contra a tabela
+        em memória. Consulta o banco quando a inscrição não está na tabela (PIN
+        gerado em outro processo depois da carga), antes de uma marcação nova
+        (a inscrição pode ter sido recusada ou cancelada depois da carga, em
+        qualquer processo: sai da tabela e o PIN deixa de valer) e quando o
+        check-out não acha a entrada na tabela: o check-in pode ter sido feito
+        em outro processo, então procura na fila do escritor_presenca e no
+        registro_presenca antes de recusar. O horário é gravado pelo
+        escritor_presenca. Lança ForaDaJanela, PinInvalido ou SemCheckIn.
+        """
+        if not tabela.na_janela(agora, presenca_cache.janela_antes, presenca_cache.janela_depois):
+            raise ForaDaJanela()
+
+        if not tabela.conhece(id_inscricao):
+            PresencaRepo._buscar_pin(tabela, id_inscricao, pin)
+        elif not tabela.marcada(tipo, id_inscricao) and not PresencaRepo._aprovada(id_inscricao):
+            tabela.remover(id_inscricao)
+
+        try:
+            hora, novo = tabela.marcar(tipo, id_inscricao, pin, agora)
+        except SemCheckIn:
+            entrada = escritor_presenca.pendente(ENTRADA, id_inscricao) or PresencaRepo._entrada_gravada(id_inscricao)
+            if entrada is None:
+                raise
+            tabela.registrar_entrada(id_inscricao, entrada)
+            hora, novo = tabela.marcar(tipo, id_inscricao, pin, agora)
+        if novo:
+            escritor_presenca.enfileirar(tipo, id_inscricao, hora)
+        return hora
+
+    def gravar_lote(itens: List[Tuple[str, int, datetime]]) -> None:
+        """
+        Grava um micro-lote de marcações com um UPDATE em lote (executemany) por
+        tipo. O primeiro horário gravado prevalece.
+        """
+        tabela = RegistroPresenca.__table__
+        for tipo, coluna in ((ENTRADA, tabela.c.check_in_hora), (SAIDA, tabela.c.check_out_hora)):
+            params = [{'b_inscricao': id_inscricao, 'b_hora': hora} for t, id_inscricao, hora in itens if t == tipo]
+            if params:
+                db.session.execute(
+                    tabela.update()
+                    .where(tabela.c.id_inscricao == db.bindparam('b_inscricao'), coluna.is_(None))
+                    .values({coluna: db.bindparam('b_hora')}),
+                    params
+                )
+        db.session.commit()
+
+    def _carregar(id_oportunidade: int) -> Optional[TabelaPresenca]:
+        oportunidade = (
+            db.session.query(Oportunidade.id_organizacao, Organizacao.id_responsavel, Oportunidade.data_hora)
+            .join(Organizacao, Organizacao.id == Oportunidade.id_organizacao)
+            .filter(Oportunidade.id == id_oportunidade)
+            .one_or_none()
+        )
+        if oportunidade is None:
+            return None
+
+        registros = (
+            db.session.query(
+                RegistroPresenca.id_inscricao,
+                RegistroPresenca.codigo_validacao_pin,
+                RegistroPresenca.check_in_hora,
+                RegistroPresenca.check_out_hora
+            )
+            .join(Inscricao, Inscricao.id == RegistroPresenca.id_inscricao)
+            .filter(Inscricao.id_oportunidade == id_oportunidade, Inscricao.status_inscricao == StatusInscricao.aprovada)
+            .all()
+        )
+        return TabelaPresenca(id_oportunidade, oportunidade.id_organizacao, oportunidade.id_responsavel, oportunidade.data_hora, registros)
+
+    def _buscar_pin(tabela: TabelaPresenca, id_inscricao: int, pin: str) -> None:
+        # Consulta pelo índice (id_inscricao, codigo_validacao_pin)
+        registro = (
+            db.session.query(RegistroPresenca.check_in_hora, RegistroPresenca.check_out_hora)
+            .join(Inscricao, Inscricao.id == RegistroPresenca.id_inscricao)
+            .filter(
+                RegistroPresenca.id_inscricao == id_inscricao,
+                RegistroPresenca.codigo_validacao_pin == pin,
+                Inscricao.id_oportunidade == tabela.id_oportunidade,
+                Inscricao.status_inscricao == StatusInscricao.aprovada
+            )
+            .one_or_none()
+        )
+        if registro:
+            tabela.adicionar(id_inscricao, pin, registro.check_in_hora, registro.check_out_hora)
+
+    def _aprovada(id_inscricao: int) -> bool:
+        # Pela chave primária
+        return db.session.scalar(
+            db.select(Inscricao.status_inscricao).where(Inscricao.id == id_inscricao)
+        ) == StatusInscricao.aprovada
+
+    def _entrada_gravada(id_inscricao: int) -> Optional[datetime]:
+        return db.session.scalar(
+            db.select(RegistroPresenca.check_in_hora).where(RegistroPresenca.id_inscricao == id_inscricao)
+        )
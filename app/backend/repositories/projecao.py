@@ -0,0 +1,82 @@
+from collections import namedtuple
+from extensions import db
+from typing import Optional, List, Callable, Sequence
+from models import Usuario, Organizacao, Oportunidade, Inscricao, AvaliacaoAgregada
+from models.avaliacao import colunas_resumo, resumo_da_linha
+from models.enums import AlvoAvaliacao
+from .pagination import Page, paginate
+
+class Projecao:
+    """
+    Caminho de leitura das listagens sem hidratar objetos ORM: um SELECT só
+    com as colunas que o to_dict do modelo serializa, executado como Core
+    (sem identity map nem eager loads, como o registro_presenca da
+    inscrição), com cada linha convertida por `montar` — que usa o mesmo
+    dict_from_row do to_dict, então o JSON sai idêntico.
+    """
+    def __init__(self, modelo, colunas: Sequence, montar: Callable[[tuple], dict], joins: Sequence = ()):
+        self.modelo = modelo
+        self.colunas = list(colunas)
+        self.montar = montar
+        self.joins = joins
+        # Acesso por atributo em namedtuple é bem mais barato que em Row
+        self._linha = namedtuple(f'Linha{modelo.__name__}', [coluna.key for coluna in self.colunas])
+
+    def select(self, *criterios):
+        select = db.select(*self.colunas).select_from(self.modelo)
+        for alvo, condicao in self.joins:
+            select = select.outerjoin(alvo, condicao)
+        return select.where(*criterios)
+
+    def dicts(self, rows) -> List[dict]:
+        montar, linha = self.montar, self._linha._make
+        return [montar(linha(row)) for row in rows]
+
+    def todos(self, *criterios) -> List[dict]:
+        return self.dicts(db.session.connection().execute(self.select(*criterios)))
+
+    def pagina(self, criterios: Sequence, columns, limit: int, cursor: Optional[str] = None) -> Page:
+        # Mesma paginação por keyset das listagens ORM; os itens já saem como dicts
+        page = paginate(self.select(*criterios), columns, limit, cursor)
+        return Page(self.dicts(page.items), page.next_cursor)
+
+
+def _colunas(modelo, *nomes):
+    return [getattr(modelo, nome) for nome in nomes]
+
+def _agregado_da_organizacao(coluna):
+    # LEFT JOIN do resumo de avaliações da organização, pela chave primária do agregado
+    return (AvaliacaoAgregada, db.and_(
+        AvaliacaoAgregada.tipo_alvo == AlvoAvaliacao.organizacao,
+        AvaliacaoAgregada.id_alvo == coluna
+    ))
+
+# Quantas colunas do agregado vêm no fim de cada linha
+_RESUMO = len(colunas_resumo())
+
+
+USUARIO = Projecao(
+    Usuario,
+    _colunas(Usuario, 'id', 'nome_completo', 'cpf', 'email', 'cidade', 'bairro', 'telefone', 'data_nasc', 'foto_perfil', 'tipo_usuario', 'criado_em', 'conta_ativa'),
+    Usuario.dict_from_row
+)
+
+INSCRICAO = Projecao(
+    Inscricao,
+    _colunas(Inscricao, 'id', 'id_usuario', 'id_oportunidade', 'data_inscricao', 'status_inscricao', 'data_aprovacao_recusa'),
+    Inscricao.dict_from_row
+)
+
+ORGANIZACAO = Projecao(
+    Organizacao,
+    _colunas(Organizacao, 'id', 'id_responsavel', 'razao_social', 'email_institucional', 'cnpj', 'descricao', 'endereco_matriz', 'contato', 'documento', 'criado_em', 'aprovada') + colunas_resumo(),
+    lambda row: Organizacao.dict_from_row(row, resumo_da_linha(row[-_RESUMO:])),
+    joins=[_agregado_da_organizacao(Organizacao.id)]
+)
+
+OPORTUNIDADE = Projecao(
+    Oportunidade,
+    _colunas(Oportunidade, 'id', 'id_organizacao', 'titulo', 'descricao', 'local_endereco', 'comunidade', 'data_hora', 'duracao_horas', 'num_vagas', 'vagas_restantes', 'tags', 'status', 'criado_em') + colunas_resumo(),
+    lambda row: Oportunidade.dict_from_row(row, resumo_da_linha(row[-_RESUMO:])),
+    joins=[_agregado_da_organizacao(Oportunidade.id_organizacao)]
+)
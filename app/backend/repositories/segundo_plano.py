@@ -0,0 +1,21 @@
+from threading import Thread
+from flask import current_app
+from extensions import db
+
+
+def em_segundo_plano(tarefa, nome: str) -> None:
+    """
+    Roda `tarefa` numa thread daemon com o próprio app context (e sessão),
+    para trabalho que não deve segurar a requisição, como reconstruir as
+    estruturas em memória a partir do banco.
+    """
+    app = current_app._get_current_object()
+
+    def rodar():
+        with app.app_context():
+            try:
+                tarefa()
+            finally:
+                db.session.remove()
+
+    Thread(target=rodar, name=nome, daemon=True).start()
@@ -0,0 +1,112 @@
+from extensions import db
+from typing import Optional, List, Dict, Iterable
+from models import Tag, OportunidadeTag, Oportunidade
+from services.text_index import fold
+from .vinculos import sync_links
+
+TAMANHO_NOME = Tag.__table__.c.nome.type.length
+
+def normalizar_tag(nome: str) -> str:
+    # O MySQL compara nomes sem diferenciar maiúsculas nem acentos: "Saúde" e "saude" são a mesma tag
+    return fold(nome.strip())[:TAMANHO_NOME]
+
+
+def split_tags(texto: Optional[str]) -> List[str]:
+    """
+    Separa o texto de tags ("Meio Ambiente, limpeza") em nomes normalizados
+    (sem espaços nas pontas, minúsculos, sem acentos e sem repetição), na
+    ordem original.
+    """
+    if not texto:
+        return []
+
+    nomes = []
+    for parte in texto.split(','):
+        nome = normalizar_tag(parte)
+        if nome and nome not in nomes:
+            nomes.append(nome)
+    return nomes
+
+
+class TagRepo:
+    def get_all_tags() -> List[Tag]:
+        return Tag.query.order_by(Tag.nome).all()
+
+    def get_ids_by_names(nomes: Iterable[str]) -> Dict[str, int]:
+        """
+        {nome normalizado: id} das tags existentes. A chave vem do nome gravado,
+        normalizado de novo: uma linha antiga com acento ("saúde"), encontrada
+        pela collation do banco, responde pelo nome sem acento.
+        """
+        nomes = {normalizar_tag(nome) for nome in nomes if nome and nome.strip()}
+        if not nomes:
+            return {}
+        return {normalizar_tag(nome): id for id, nome in Tag.query.with_entities(Tag.id, Tag.nome).filter(Tag.nome.in_(nomes))}
+
+    def get_or_create_ids_by_names(nomes: Iterable[str]) -> Dict[str, int]:
+        """
+        Resolve nomes de tags para {nome: id}, criando as que faltam com um único
+        INSERT que ignora duplicatas. As chaves são os nomes normalizados
+        (normalizar_tag). Não faz commit.
+        """
+        nomes = {normalizar_tag(nome) for nome in nomes if nome and nome.strip()}
+        if not nomes:
+            return {}
+
+        existentes = TagRepo.get_ids_by_names(nomes)
+        faltando = nomes - existentes.keys()
+        if faltando:
+            db.session.execute(
+                db.insert(Tag)
+                .prefix_with('IGNORE', dialect='mysql')
+                .prefix_with('OR IGNORE', dialect='sqlite'),
+                [{'nome': nome} for nome in faltando]
+            )
+            existentes.update(TagRepo.get_ids_by_names(faltando))
+        return existentes
+
+    def sync_oportunidade_tags(oportunidade_id: int, tags: Optional[str], nova_oportunidade: bool = False) -> None:
+        """
+        Sincroniza os vínculos oportunidade_tag com o texto de tags, criando as
+        tags que faltam. Não faz commit.
+        """
+        desejadas = TagRepo.get_or_create_ids_by_names(split_tags(tags)).values()
+        sync_links(OportunidadeTag.id_oportunidade, OportunidadeTag.id_tag, oportunidade_id, desejadas, nova_oportunidade)
+
+    def backfill_oportunidade_tags(batch_size: int = 500) -> int:
+        """
+        Preenche oportunidade_tag a partir da coluna `tags` das oportunidades
+        existentes, em lotes por id com um commit por lote. Pode ser executado
+        de novo sem duplicar vínculos. Retorna quantas oportunidades foram lidas.
+        """
+        ultimo_id, total = 0, 0
+        while True:
+            lote = (
+                Oportunidade.query
+                .with_entities(Oportunidade.id, Oportunidade.tags)
+                .filter(Oportunidade.id > ultimo_id, Oportunidade.tags.isnot(None))
+                .order_by(Oportunidade.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not lote:
+                return total
+
+            por_oportunidade = {id: split_tags(tags) for id, tags in lote}
+            ids_tags = TagRepo.get_or_create_ids_by_names(n for nomes in por_oportunidade.values() for n in nomes)
+
+            vinculos = [
+                {'id_oportunidade': id, 'id_tag': ids_tags[nome]}
+                for id, nomes in por_oportunidade.items() for nome in nomes if nome in ids_tags
+            ]
+            if vinculos:
+                db.session.execute(
+                    db.insert(OportunidadeTag)
+                    .prefix_with('IGNORE', dialect='mysql')
+                    .prefix_with('OR IGNORE', dialect='sqlite'),
+                    vinculos
+                )
+            db.session.commit()
+
+            ultimo_id = lote[-1][0]
+            total += len(lote)
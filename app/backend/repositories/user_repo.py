@@ -4,6 +4,18 @@ from datetime import date
 from models import Usuario
 from models import VoluntarioHabilidade
 from models import Habilidade
+from models import Inscricao, Avaliacao
+from models.enums import AlvoAvaliacao
+from middleware.principal_cache import principal_cache
+from services.skill_match import skill_matrix
+from .pagination import Page
+from .projecao import USUARIO
+from .feed_repo import FeedRepo
+from .inscricao_repo import InscricaoRepo
+from .organizacao_repo import OrganizacaoRepo
+from .avaliacao_repo import AvaliacaoRepo
+from .segundo_plano import em_segundo_plano
+from .vinculos import sync_links
 
 class UserRepo:
     def create_user(
@@ -38,11 +50,14 @@ class UserRepo:
             conta_ativa=conta_ativa
         )
 
+        # Usuário e habilidades entram no mesmo commit
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
 
-        UserRepo.update_habilidades(user.id, habilidades or [])
+        UserRepo.sync_habilidades(user.id, habilidades or [], novo_usuario=True)
+        db.session.commit()
 
+        UserRepo._atualizar_matriz(user)
         return user
 
     def get_user_by_id(user_id: int) -> Optional[Usuario]:
@@ -63,6 +78,10 @@ class UserRepo:
         except Exception as e:
             return []
 
+    def get_users_page(limit: int, cursor: Optional[str] = None) -> Page:
+        # Itens já serializados (dicts), lidos só com as colunas do to_dict
+        return USUARIO.pagina([], [Usuario.id], limit, cursor)
+
     def get_all_admins() -> List[Usuario]:
         return Usuario.query.filter_by(tipo_usuario="admin").all()
 
@@ -74,25 +93,53 @@ class UserRepo:
         if not user:
             return 
         
-        # safely updates user habilidades        
-        habilidades = data.get("habilidades", None)
-        data.pop("habilidades", None)
-        
-        UserRepo.update_habilidades(user_id, habilidades or [])
+        # safely updates user habilidades (only when the caller sent them)
+        habilidades = data.pop("habilidades", None)
+        if habilidades is not None:
+            UserRepo.sync_habilidades(user_id, habilidades)
+
+        if habilidades is not None or 'cidade' in data or 'bairro' in data:
+            FeedRepo.invalidate_user(user_id)
 
         data.pop("id", None)
         user.update_from_dict(data)
         db.session.commit()
+
+        principal_cache.invalidate_user(user_id)
+        UserRepo._atualizar_matriz(user)
         return user
 
+    def update_senha_hash(user_id: int, senha_hash: str) -> bool:
+        # Atualiza só o hash da senha (ex.: rehash no login), sem tocar nas habilidades
+        updated = Usuario.query.filter_by(id=user_id).update({'senha': senha_hash})
+        db.session.commit()
+        return updated > 0
+
     def delete_user(user_id: int) -> bool:
         user : Usuario = UserRepo.get_user_by_id(user_id)
         
         if not user:
             return False
 
+        FeedRepo.invalidate_user(user_id)
+        InscricaoRepo.liberar_vagas_do_usuario(user_id)
+
+        # Saem em cascata as avaliações que ele fez, as das inscrições dele e as
+        # das organizações que ele responde; os agregados dos alvos são descontados
+        organizacoes = [o.id for o in user.organizacoes_responsaveis]
+        AvaliacaoRepo.remover_em_cascata(
+            db.or_(
+                Avaliacao.id_autor == user_id,
+                Avaliacao.id_inscricao.in_(db.select(Inscricao.id).where(Inscricao.id_usuario == user_id)),
+                Avaliacao.id_inscricao.in_(OrganizacaoRepo.select_inscricoes(*organizacoes))
+            ),
+            alvos_removidos=[(AlvoAvaliacao.usuario, user_id)] + [(AlvoAvaliacao.organizacao, o) for o in organizacoes]
+        )
         db.session.delete(user)
         db.session.commit()
+
+        principal_cache.invalidate_user(user_id)
+        skill_matrix.remove_user(user_id)
         return True
     
 
@@ -109,33 +156,107 @@ class UserRepo:
 
         vh = VoluntarioHabilidade(id_usuario=user.id, id_habilidade=habilidade_id)
         db.session.add(vh)
+        FeedRepo.invalidate_user(user.id)
         db.session.commit()
+
+        UserRepo._atualizar_matriz(user)
         return True
     
     def update_habilidades(user_id: int, habilidade_ids: List[int]) -> bool:
-        user = UserRepo.get_user_by_id(user_id)
+        user = db.session.get(Usuario, user_id)
         if not user:
             return False
-        
+
+        UserRepo.sync_habilidades(user.id, habilidade_ids)
+        FeedRepo.invalidate_user(user.id)
+        db.session.commit()
+
+        UserRepo._atualizar_matriz(user)
+        return True
+
+    def sync_habilidades(user_id: int, habilidade_ids: List[int], novo_usuario: bool = False) -> None:
+        """
+        Sincroniza as habilidades do usuário com `habilidade_ids`, ignorando ids
+        inexistentes (um SELECT a mais). Não faz commit.
+        """
+        desejadas = set(habilidade_ids)
+
         # Remove invalid IDs
-        habilidade_ids = [hid for hid in habilidade_ids if Habilidade.query.filter_by(id=hid).first()]
+        if desejadas:
+            desejadas = {hid for (hid,) in Habilidade.query.with_entities(Habilidade.id).filter(Habilidade.id.in_(desejadas))}
 
-        # Remove habilidades not in the new list
-        existing_habilidades : List[VoluntarioHabilidade] = VoluntarioHabilidade.query.filter_by(id_usuario=user.id).all()
-        for eh in existing_habilidades:
-            if eh.id_habilidade not in habilidade_ids:
-                db.session.delete(eh)
+        sync_links(VoluntarioHabilidade.id_usuario, VoluntarioHabilidade.id_habilidade, user_id, desejadas, novo_usuario)
 
-        # Add new habilidades
-        for hid in habilidade_ids:
-            existing : List[VoluntarioHabilidade] = VoluntarioHabilidade.query.filter_by(id_usuario=user.id, id_habilidade=hid).first()
-            if not existing:
-                vh = VoluntarioHabilidade(id_usuario=user.id, id_habilidade=hid)
-                db.session.add(vh)
+    # SKILL MATCHING RELATED METHODS
+
+    def rank_voluntarios(habilidade_ids: List[int], comunidade: Optional[str], k: int, metodo: str = 'jaccard', excluir: List[int] = ()) -> List[dict]:
+        """
+        Os `k` voluntários mais compatíveis com as habilidades pedidas, pontuados
+        na matriz esparsa em memória, com nome e local carregados num único SELECT.
+        """
+        skill_matrix.garantir(UserRepo._matriz_do_banco, lambda tarefa: em_segundo_plano(tarefa, 'reconstruir-matriz'))
+
+        ranking = skill_matrix.top_k(habilidade_ids, comunidade, k, metodo, excluir)
+        if not ranking:
+            return []
+
+        ids = [uid for uid, _, _ in ranking]
+        dados = {
+            uid: (nome, cidade, bairro)
+            for uid, nome, cidade, bairro in Usuario.query
+            .with_entities(Usuario.id, Usuario.nome_completo, Usuario.cidade, Usuario.bairro)
+            .filter(Usuario.id.in_(ids))
+        }
+
+        resultado = []
+        for uid, score, em_comum in ranking:
+            if uid not in dados:
+                continue
+            nome, cidade, bairro = dados[uid]
+            resultado.append({
+                'id': uid,
+                'nome_completo': nome,
+                'cidade': cidade,
+                'bairro': bairro,
+                'score': score,
+                'habilidades_em_comum': em_comum
+            })
+        return resultado
+
+    def rebuild_skill_matrix() -> None:
+        skill_matrix.rebuild(*UserRepo._matriz_do_banco())
+
+    def _matriz_do_banco() -> tuple:
+        # (usuarios, vinculos) dos voluntários ativos, lidos em blocos, para SkillMatrix.rebuild
+        voluntarios = UserRepo._voluntarios_filter()
+        usuarios = (
+            Usuario.query
+            .with_entities(Usuario.id, Usuario.cidade, Usuario.bairro)
+            .filter(*voluntarios)
+            .yield_per(5000)
+        )
+        vinculos = (
+            VoluntarioHabilidade.query
+            .join(Usuario, Usuario.id == VoluntarioHabilidade.id_usuario)
+            .with_entities(VoluntarioHabilidade.id_usuario, VoluntarioHabilidade.id_habilidade)
+            .filter(*voluntarios)
+            .order_by(VoluntarioHabilidade.id_usuario)
+            .yield_per(5000)
+        )
+        return usuarios, vinculos
+
+    def _voluntarios_filter():
+        return (Usuario.tipo_usuario == 'regular', Usuario.conta_ativa.is_(True))
+
+    def _atualizar_matriz(user: Usuario) -> None:
+        # Atualiza só a linha do usuário na matriz de compatibilidade
+        if user.tipo_usuario != 'regular' or not user.conta_ativa:
+            skill_matrix.remove_user(user.id)
+            return
+
+        ids = [hid for (hid,) in VoluntarioHabilidade.query.with_entities(VoluntarioHabilidade.id_habilidade).filter_by(id_usuario=user.id)]
+        skill_matrix.set_user(user.id, ids, user.cidade, user.bairro)
 
-        db.session.commit()
-        return True
-    
     def remove_habilidade_from_user(user_id: int, habilidade_id: int) -> bool:
         user = UserRepo.get_user_by_id(user_id)
         if not user:
@@ -146,7 +267,10 @@ class UserRepo:
             return False
 
         db.session.delete(existing)
+        FeedRepo.invalidate_user(user.id)
         db.session.commit()
+
+        UserRepo._atualizar_matriz(user)
         return True
     
     def get_user_habilidade_by_id(user_id: int, habilidade_id: int) -> Optional[int]:
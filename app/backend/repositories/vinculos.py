@@ -0,0 +1,33 @@
+from typing import Iterable
+from extensions import db
+
+
+def sync_links(coluna_dono, coluna_alvo, dono_id: int, ids: Iterable[int], novo: bool = False) -> None:
+    """
+    Sincroniza os vínculos de uma tabela associativa (ex.: voluntario_habilidade)
+    do dono `dono_id` com `ids` por diferença de conjuntos, com número constante
+    de comandos: um SELECT dos vínculos atuais (nenhum se o dono é `novo`), um
+    DELETE e um INSERT em lote. `coluna_dono` e `coluna_alvo` são as colunas
+    de chave estrangeira do modelo. Os ids já devem ser válidos. Não faz commit.
+    """
+    modelo = coluna_dono.class_
+    desejadas = set(ids)
+
+    atuais = set()
+    if not novo:
+        atuais = set(db.session.scalars(db.select(coluna_alvo).where(coluna_dono == dono_id)))
+
+    remover = atuais - desejadas
+    if remover:
+        db.session.execute(
+            db.delete(modelo)
+            .where(coluna_dono == dono_id, coluna_alvo.in_(remover))
+            .execution_options(synchronize_session=False)
+        )
+
+    adicionar = desejadas - atuais
+    if adicionar:
+        db.session.execute(
+            db.insert(modelo),
+            [{coluna_dono.key: dono_id, coluna_alvo.key: id} for id in adicionar]
+        )
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from repositories import UserRepo
-from werkzeug.security import check_password_hash
-from middleware.jwt_util import generate_token
+from services.password_pool import password_pool, PoolSaturated
+from middleware.jwt_util import generate_token, token_required, is_admin
+from middleware.principal_cache import principal_cache
+from middleware.rate_limit import login_throttle
 
 auth_bp = Blueprint('auth_bp', __name__)
 
@@ -13,12 +15,43 @@ def login():
     if not data or not data.get('email') or not data.get('senha'):
         return jsonify({'error': 'Email e senha são obrigatórios'}), 400
 
+    # Barra o excesso de tentativas antes de qualquer consulta ou hash
+    retry_after = login_throttle.retry_after(data['email'], request.remote_addr)
+    if retry_after:
+        return jsonify({'error': 'Muitas tentativas de login. Tente novamente mais tarde.'}), 429, {'Retry-After': str(retry_after)}
+
     user = UserRepo.get_user_by_email(data['email'])
 
-    if user and check_password_hash(user.senha, data['senha']):
+    if not user:
+        login_throttle.register_failure(data['email'], request.remote_addr)
+        return jsonify({'error': 'Credenciais inválidas'}), 401
+
+    # A verificação roda no pool de processos; se ele estiver cheio, falha rápido
+    try:
+        senha_valida, novo_hash = password_pool.verify(user.senha, data['senha'])
+    except PoolSaturated:
+        return jsonify({'error': 'Servidor ocupado, tente novamente em instantes.'}), 503, {'Retry-After': '1'}
+
+    if senha_valida:
+        # Hash com parâmetros desatualizados: regrava com os atuais
+        if novo_hash:
+            UserRepo.update_senha_hash(user.id, novo_hash)
+
+        login_throttle.register_success(data['email'])
         token = generate_token(user)
         user_dict = user.to_dict()
         user_dict.pop('senha', None)  # NUNCA enviar senha ao cliente
         return jsonify({'token': token, 'user': user_dict}), 200
 
-    return jsonify({'error': 'Credenciais inválidas'}), 401
\ No newline at end of file
+    login_throttle.register_failure(data['email'], request.remote_addr)
+    return jsonify({'error': 'Credenciais inválidas'}), 401
+
+
+# ================= PRINCIPAL CACHE STATS ===================
+@auth_bp.route('/principal-cache/stats', methods=['GET'])
+@token_required
+def principal_cache_stats():
+    if not is_admin():
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    return jsonify(principal_cache.stats()), 200
@@ -0,0 +1,109 @@
+from flask import Blueprint, request, jsonify
+from middleware.jwt_util import token_required, is_owner_or_admin
+from repositories import AvaliacaoRepo, InscricaoRepo
+from repositories.pagination import page_args, page_headers
+from models.avaliacao import NOTAS
+from models.enums import AlvoAvaliacao
+from datetime import datetime
+
+avaliacao_bp = Blueprint('avaliacao_bp', __name__)
+
+def _validar(data, obrigatoria):
+    nota = data.get('nota')
+    if (obrigatoria or nota is not None) and (not isinstance(nota, int) or isinstance(nota, bool) or nota not in NOTAS):
+        return 'O campo nota deve ser um inteiro de 1 a 5.'
+    comentario = data.get('comentario')
+    if comentario is not None and (not isinstance(comentario, str) or len(comentario) > 1024):
+        return 'O comentário deve ser um texto de no máximo 1024 caracteres.'
+    return None
+
+
+# ===================== CREATE =====================
+@avaliacao_bp.route('/', methods=['POST'])
+@token_required
+def create_avaliacao():
+    current_user = request.user
+    data = request.get_json() or {}
+
+    id_inscricao = data.get('id_inscricao')
+
+    # =========== Validation ==============
+    if not isinstance(id_inscricao, int):
+        return jsonify({'error': 'O campo id_inscricao é obrigatório.'}), 400
+
+    erro = _validar(data, obrigatoria=True)
+    if erro:
+        return jsonify({'error': erro}), 400
+
+    inscricao = InscricaoRepo.get_inscricao_by_id(id_inscricao)
+    if not inscricao:
+        return jsonify({'error': 'Inscrição não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    # Voluntário avalia a organização; responsável pela organização avalia o voluntário
+    alvo = AvaliacaoRepo.get_alvo(inscricao, current_user.id)
+    if not alvo:
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    if not AvaliacaoRepo.pode_avaliar(inscricao, datetime.now()):
+        return jsonify({'error': 'Só é possível avaliar inscrições aprovadas após a data do evento.'}), 400
+
+    tipo_alvo, id_alvo = alvo
+    avaliacao = AvaliacaoRepo.create_avaliacao(id_inscricao, current_user.id, tipo_alvo, id_alvo, data['nota'], data.get('comentario'))
+    if not avaliacao:
+        return jsonify({'error': 'Esta inscrição já foi avaliada.'}), 409
+
+    return jsonify(avaliacao.to_dict()), 201
+
+
+# ===================== LIST BY TARGET =====================
+@avaliacao_bp.route('/<string:tipo>/<int:id_alvo>', methods=['GET'])
+def get_avaliacoes(tipo, id_alvo):
+    if tipo not in AlvoAvaliacao.__members__:
+        return jsonify({'error': 'Tipo de alvo inválido.'}), 404
+
+    try:
+        limit, cursor = page_args(request.args)
+        page = AvaliacaoRepo.get_avaliacoes_page(AlvoAvaliacao[tipo], id_alvo, limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify([a.to_dict() for a in page.items]), 200, page_headers(page)
+
+
+# ===================== UPDATE =====================
+@avaliacao_bp.route('/<int:id_avaliacao>', methods=['PUT'])
+@token_required
+def update_avaliacao(id_avaliacao):
+    data = request.get_json() or {}
+
+    avaliacao = AvaliacaoRepo.get_avaliacao_by_id(id_avaliacao)
+    if not avaliacao:
+        return jsonify({'error': 'Avaliação não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    if request.user.id != avaliacao.id_autor:
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    erro = _validar(data, obrigatoria=False)
+    if erro:
+        return jsonify({'error': erro}), 400
+
+    avaliacao = AvaliacaoRepo.update_avaliacao(id_avaliacao, data.get('nota'), data.get('comentario'))
+    return jsonify(avaliacao.to_dict()), 200
+
+
+# ===================== DELETE =====================
+@avaliacao_bp.route('/<int:id_avaliacao>', methods=['DELETE'])
+@token_required
+def delete_avaliacao(id_avaliacao):
+    avaliacao = AvaliacaoRepo.get_avaliacao_by_id(id_avaliacao)
+    if not avaliacao:
+        return jsonify({'error': 'Avaliação não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    if not is_owner_or_admin(avaliacao.id_autor):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    AvaliacaoRepo.delete_avaliacao(id_avaliacao)
+    return jsonify({'message': 'Avaliação removida com sucesso.'}), 200
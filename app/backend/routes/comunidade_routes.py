@@ -0,0 +1,138 @@
+from flask import Blueprint, request, jsonify
+from middleware.jwt_util import token_required, is_owner_or_admin
+from repositories import ComunidadeRepo
+from repositories.pagination import page_args, page_headers
+
+comunidade_bp = Blueprint('comunidade_bp', __name__)
+
+# ===================== FEED DA COMUNIDADE =====================
+@comunidade_bp.route('/feed', methods=['GET'])
+@token_required
+def get_feed():
+    current_user = request.user
+
+    # Padrão: o bairro do usuário; ?cidade= lê a timeline da cidade inteira
+    if request.args.get('cidade'):
+        campo, valor = 'cidade', request.args['cidade']
+    else:
+        campo, valor = 'comunidade', request.args.get('comunidade') or current_user.bairro
+
+    try:
+        limit, cursor = page_args(request.args)
+        page = ComunidadeRepo.get_feed(campo, valor, limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify([p.to_dict() for p in page.items]), 200, page_headers(page)
+
+
+# ===================== PUBLICAÇÕES =====================
+@comunidade_bp.route('/publicacao', methods=['POST'])
+@token_required
+def create_publicacao():
+    current_user = request.user
+    data = request.get_json() or {}
+
+    conteudo = (data.get('conteudo') or '').strip()
+
+    # =========== Validation ==============
+    if not conteudo:
+        return jsonify({'error': 'O campo conteudo é obrigatório.'}), 400
+
+    if len(conteudo) > 2048:
+        return jsonify({'error': 'O conteúdo deve ter no máximo 2048 caracteres.'}), 400
+
+    publicacao = ComunidadeRepo.create_publicacao(
+        id_usuario=current_user.id,
+        conteudo=conteudo,
+        comunidade=data.get('comunidade') or current_user.bairro,
+        cidade=current_user.cidade
+    )
+    return jsonify(publicacao.to_dict()), 201
+
+
+@comunidade_bp.route('/publicacao/<int:id_publicacao>', methods=['GET'])
+@token_required
+def get_publicacao(id_publicacao):
+    publicacao = ComunidadeRepo.get_publicacao_by_id(id_publicacao)
+    if not publicacao:
+        return jsonify({'error': 'Publicação não encontrada.'}), 404
+    return jsonify(publicacao.to_dict()), 200
+
+
+@comunidade_bp.route('/publicacao/<int:id_publicacao>', methods=['DELETE'])
+@token_required
+def delete_publicacao(id_publicacao):
+    publicacao = ComunidadeRepo.get_publicacao_by_id(id_publicacao)
+    if not publicacao:
+        return jsonify({'error': 'Publicação não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    if not is_owner_or_admin(publicacao.id_usuario):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    ComunidadeRepo.delete_publicacao(id_publicacao)
+    return jsonify({'message': 'Publicação removida com sucesso.'}), 200
+
+
+# ===================== CURTIDAS =====================
+@comunidade_bp.route('/publicacao/<int:id_publicacao>/curtida', methods=['POST', 'DELETE'])
+@token_required
+def curtir_publicacao(id_publicacao):
+    if not ComunidadeRepo.get_publicacao_by_id(id_publicacao):
+        return jsonify({'error': 'Publicação não encontrada.'}), 404
+
+    if request.method == 'POST':
+        alterada = ComunidadeRepo.curtir(id_publicacao, request.user.id)
+    else:
+        alterada = ComunidadeRepo.descurtir(id_publicacao, request.user.id)
+
+    publicacao = ComunidadeRepo.get_publicacao_by_id(id_publicacao)
+    return jsonify({'alterada': alterada, 'num_curtidas': publicacao.num_curtidas}), 200
+
+
+# ===================== COMENTÁRIOS =====================
+@comunidade_bp.route('/publicacao/<int:id_publicacao>/comentarios', methods=['GET'])
+@token_required
+def get_comentarios(id_publicacao):
+    if not ComunidadeRepo.get_publicacao_by_id(id_publicacao):
+        return jsonify({'error': 'Publicação não encontrada.'}), 404
+
+    try:
+        limit, cursor = page_args(request.args)
+        page = ComunidadeRepo.get_comentarios_page(id_publicacao, limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify([c.to_dict() for c in page.items]), 200, page_headers(page)
+
+
+@comunidade_bp.route('/publicacao/<int:id_publicacao>/comentarios', methods=['POST'])
+@token_required
+def create_comentario(id_publicacao):
+    data = request.get_json() or {}
+    conteudo = (data.get('conteudo') or '').strip()
+
+    if not conteudo or len(conteudo) > 1024:
+        return jsonify({'error': 'O campo conteudo é obrigatório (máximo de 1024 caracteres).'}), 400
+
+    if not ComunidadeRepo.get_publicacao_by_id(id_publicacao):
+        return jsonify({'error': 'Publicação não encontrada.'}), 404
+
+    comentario = ComunidadeRepo.create_comentario(id_publicacao, request.user.id, conteudo)
+    return jsonify(comentario.to_dict()), 201
+
+
+@comunidade_bp.route('/comentario/<int:id_comentario>', methods=['DELETE'])
+@token_required
+def delete_comentario(id_comentario):
+    comentario = ComunidadeRepo.get_comentario_by_id(id_comentario)
+    if not comentario:
+        return jsonify({'error': 'Comentário não encontrado.'}), 404
+
+    # ======= Permission Control =======
+    if not is_owner_or_admin(comentario.id_usuario):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    ComunidadeRepo.delete_comentario(id_comentario)
+    return jsonify({'message': 'Comentário removido com sucesso.'}), 200
@@ -1,5 +1,6 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from repositories import HabilidadeRepo
+from repositories.pagination import page_args, page_headers
 
 habilidade_bp = Blueprint('habilidade_bp', __name__)
 
@@ -15,7 +16,7 @@ def create_habilidade():
     if HabilidadeRepo.get_habilidade_by_name(nome):
         return jsonify({'error': 'Habilidade já existe.'}), 400
     
-    if nome.length > 100:
+    if len(nome) > 100:
         return jsonify({'error': 'Nome da habilidade excede o limite de 100 caracteres.'}), 400
 
     habilidade = HabilidadeRepo.create_habilidade(nome=nome)
@@ -24,25 +25,34 @@ def create_habilidade():
 # ================= GET ALL HABILIDADES ===================
 @habilidade_bp.route('/', methods=['GET'])
 def get_all_habilidades():
-    habilidades = HabilidadeRepo.get_all_habilidades()
-    habilidade_list = [h.to_dict() for h in habilidades]
-    return jsonify(habilidade_list), 200
+    # Sem parâmetros de paginação: JSON completo pré-serializado no catálogo em memória
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        catalogo = HabilidadeRepo.get_catalog()
+        return Response(catalogo.lista_json, status=200, mimetype='application/json')
+
+    try:
+        limit, cursor = page_args(request.args)
+        page = HabilidadeRepo.get_habilidades_page(limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify(page.items), 200, page_headers(page)
 
 # ================= GET HABILIDADE BY ID ===================
 @habilidade_bp.route('/<int:habilidade_id>', methods=['GET'])
 def get_habilidade_by_id(habilidade_id):
-    habilidade = HabilidadeRepo.get_habilidade_by_id(habilidade_id)
+    habilidade = HabilidadeRepo.get_catalog().get_by_id(habilidade_id)
     if not habilidade:
         return jsonify({'error': 'Habilidade não encontrada.'}), 404
-    return jsonify(habilidade.to_dict()), 200
+    return jsonify(habilidade), 200
 
 # =============== GET HABILIDADE BY NAME ==================
 @habilidade_bp.route('/nome/<string:nome>', methods=['GET'])
 def get_habilidade_by_name(nome):
-    habilidade = HabilidadeRepo.get_habilidade_by_name(nome)
+    habilidade = HabilidadeRepo.get_catalog().get_by_nome(nome)
     if not habilidade:
         return jsonify({'error': 'Habilidade não encontrada.'}), 404
-    return jsonify(habilidade.to_dict()), 200
+    return jsonify(habilidade), 200
 
 
 # ================= UPDATE HABILIDADE ===================
@@ -54,7 +64,7 @@ def update_habilidade(habilidade_id):
     if not nome:
         return jsonify({'error': 'Nome da habilidade é obrigatório.'}), 400
     
-    if nome.length > 100:
+    if len(nome) > 100:
         return jsonify({'error': 'Nome da habilidade excede o limite de 100 caracteres.'}), 400
 
     habilidade = HabilidadeRepo.update_habilidade(habilidade_id, data)
@@ -0,0 +1,108 @@
+from flask import Blueprint, request, jsonify
+from middleware.jwt_util import token_required, is_owner_or_admin
+from repositories import HistoricoRepo, InscricaoRepo
+from models.enums import StatusInscricao
+
+historico_bp = Blueprint('historico_bp', __name__)
+
+def _validar(data, obrigatoria):
+    horas = data.get('horas_confirmadas')
+    if (obrigatoria or horas is not None) and (not isinstance(horas, (int, float)) or isinstance(horas, bool) or horas <= 0):
+        return 'O campo horas_confirmadas deve ser um número maior que zero.'
+    certificado_url = data.get('certificado_url')
+    if certificado_url is not None and (not isinstance(certificado_url, str) or len(certificado_url) > 1024):
+        return 'O certificado_url deve ser um texto de no máximo 1024 caracteres.'
+    return None
+
+
+# ===================== CREATE =====================
+@historico_bp.route('/', methods=['POST'])
+@token_required
+def create_historico():
+    data = request.get_json() or {}
+
+    id_inscricao = data.get('id_inscricao')
+
+    # =========== Validation ==============
+    if not isinstance(id_inscricao, int):
+        return jsonify({'error': 'O campo id_inscricao é obrigatório.'}), 400
+
+    erro = _validar(data, obrigatoria=True)
+    if erro:
+        return jsonify({'error': erro}), 400
+
+    inscricao = InscricaoRepo.get_inscricao_by_id(id_inscricao)
+    if not inscricao:
+        return jsonify({'error': 'Inscrição não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    # Só o responsável pela organização (ou admin) confirma as horas do voluntário
+    if not is_owner_or_admin(HistoricoRepo.get_id_responsavel(id_inscricao)):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    if inscricao.status_inscricao != StatusInscricao.aprovada:
+        return jsonify({'error': 'Só é possível confirmar horas de inscrições aprovadas.'}), 400
+
+    # Totais do usuário (RF008) e conquistas (RF016) são atualizados no mesmo commit
+    historico = HistoricoRepo.create_historico(id_inscricao, float(data['horas_confirmadas']), data.get('certificado_url'))
+    if not historico:
+        return jsonify({'error': 'Inscrição não encontrada.'}), 404
+
+    return jsonify(historico.to_dict()), 201
+
+
+# ===================== LIST BY USER =====================
+@historico_bp.route('/usuario/<int:id_usuario>', methods=['GET'])
+@token_required
+def get_historico_by_usuario(id_usuario):
+    # ======= Permission Control =======
+    if not is_owner_or_admin(id_usuario):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    return jsonify([h.to_dict() for h in HistoricoRepo.get_historico_by_usuario(id_usuario)]), 200
+
+
+# ===================== UPDATE =====================
+@historico_bp.route('/<int:id_historico>', methods=['PUT'])
+@token_required
+def update_historico(id_historico):
+    data = request.get_json() or {}
+
+    historico = HistoricoRepo.get_historico_by_id(id_historico)
+    if not historico:
+        return jsonify({'error': 'Histórico não encontrado.'}), 404
+
+    # ======= Permission Control =======
+    if not is_owner_or_admin(HistoricoRepo.get_id_responsavel(historico.id_inscricao)):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    erro = _validar(data, obrigatoria=False)
+    if erro:
+        return jsonify({'error': erro}), 400
+
+    # O registro continua na mesma inscrição; só horas e certificado mudam
+    campos = {campo: data[campo] for campo in ('horas_confirmadas', 'certificado_url') if data.get(campo) is not None}
+    if 'horas_confirmadas' in campos:
+        campos['horas_confirmadas'] = float(campos['horas_confirmadas'])
+
+    historico = HistoricoRepo.update_historico(id_historico, campos)
+    if not historico:
+        return jsonify({'error': 'Inscrição não encontrada.'}), 404
+
+    return jsonify(historico.to_dict()), 200
+
+
+# ===================== DELETE =====================
+@historico_bp.route('/<int:id_historico>', methods=['DELETE'])
+@token_required
+def delete_historico(id_historico):
+    historico = HistoricoRepo.get_historico_by_id(id_historico)
+    if not historico:
+        return jsonify({'error': 'Histórico não encontrado.'}), 404
+
+    # ======= Permission Control =======
+    if not is_owner_or_admin(HistoricoRepo.get_id_responsavel(historico.id_inscricao)):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    HistoricoRepo.delete_historico(id_historico)
+    return jsonify({'message': 'Histórico removido com sucesso.'}), 200
@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
-from middleware.jwt_util import token_required
-from repositories import InscricaoRepo
+from middleware.jwt_util import token_required, is_admin, is_owner_or_admin
+from repositories import InscricaoRepo, OportunidadeRepo, OrganizacaoRepo, VagasEsgotadas, OportunidadeIndisponivel
+from repositories.pagination import page_args, page_headers
 from models.inscricao import Inscricao
+from models.enums import StatusInscricao
 from datetime import datetime
 
 inscricao_bp = Blueprint('inscricao_bp', __name__)
 
+# Máximo de inscrições decididas numa chamada de PUT /inscricao/lote
+MAX_DECISOES_LOTE = 1000
+
 # ===================== CREATE INSCRIÇÃO =====================
 @inscricao_bp.route('/', methods=['POST'])
 @token_required
@@ -23,17 +28,31 @@ def create_inscricao():
     if not id_oportunidade:
         return jsonify({'error': 'O campo id_oportunidade é obrigatório.'}), 400
 
+    # =========== Creating instance (reserva a vaga) ==============
+    try:
+        inscricao = InscricaoRepo.create_inscricao(
+            id_usuario=id_usuario,
+            id_oportunidade=id_oportunidade
+        )
+    except VagasEsgotadas:
+        if not data.get('lista_espera'):
+            return jsonify({'error': 'Não há vagas disponíveis nesta oportunidade.'}), 409
+
+        # Lotada: entra na lista de espera (só administradores definem prioridade)
+        try:
+            prioridade = int(data.get('prioridade', 0)) if is_admin() else 0
+        except (TypeError, ValueError):
+            return jsonify({'error': 'O campo prioridade deve ser um número inteiro.'}), 400
+        entrada = InscricaoRepo.entrar_lista_espera(id_usuario, id_oportunidade, prioridade)
+        if not entrada:
+            return jsonify({'error': 'Usuário já inscrito ou na lista de espera desta oportunidade.'}), 400
+        return jsonify({'lista_espera': entrada.to_dict()}), 202
+    except OportunidadeIndisponivel:
+        return jsonify({'error': 'Oportunidade não encontrada ou encerrada.'}), 404
 
-    inscricao_existente = InscricaoRepo.get_inscricao_by_usuario_oportunidade(id_usuario, id_oportunidade)
-    if inscricao_existente:
+    if not inscricao:
         return jsonify({'error': 'Usuário já inscrito nesta oportunidade.'}), 400
 
-    # =========== Creating instance ==============
-    inscricao = InscricaoRepo.create_inscricao(
-        id_usuario=id_usuario,
-        id_oportunidade=id_oportunidade
-    )
-
     return jsonify(inscricao.to_dict()), 201
 
 
@@ -44,27 +63,29 @@ def get_all_inscricoes():
     current_user = request.user
 
     # Se for admin, retorna todas as inscrições
-    if hasattr(current_user, 'is_admin') and current_user.is_admin:
-        inscricoes = InscricaoRepo.get_all_inscricoes()
-    else:
-        # Um usuário padrão só vê suas próprias inscrições (agradeçam ao chatgpt, eu não ia pensar nisso nem a pau)
-        inscricoes = InscricaoRepo.get_inscricoes_by_usuario(current_user.id)
+    # Um usuário padrão só vê suas próprias inscrições (agradeçam ao chatgpt, eu não ia pensar nisso nem a pau)
+    id_usuario = None if is_admin() else current_user.id
 
-    return jsonify([i.to_dict() for i in inscricoes]), 200
+    try:
+        limit, cursor = page_args(request.args)
+        page = InscricaoRepo.get_inscricoes_page(limit, cursor, id_usuario=id_usuario)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify(page.items), 200, page_headers(page)
 
 
 # ===================== GET BY ID =====================
 @inscricao_bp.route('/<int:id_inscricao>', methods=['GET'])
 @token_required
 def get_inscricao_by_id(id_inscricao):
-    current_user = request.user
     inscricao = InscricaoRepo.get_inscricao_by_id(id_inscricao)
 
     if not inscricao:
         return jsonify({'error': 'Inscrição não encontrada.'}), 404
 
     # ======= Permission Control =======
-    if inscricao.id_usuario != current_user.id and not getattr(current_user, 'is_admin', False):
+    if not is_owner_or_admin(inscricao.id_usuario):
         return jsonify({'error': 'Acesso negado.'}), 403
 
     return jsonify(inscricao.to_dict()), 200
@@ -74,14 +95,11 @@ def get_inscricao_by_id(id_inscricao):
 @inscricao_bp.route('/oportunidade/<int:id_oportunidade>', methods=['GET'])
 @token_required
 def get_inscricoes_by_oportunidade(id_oportunidade):
-    current_user = request.user
-
     # ======= Permission Control =======
-    if not getattr(current_user, 'is_admin', False):
+    if not is_admin():
         return jsonify({'error': 'Acesso negado.'}), 403
 
-    inscricoes = InscricaoRepo.get_inscricoes_by_oportunidade(id_oportunidade)
-    return jsonify([i.to_dict() for i in inscricoes]), 200
+    return jsonify(InscricaoRepo.get_inscricoes_by_oportunidade(id_oportunidade)), 200
 
 
 # ===================== UPDATE STATUS =====================
@@ -96,31 +114,112 @@ def update_inscricao(id_inscricao):
         return jsonify({'error': 'Inscrição não encontrada.'}), 404
 
     # ======= Permission Control =======
-    if not getattr(current_user, 'is_admin', False):
+    if not is_admin():
         if inscricao.id_usuario != current_user.id:
             return jsonify({'error': 'Acesso negado.'}), 403
 
         if 'status_inscricao' in data:
             return jsonify({'error': 'Apenas administradores podem alterar o status.'}), 403
 
-    if 'status_inscricao' in data and data['status_inscricao'] in ['aprovado', 'rejeitado']:
-        data['data_aprovacao_recusa'] = datetime.utcnow()
+    if 'status_inscricao' in data and data['status_inscricao'] not in StatusInscricao.__members__:
+        return jsonify({'error': 'Status de inscrição inválido.'}), 400
+
+    if 'status_inscricao' in data and data['status_inscricao'] in ['aprovada', 'recusada']:
+        data['data_aprovacao_recusa'] = datetime.now()
 
-    inscricao_atualizada = InscricaoRepo.update_inscricao(id_inscricao, data)
+    try:
+        inscricao_atualizada = InscricaoRepo.update_inscricao(id_inscricao, data)
+    except VagasEsgotadas:
+        return jsonify({'error': 'Não há vagas disponíveis nesta oportunidade.'}), 409
     return jsonify(inscricao_atualizada.to_dict()), 200
 
 
+# ===================== UPDATE STATUS EM LOTE =====================
+@inscricao_bp.route('/lote', methods=['PUT'])
+@token_required
+def decidir_inscricoes():
+    data = request.get_json() or {}
+
+    id_organizacao = data.get('id_organizacao')
+    ids = data.get('ids')
+    status = data.get('status_inscricao')
+
+    # =========== Validation ==============
+    if not id_organizacao or not isinstance(ids, list) or not ids:
+        return jsonify({'error': 'Os campos id_organizacao e ids são obrigatórios.'}), 400
+
+    if not all(isinstance(id, int) for id in ids):
+        return jsonify({'error': 'ids deve ser uma lista de inteiros.'}), 400
+
+    if len(ids) > MAX_DECISOES_LOTE:
+        return jsonify({'error': f'No máximo {MAX_DECISOES_LOTE} inscrições por chamada.'}), 400
+
+    if status not in ('aprovada', 'recusada'):
+        return jsonify({'error': 'status_inscricao deve ser aprovada ou recusada.'}), 400
+
+    organizacao = OrganizacaoRepo.get_organizacao_by_id(id_organizacao)
+    if not organizacao:
+        return jsonify({'error': 'Organização não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    if not is_owner_or_admin(organizacao.id_responsavel):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    agora = datetime.now()
+    resultados = InscricaoRepo.decidir_em_lote(organizacao.id, ids, status, agora)
+
+    return jsonify({
+        'data_aprovacao_recusa': agora.isoformat(),
+        'resultados': [{'id': id, 'resultado': resultado} for id, resultado in resultados.items()]
+    }), 200
+
+
+# ===================== LISTA DE ESPERA =====================
+@inscricao_bp.route('/espera/oportunidade/<int:id_oportunidade>', methods=['GET'])
+@token_required
+def get_lista_espera(id_oportunidade):
+    oportunidade = OportunidadeRepo.get_oportunidade_by_id(id_oportunidade)
+    if not oportunidade:
+        return jsonify({'error': 'Oportunidade não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    # Só o responsável pela organização da oportunidade (ou um admin)
+    if not is_owner_or_admin(oportunidade.organizacao.id_responsavel):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    try:
+        limit, _ = page_args(request.args)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    fila = InscricaoRepo.get_lista_espera(id_oportunidade, limit)
+    return jsonify([e.to_dict() for e in fila]), 200
+
+
+@inscricao_bp.route('/espera/<int:id_entrada>', methods=['DELETE'])
+@token_required
+def sair_lista_espera(id_entrada):
+    entrada = InscricaoRepo.get_lista_espera_by_id(id_entrada)
+    if not entrada:
+        return jsonify({'error': 'Entrada da lista de espera não encontrada.'}), 404
+
+    if not is_owner_or_admin(entrada.id_usuario):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    InscricaoRepo.sair_lista_espera(id_entrada)
+    return jsonify({'message': 'Removido da lista de espera.'}), 200
+
+
 # ===================== DELETE INSCRIÇÃO =====================
 @inscricao_bp.route('/<int:id_inscricao>', methods=['DELETE'])
 @token_required
 def delete_inscricao(id_inscricao):
-    current_user = request.user
     inscricao = InscricaoRepo.get_inscricao_by_id(id_inscricao)
 
     if not inscricao:
         return jsonify({'error': 'Inscrição não encontrada.'}), 404
 
-    if inscricao.id_usuario != current_user.id and not getattr(current_user, 'is_admin', False):
+    if not is_owner_or_admin(inscricao.id_usuario):
         return jsonify({'error': 'Acesso negado.'}), 403
 
     success = InscricaoRepo.delete_inscricao(id_inscricao)
@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
-from middleware.jwt_util import token_required
-from repositories import OportunidadeRepo
+from middleware.jwt_util import token_required, has_role, is_owner_or_admin
+from repositories import OportunidadeRepo, HabilidadeRepo, UserRepo, FeedRepo, OrganizacaoRepo
+from repositories.pagination import page_args, page_headers, MAX_LIMIT
+from services.skill_match import METODOS
 from models.oportunidade import Oportunidade
+from models import OportunidadeHabilidade, Inscricao
 from models.usuario import Usuario as User
 
 oportunidade_bp = Blueprint('oportunidade_bp', __name__)
@@ -16,7 +19,7 @@ def create_oportunidade():
     data = request.get_json()
 
     #=========== permission control ==============
-    if current_user.tipo_usuario != 'organizacao' and not current_user.tipo_usuario == 'admin':
+    if not has_role('organizacao'):
         return jsonify({'error': 'Apenas organizações ou administradores podem criar oportunidades.'}), 403
 
     #=========== getting data ==============
@@ -35,9 +38,33 @@ def create_oportunidade():
     if not all([titulo, descricao, local_endereco, comunidade, data_hora, duracao_horas, num_vagas]):
         return jsonify({'error': 'Todos os campos obrigatórios devem ser preenchidos.'}), 400
 
+    #=========== organizacao ==============
+    # A oportunidade pertence a uma organização do usuário; quem tem mais de
+    # uma (ou um admin) informa qual em id_organizacao
+    id_organizacao = data.get('id_organizacao')
+    if id_organizacao is not None:
+        organizacao = OrganizacaoRepo.get_organizacao_by_id(id_organizacao)
+        if not organizacao:
+            return jsonify({'error': 'Organização não encontrada.'}), 404
+        if not is_owner_or_admin(organizacao.id_responsavel):
+            return jsonify({'error': 'Acesso negado.'}), 403
+    else:
+        organizacoes = OrganizacaoRepo.get_organizacoes_by_responsavel(current_user.id)
+        if not organizacoes:
+            return jsonify({'error': 'Cadastre uma organização antes de criar oportunidades.'}), 403
+        if len(organizacoes) > 1:
+            return jsonify({'error': 'Informe id_organizacao.'}), 400
+        organizacao = organizacoes[0]
+
+    #=========== habilidades: names -> ids ==============
+    try:
+        habilidades = list(HabilidadeRepo.get_or_create_ids_by_names(habilidades).values())
+    except ValueError as erro:
+        return jsonify({'error': str(erro)}), 400
+
     #=========== creating instance ==============
     oportunidade : Oportunidade = OportunidadeRepo.create_oportunidade(
-        id_organizacao=current_user.id,
+        id_organizacao=organizacao.id,
         titulo=titulo,
         descricao=descricao,
         local_endereco=local_endereco,
@@ -57,7 +84,91 @@ def create_oportunidade():
 #================== GET ALL OPORTUNIDADES ==================
 @oportunidade_bp.route('/', methods=['GET'])
 def get_all_oportunidades():
-    oportunidades = OportunidadeRepo.get_all_oportunidades()
+    try:
+        limit, cursor = page_args(request.args)
+        page = OportunidadeRepo.get_oportunidades_page(limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify(page.items), 200, page_headers(page)
+
+
+#================== FILTRAR OPORTUNIDADES (RF010) ==================
+@oportunidade_bp.route('/filtrar', methods=['GET'])
+def filtrar_oportunidades():
+    args = request.args
+
+    #=========== parsing filters ==============
+    try:
+        limit, cursor = page_args(args)
+        data_inicio = datetime.fromisoformat(args['data_inicio']) if args.get('data_inicio') else None
+        data_fim = datetime.fromisoformat(args['data_fim']) if args.get('data_fim') else None
+        duracao_min = int(args['duracao_min']) if args.get('duracao_min') else None
+        duracao_max = int(args['duracao_max']) if args.get('duracao_max') else None
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de busca inválidos. Datas em ISO8601 e durações inteiras.'}), 400
+
+    # habilidades por nome, separadas por vírgula, resolvidas pelo catálogo em memória
+    habilidade_ids = None
+    if args.get('habilidades'):
+        catalogo = HabilidadeRepo.get_catalog()
+        nomes = [nome.strip() for nome in args['habilidades'].split(',') if nome.strip()]
+        habilidade_ids = [hab['id'] for hab in map(catalogo.get_by_nome, nomes) if hab]
+        if not habilidade_ids:
+            return jsonify([]), 200
+
+    # tags separadas por vírgula; `tag` (uma só) continua aceito
+    tags = [t for t in args.get('tags', args.get('tag', '')).split(',') if t.strip()] or None
+
+    #=========== searching ==============
+    try:
+        page = OportunidadeRepo.search_oportunidades(
+            limit,
+            cursor,
+            comunidade=args.get('comunidade'),
+            habilidade_ids=habilidade_ids,
+            tags=tags,
+            todas_tags=args.get('todas_tags', 'false').lower() == 'true',
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            duracao_min=duracao_min,
+            duracao_max=duracao_max,
+            apenas_abertas=args.get('abertas', 'true').lower() != 'false'
+        )
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify(page.items), 200, page_headers(page)
+
+
+#================== BUSCA POR PALAVRAS-CHAVE ==================
+@oportunidade_bp.route('/busca', methods=['GET'])
+def buscar_oportunidades():
+    consulta = request.args.get('q', '').strip()
+    if not consulta:
+        return jsonify({'error': 'O parâmetro q é obrigatório.'}), 400
+
+    try:
+        limit, _ = page_args(request.args)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    oportunidades = OportunidadeRepo.buscar_texto(consulta, limit)
+    return jsonify([o.to_dict() for o in oportunidades]), 200
+
+
+#================== FEED DO VOLUNTARIO ==================
+@oportunidade_bp.route('/feed', methods=['GET'])
+@token_required
+def get_feed():
+    current_user = request.user
+
+    try:
+        limit, _ = page_args(request.args)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    oportunidades = FeedRepo.get_feed(current_user.id, current_user.cidade, current_user.bairro, limit)
     return jsonify([o.to_dict() for o in oportunidades]), 200
 
 
@@ -72,18 +183,46 @@ def get_oportunidade_by_id(id_oportunidade):
     return jsonify(oportunidade.to_dict()), 200
 
 
+#================== VOLUNTARIOS COMPATIVEIS ==================
+@oportunidade_bp.route('/<int:id_oportunidade>/voluntarios', methods=['GET'])
+@token_required
+def get_voluntarios_compativeis(id_oportunidade):
+    oportunidade : Oportunidade = OportunidadeRepo.get_oportunidade_by_id(id_oportunidade)
+    if not oportunidade:
+        return jsonify({'error': 'Oportunidade não encontrada.'}), 404
+
+    #=========== permission control ==============
+    # Só o responsável pela organização da oportunidade (ou um admin)
+    if not is_owner_or_admin(oportunidade.organizacao.id_responsavel):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    #=========== parsing params ==============
+    metodo = request.args.get('metodo', 'jaccard')
+    try:
+        k = int(request.args.get('k', 20))
+    except ValueError:
+        k = 0
+    if not 1 <= k <= MAX_LIMIT or metodo not in METODOS:
+        return jsonify({'error': f'Use k entre 1 e {MAX_LIMIT} e metodo em {", ".join(METODOS)}.'}), 400
+
+    #=========== ranking ==============
+    habilidade_ids = [hid for (hid,) in oportunidade.habilidades.with_entities(OportunidadeHabilidade.id_habilidade)]
+    inscritos = [uid for (uid,) in oportunidade.inscricoes.with_entities(Inscricao.id_usuario)]
+
+    voluntarios = UserRepo.rank_voluntarios(habilidade_ids, oportunidade.comunidade, k, metodo, excluir=inscritos)
+    return jsonify(voluntarios), 200
+
+
 #================== GET OPORTUNIDADES BY ORGANIZACAO ==================
 @oportunidade_bp.route('/organizacao/<int:id_organizacao>', methods=['GET'])
 def get_oportunidades_by_organizacao(id_organizacao):
-    oportunidades = OportunidadeRepo.get_oportunidades_by_organizacao(id_organizacao)
-    return jsonify([o.to_dict() for o in oportunidades]), 200
+    return jsonify(OportunidadeRepo.get_oportunidades_by_organizacao(id_organizacao)), 200
 
 
 #================== UPDATE OPORTUNIDADE ==================
 @oportunidade_bp.route('/<int:id_oportunidade>', methods=['PUT'])
 @token_required
 def update_oportunidade(id_oportunidade):
-    current_user : User = request.user
     data = request.get_json()
 
     oportunidade : Oportunidade = OportunidadeRepo.get_oportunidade_by_id(id_oportunidade)
@@ -91,7 +230,8 @@ def update_oportunidade(id_oportunidade):
         return jsonify({'error': 'Oportunidade não encontrada.'}), 404
 
     #=========== permission control ==============
-    if oportunidade.organizaçao_id != current_user.id and current_user.tipo_usuario != 'admin':
+    # Só o responsável pela organização da oportunidade (ou um admin)
+    if not is_owner_or_admin(oportunidade.organizacao.id_responsavel):
         return jsonify({'error': 'Acesso negado.'}), 403
 
     #=========== allowed fields ==============
@@ -109,7 +249,19 @@ def update_oportunidade(id_oportunidade):
         except:
             return jsonify({'error': 'Formato de data inválido. Use ISO8601.'}), 400
 
-    oportunidade = OportunidadeRepo.update_oportunidade(id_oportunidade, data)
+    if 'num_vagas' in data and (not isinstance(data['num_vagas'], int) or data['num_vagas'] < 1):
+        return jsonify({'error': 'num_vagas deve ser um inteiro positivo.'}), 400
+
+    if 'habilidades' in data:
+        try:
+            data['habilidades'] = list(HabilidadeRepo.get_or_create_ids_by_names(data['habilidades']).values())
+        except ValueError as erro:
+            return jsonify({'error': str(erro)}), 400
+
+    try:
+        oportunidade = OportunidadeRepo.update_oportunidade(id_oportunidade, data)
+    except ValueError:
+        return jsonify({'error': 'num_vagas não pode ser menor que o número de vagas já ocupadas.'}), 409
 
     return jsonify(oportunidade.to_dict()), 200
 
@@ -118,14 +270,13 @@ def update_oportunidade(id_oportunidade):
 @oportunidade_bp.route('/<int:id_oportunidade>', methods=['DELETE'])
 @token_required
 def delete_oportunidade(id_oportunidade):
-    current_user : User = request.user
-
     oportunidade : Oportunidade = OportunidadeRepo.get_oportunidade_by_id(id_oportunidade)
     if not oportunidade:
         return jsonify({'error': 'Oportunidade não encontrada.'}), 404
 
     #=========== permission control ==============
-    if oportunidade.organizaçao_id != current_user.id and current_user.tipo_usuario != 'admin':
+    # Só o responsável pela organização da oportunidade (ou um admin)
+    if not is_owner_or_admin(oportunidade.organizacao.id_responsavel):
         return jsonify({'error': 'Acesso negado.'}), 403
 
     success = OportunidadeRepo.delete_oportunidade(id_oportunidade)
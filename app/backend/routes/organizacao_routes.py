@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.security import generate_password_hash
-from middleware.jwt_util import token_required
+from middleware.jwt_util import token_required, is_owner_or_admin
 from repositories import OrganizacaoRepo
-from repositories.user_repo import UserRepo
+from repositories.pagination import page_args, page_headers
 from models.organizacao import Organizacao
 
 
@@ -80,16 +80,19 @@ def get_organizacao_by_cnpj(cnpj_id):
 # ================= GET ALL ORGANIZAÇÕES ===================
 @organizacao_bp.route('/organizacoes', methods=['GET'])
 def get_all_organizacoes():
-    organizacoes = OrganizacaoRepo.get_all_organizacoes()
-    organizacoes_list = [org.to_dict() for org in organizacoes]
-    return jsonify(organizacoes_list), 200
+    try:
+        limit, cursor = page_args(request.args)
+        page = OrganizacaoRepo.get_organizacoes_page(limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify(page.items), 200, page_headers(page)
 
 # ================= UPDATE ORGANIZAÇÃO ===================
 @organizacao_bp.route('/organizacoes/<int:organizacao_id>', methods=['PUT'])
 @token_required
 def update_organizacao(organizacao_id):
     data = request.get_json()
-    current_user = request.user
 
 
     #============= Fetch organização ==============
@@ -98,7 +101,7 @@ def update_organizacao(organizacao_id):
         return jsonify({'error': 'Organização não encontrada.'}), 404
 
     #============= Permission Control ==============
-    if current_user.id != organizacao.id_responsavel and not UserRepo.is_user_admin(current_user.id):
+    if not is_owner_or_admin(organizacao.id_responsavel):
         return jsonify({'error': 'Permissão negada.'}), 403
     
     #============= Update instance ==============
@@ -113,15 +116,13 @@ def update_organizacao(organizacao_id):
 @organizacao_bp.route('/organizacoes/<int:organizacao_id>', methods=['DELETE'])
 @token_required
 def delete_organizacao(organizacao_id):
-    current_user = request.user
-
     #============= Fetch organização ==============
     organizacao = OrganizacaoRepo.get_organizacao_by_id(organizacao_id)
     if not organizacao:
         return jsonify({'error': 'Organização não encontrada.'}), 404
 
     #============= Permission Control ==============
-    if current_user.id != organizacao.id_responsavel and not UserRepo.is_user_admin(current_user.id):
+    if not is_owner_or_admin(organizacao.id_responsavel):
         return jsonify({'error': 'Permissão negada.'}), 403
 
     #============= Delete instance ==============
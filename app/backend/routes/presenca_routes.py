@@ -0,0 +1,75 @@
+from flask import Blueprint, request, jsonify
+from middleware.jwt_util import token_required, is_owner_or_admin
+from repositories import InscricaoRepo, PresencaRepo
+from services.presenca import ENTRADA, SAIDA, ForaDaJanela, PinInvalido, SemCheckIn, escritor_presenca
+from models.enums import StatusInscricao
+from datetime import datetime
+
+presenca_bp = Blueprint('presenca_bp', __name__)
+
+# ===================== PIN DA INSCRIÇÃO =====================
+@presenca_bp.route('/inscricao/<int:id_inscricao>/pin', methods=['POST'])
+@token_required
+def gerar_pin(id_inscricao):
+    inscricao = InscricaoRepo.get_inscricao_by_id(id_inscricao)
+    if not inscricao:
+        return jsonify({'error': 'Inscrição não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    if not is_owner_or_admin(inscricao.id_usuario):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    if inscricao.status_inscricao != StatusInscricao.aprovada:
+        return jsonify({'error': 'Apenas inscrições aprovadas recebem PIN de presença.'}), 400
+
+    registro, criado = PresencaRepo.get_or_create_pin(inscricao)
+    return jsonify(registro.to_dict()), 201 if criado else 200
+
+
+# ===================== CHECK-IN / CHECK-OUT =====================
+def _marcar(id_oportunidade, tipo):
+    data = request.get_json() or {}
+
+    id_inscricao = data.get('id_inscricao')
+    pin = data.get('pin')
+
+    # =========== Validation ==============
+    if not isinstance(id_inscricao, int) or not isinstance(pin, str) or not pin:
+        return jsonify({'error': 'Os campos id_inscricao e pin são obrigatórios.'}), 400
+
+    tabela = PresencaRepo.get_tabela(id_oportunidade)
+    if not tabela:
+        return jsonify({'error': 'Oportunidade não encontrada.'}), 404
+
+    # ======= Permission Control =======
+    # Quem valida o PIN é o responsável pela organização, no local do evento
+    if not is_owner_or_admin(tabela.id_responsavel):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    try:
+        hora = PresencaRepo.marcar(tabela, tipo, id_inscricao, pin, datetime.now())
+    except ForaDaJanela:
+        return jsonify({'error': 'Fora do horário de check-in/check-out deste evento.'}), 409
+    except PinInvalido:
+        return jsonify({'error': 'PIN inválido para esta inscrição.'}), 403
+    except SemCheckIn:
+        return jsonify({'error': 'Check-in não realizado para esta inscrição.'}), 409
+
+    # `gravado` false: a marcação está aceita, mas ainda na fila de gravação em lote
+    # (movimento alto) e se perde se o processo cair antes; repetir a chamada é
+    # seguro e devolve o mesmo horário
+    campo = 'check_in_hora' if tipo == ENTRADA else 'check_out_hora'
+    gravado = escritor_presenca.pendente(tipo, id_inscricao) is None
+    return jsonify({'id_inscricao': id_inscricao, campo: hora.isoformat(), 'gravado': gravado}), 200
+
+
+@presenca_bp.route('/oportunidade/<int:id_oportunidade>/checkin', methods=['POST'])
+@token_required
+def check_in(id_oportunidade):
+    return _marcar(id_oportunidade, ENTRADA)
+
+
+@presenca_bp.route('/oportunidade/<int:id_oportunidade>/checkout', methods=['POST'])
+@token_required
+def check_out(id_oportunidade):
+    return _marcar(id_oportunidade, SAIDA)
@@ -1,11 +1,12 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash
-from middleware.jwt_util import token_required
+from services.password_pool import password_pool
+from middleware.jwt_util import token_required, is_owner_or_admin
 from repositories import UserRepo
 from validate_docbr import CPF
 from datetime import datetime
-from repositories import HabilidadeRepo
-from models import Habilidade
+from repositories import HabilidadeRepo, HistoricoRepo, ConquistaRepo, NotificacaoRepo, AvaliacaoRepo
+from models.enums import AlvoAvaliacao
+from repositories.pagination import page_args, page_headers
 from secrets import token_hex
 import base64
 import os
@@ -53,18 +54,14 @@ def create_user():
         return jsonify({'error':'A Imagem é obrigatória'}), 400
     
     # ============== Getting habilidades IDs from names ==============
-    habilidades_ids = []
-    for hab_name in habilidades:
-        hab : Habilidade = HabilidadeRepo.get_habilidade_by_name(hab_name)
-        if hab:
-            habilidades_ids.append(hab.id)
-        else:
-            #creates the habilidade if not exists
-            new_hab : Habilidade = HabilidadeRepo.create_habilidade(hab_name)
-            habilidades_ids.append(new_hab.id)
+    # creates the habilidades that do not exist yet, in a single batch
+    try:
+        habilidades_ids = list(HabilidadeRepo.get_or_create_ids_by_names(habilidades).values())
+    except ValueError as erro:
+        return jsonify({'error': str(erro)}), 400
 
     # =========== Hashing password ==============
-    senha_hash = generate_password_hash(senha)
+    senha_hash = password_pool.hash_password(senha)
 
     # ======== Decoding and saving image ===============
     nome_foto = f"{token_hex(16)}.png"
@@ -106,7 +103,13 @@ def get_user_by_id(user_id):
     user = UserRepo.get_user_by_id(user_id)
     if not user:
         return jsonify({'error': 'Usuário não encontrado.'}), 404
-    return jsonify(user.to_dict()), 200
+
+    # Totais de horas (RF008) e avaliação (RF018) vêm das tabelas de consolidação, sem agregar na consulta
+    return jsonify({
+        **user.to_dict(),
+        **HistoricoRepo.get_totais(user_id),
+        'avaliacao': AvaliacaoRepo.get_agregado(AlvoAvaliacao.usuario, user_id)
+    }), 200
 
 
 # ================= GET BY EMAIL ===================
@@ -137,11 +140,55 @@ def get_user_habilidades(user_id):
 
     return jsonify(habilidade_list), 200
 
+# ================ GET CONQUISTAS ====================
+@user_bp.route('/<int:user_id>/conquistas', methods=['GET'])
+def get_user_conquistas(user_id):
+    user = UserRepo.get_user_by_id(user_id)
+    if not user:
+        return jsonify({'error': 'Usuário não encontrado.'}), 404
+
+    return jsonify(ConquistaRepo.get_conquistas_by_usuario(user_id)), 200
+
+# ================ NOTIFICAÇÕES ====================
+@user_bp.route('/<int:user_id>/notificacoes', methods=['GET'])
+@token_required
+def get_user_notificacoes(user_id):
+    # ============== Permission Control ==============
+    if not is_owner_or_admin(user_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    try:
+        limit, cursor = page_args(request.args)
+        page = NotificacaoRepo.get_notificacoes_page(user_id, limit, cursor, apenas_nao_lidas=request.args.get('nao_lidas') == 'true')
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify([n.to_dict() for n in page.items]), 200, page_headers(page)
+
+@user_bp.route('/<int:user_id>/notificacoes/lidas', methods=['PUT'])
+@token_required
+def marcar_notificacoes_lidas(user_id):
+    # ============== Permission Control ==============
+    if not is_owner_or_admin(user_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    ids = (request.get_json() or {}).get('ids')
+    if not isinstance(ids, list) or not all(isinstance(id, int) for id in ids):
+        return jsonify({'error': 'ids deve ser uma lista de inteiros.'}), 400
+
+    total = NotificacaoRepo.marcar_lidas(user_id, ids)
+    return jsonify({'atualizadas': total}), 200
+
 # ================= GET ALL ===================
 @user_bp.route('/', methods=['GET'])
 def get_all_users():
-    users = UserRepo.get_all_users()
-    return jsonify([u.to_dict() for u in users]), 200
+    try:
+        limit, cursor = page_args(request.args)
+        page = UserRepo.get_users_page(limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos.'}), 400
+
+    return jsonify(page.items), 200, page_headers(page)
 
 
 # ================= GET ALL ADMINS ===================
@@ -155,11 +202,10 @@ def get_all_admins():
 @user_bp.route('/<int:user_id>', methods=['PUT'])
 @token_required
 def update_user(user_id):
-    current_user = request.user
     data = request.get_json()
 
     # ============== Permission Control ==============
-    if current_user.id != user_id and not UserRepo.is_user_admin(current_user.id):
+    if not is_owner_or_admin(user_id):
         return jsonify({'error': 'Acesso negado.'}), 403
 
     # ============== Allowed Fields ==============
@@ -194,24 +240,15 @@ def update_user(user_id):
 
     # ============== Getting habilidades IDs from names ==============
     habilidades = data.get('habilidades')
-    if habilidades:
-        habilidades_ids = []
-        
-        for hab_name in habilidades:
-            hab : Habilidade = HabilidadeRepo.get_habilidade_by_name(hab_name)
-            
-            if hab:
-                habilidades_ids.append(hab.id)
-            else:
-                #creates the habilidade if not exists
-                new_hab : Habilidade = HabilidadeRepo.create_habilidade(hab_name)
-                habilidades_ids.append(new_hab.id)
-
-        data['habilidades'] = habilidades_ids
+    if habilidades is not None:
+        try:
+            data['habilidades'] = list(HabilidadeRepo.get_or_create_ids_by_names(habilidades).values())
+        except ValueError as erro:
+            return jsonify({'error': str(erro)}), 400
 
     # ============== Hash password if changed ==============
     if 'senha' in data:
-        data['senha'] = generate_password_hash(data['senha'])
+        data['senha'] = password_pool.hash_password(data['senha'])
 
     # ============== Update User ==============
     user = UserRepo.update_user(user_id, data)
@@ -228,9 +265,7 @@ def update_user(user_id):
 @user_bp.route('/<int:user_id>', methods=['DELETE'])
 @token_required
 def delete_user(user_id):
-    current_user = request.user
-
-    if current_user.id != user_id and not UserRepo.is_user_admin(current_user.id):
+    if not is_owner_or_admin(user_id):
         return jsonify({'error': 'Acesso negado.'}), 403
 
     success = UserRepo.delete_user(user_id)
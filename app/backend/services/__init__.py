@@ -0,0 +1,8 @@
+from .password_pool import PasswordPool, PoolSaturated, password_pool
+from .text_index import TextIndex, oportunidade_index
+from .skill_match import SkillMatrix, skill_matrix
+from .feed_ranking import FeedCandidatos, feed_candidatos
+from .conquistas import MotorConquistas, motor_conquistas
+from .presenca import TabelaPresenca, presenca_cache, escritor_presenca
+from .email import Mensagem, SmtpLocal, create_transport, correio
+from .timeline import Timeline, TimelineCache, timeline_cache
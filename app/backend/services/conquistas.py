@@ -0,0 +1,71 @@
+from bisect import bisect_right
+from typing import Dict, List, Tuple, Iterable, NamedTuple
+
+class Regra(NamedTuple):
+    codigo: str
+    nome: str
+    contador: str
+    limite: float
+
+
+# Marcos das conquistas (RF016). `contador` é uma coluna de horas_usuario.
+REGRAS = (
+    Regra('horas_10', 'Primeiras 10 horas', 'total_horas', 10),
+    Regra('horas_50', '50 horas de voluntariado', 'total_horas', 50),
+    Regra('horas_100', '100 horas de voluntariado', 'total_horas', 100),
+    Regra('horas_500', '500 horas de voluntariado', 'total_horas', 500),
+    Regra('oportunidades_1', 'Primeira oportunidade concluída', 'total_oportunidades', 1),
+    Regra('oportunidades_5', '5 oportunidades concluídas', 'total_oportunidades', 5),
+    Regra('oportunidades_20', '20 oportunidades concluídas', 'total_oportunidades', 20),
+    Regra('organizacoes_3', 'Ajudou 3 organizações', 'total_organizacoes', 3),
+    Regra('organizacoes_10', 'Ajudou 10 organizações', 'total_organizacoes', 10),
+)
+
+
+class MotorConquistas:
+    """
+    Avalia as regras de forma incremental: as regras ficam indexadas por
+    contador e ordenadas por limite, então um evento só examina as regras dos
+    contadores que mudaram e, dentre elas, só as cruzadas pela mudança
+    (busca binária), sem reler o histórico do usuário.
+    """
+    def __init__(self, regras: Iterable[Regra]):
+        self.por_codigo : Dict[str, Regra] = {}
+        self._por_contador : Dict[str, Tuple[List[float], List[Regra]]] = {}
+
+        for regra in sorted(regras, key=lambda r: r.limite):
+            self.por_codigo[regra.codigo] = regra
+            limites, lista = self._por_contador.setdefault(regra.contador, ([], []))
+            limites.append(regra.limite)
+            lista.append(regra)
+
+    @property
+    def contadores(self) -> List[str]:
+        return list(self._por_contador)
+
+    def cruzadas(self, mudancas: Dict[str, Tuple[float, float]]) -> List[Regra]:
+        """
+        Regras cujo limite foi alcançado por mudanças {contador: (antes, depois)}.
+        """
+        resultado = []
+        for contador, (antes, depois) in mudancas.items():
+            if depois <= antes or contador not in self._por_contador:
+                continue
+            limites, regras = self._por_contador[contador]
+            # limites em (antes, depois]
+            resultado.extend(regras[bisect_right(limites, antes):bisect_right(limites, depois)])
+        return resultado
+
+    def atingidas(self, contadores: Dict[str, float]) -> List[Regra]:
+        """
+        Todas as regras satisfeitas pelos valores atuais (usado no backfill).
+        """
+        resultado = []
+        for contador, valor in contadores.items():
+            if contador in self._por_contador:
+                limites, regras = self._por_contador[contador]
+                resultado.extend(regras[:bisect_right(limites, valor)])
+        return resultado
+
+
+motor_conquistas = MotorConquistas(REGRAS)
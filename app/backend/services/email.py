@@ -0,0 +1,174 @@
+import smtplib
+import logging
+import socketserver
+from threading import Thread, Lock
+from email import message_from_bytes
+from email.message import EmailMessage
+from typing import Optional, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+class Mensagem(NamedTuple):
+    para: str
+    assunto: str
+    corpo: str
+
+
+class TransporteSmtp:
+    """
+    Envia pelo servidor SMTP configurado, com uma conexão por lote. Um
+    destinatário recusado não interrompe o lote: o erro fica na posição dele.
+    """
+    def __init__(self, host: str, port: int, usuario: Optional[str], senha: Optional[str], tls: bool, remetente: str):
+        self.host = host
+        self.port = port
+        self.usuario = usuario
+        self.senha = senha
+        self.tls = tls
+        self.remetente = remetente
+
+    def enviar(self, mensagens: List[Mensagem]) -> List[Optional[Exception]]:
+        erros : List[Optional[Exception]] = []
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.tls:
+                smtp.starttls()
+            if self.usuario:
+                smtp.login(self.usuario, self.senha)
+            for mensagem in mensagens:
+                email = EmailMessage()
+                email['From'] = self.remetente
+                email['To'] = mensagem.para
+                email['Subject'] = mensagem.assunto
+                email.set_content(mensagem.corpo)
+                try:
+                    smtp.send_message(email)
+                    erros.append(None)
+                except smtplib.SMTPException as erro:
+                    erros.append(erro)
+        return erros
+
+
+class TransporteConsole:
+    """
+    Só registra os emails no log (padrão em desenvolvimento).
+    """
+    def enviar(self, mensagens: List[Mensagem]) -> List[Optional[Exception]]:
+        for mensagem in mensagens:
+            logger.info('Email para %s: %s', mensagem.para, mensagem.assunto)
+        return [None] * len(mensagens)
+
+
+class TransporteMemoria:
+    """
+    Guarda os emails em `enviadas`, para testes.
+    """
+    def __init__(self):
+        self.enviadas : List[Mensagem] = []
+
+    def enviar(self, mensagens: List[Mensagem]) -> List[Optional[Exception]]:
+        self.enviadas.extend(mensagens)
+        return [None] * len(mensagens)
+
+
+def create_transport(tipo: str, host: Optional[str] = None, port: int = 25, usuario: Optional[str] = None,
+                     senha: Optional[str] = None, tls: bool = False, remetente: Optional[str] = None):
+    """
+    'smtp' usa o servidor MAIL_SERVER (um SmtpLocal em testes); 'memoria'
+    guarda os emails no processo; qualquer outro valor só registra no log.
+    """
+    if tipo == 'smtp':
+        return TransporteSmtp(host, port, usuario, senha, tls, remetente or usuario or 'nao-responda@localhost')
+    if tipo == 'memoria':
+        return TransporteMemoria()
+    return TransporteConsole()
+
+
+class Correio:
+    """
+    Ponto único de envio de emails; o transporte é trocado em `configure`.
+    """
+    def __init__(self, transporte=None):
+        self.transporte = transporte or TransporteConsole()
+
+    def configure(self, transporte) -> None:
+        self.transporte = transporte
+
+    def enviar(self, mensagens: List[Mensagem]) -> List[Optional[Exception]]:
+        """
+        Retorna o erro de cada mensagem, na mesma ordem (None quando foi
+        entregue). Se o transporte falha como um todo (ex.: sem conexão), o
+        erro vale para todas.
+        """
+        if not mensagens:
+            return []
+        try:
+            return self.transporte.enviar(mensagens)
+        except Exception as erro:
+            return [erro] * len(mensagens)
+
+
+class _SessaoSmtp(socketserver.StreamRequestHandler):
+    # Subconjunto do SMTP suficiente para o smtplib entregar mensagens
+    def handle(self):
+        self._responder('220 smtp-local pronto')
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode('utf-8', 'replace').strip().upper()
+
+            if comando.startswith(('EHLO', 'HELO')):
+                self._responder('250 smtp-local')
+            elif comando == 'DATA':
+                self._responder('354 termine com <CRLF>.<CRLF>')
+                self.server.receber(self._ler_dados())
+                self._responder('250 OK')
+            elif comando == 'QUIT':
+                self._responder('221 tchau')
+                return
+            elif comando.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self._responder('250 OK')
+            else:
+                self._responder('502 comando não suportado')
+
+    def _ler_dados(self) -> bytes:
+        linhas = []
+        while True:
+            linha = self.rfile.readline()
+            if not linha or linha.rstrip(b'\r\n') == b'.':
+                return b''.join(linhas)
+            # Remove o ponto de escape do início da linha
+            linhas.append(linha[1:] if linha.startswith(b'..') else linha)
+
+    def _responder(self, texto: str) -> None:
+        self.wfile.write(texto.encode() + b'\r\n')
+
+
+class SmtpLocal(socketserver.ThreadingTCPServer):
+    """
+    Servidor SMTP local que só guarda o que recebe (`mensagens`), para testar
+    o envio de ponta a ponta sem um provedor real (`flask smtp-local`).
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 1025, ao_receber=None):
+        super().__init__((host, port), _SessaoSmtp)
+        self.mensagens = []
+        self.ao_receber = ao_receber
+        self._lock = Lock()
+
+    def receber(self, dados: bytes) -> None:
+        mensagem = message_from_bytes(dados)
+        with self._lock:
+            self.mensagens.append(mensagem)
+        if self.ao_receber:
+            self.ao_receber(mensagem)
+
+    def iniciar(self) -> Thread:
+        thread = Thread(target=self.serve_forever, name='smtp-local', daemon=True)
+        thread.start()
+        return thread
+
+
+correio = Correio()
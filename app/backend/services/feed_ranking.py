@@ -0,0 +1,137 @@
+import time
+import heapq
+from datetime import datetime
+from threading import Lock
+from typing import Optional, Dict, List, Tuple, Iterable, FrozenSet
+from .text_index import fold
+
+# Pesos do score do feed (somam 1 no melhor caso)
+PESO_HABILIDADES = 0.5
+PESO_BAIRRO = 0.3
+PESO_CIDADE = 0.2
+PESO_PROXIMIDADE = 0.2
+
+# Meia-vida (h) do bônus de proximidade: uma oportunidade daqui a uma semana vale metade
+MEIA_VIDA_HORAS = 168
+
+
+class FeedCandidatos:
+    """
+    Fotografia das oportunidades abertas e futuras com os índices usados para
+    montar feeds: por habilidade, por local (comunidade normalizada) e as mais
+    próximas no tempo. Assim, ranquear um usuário só visita as oportunidades
+    que podem pontuar para ele, e não o catálogo inteiro. `versoes` são as
+    versões por comunidade (FeedVersao) lidas antes da carga.
+    """
+    __slots__ = ('carregado_em', 'versoes', 'data_hora', 'local', 'habilidades', 'por_habilidade', 'por_local', 'proximas')
+
+    def __init__(self, rows: Iterable[Tuple[int, str, datetime]], vinculos: Iterable[Tuple[int, int]], tamanho: int, versoes: Optional[Dict[str, int]] = None):
+        self.carregado_em = time.monotonic()
+        self.versoes : Dict[str, int] = versoes or {}
+        self.data_hora : Dict[int, datetime] = {}
+        self.local : Dict[int, str] = {}
+        self.por_local : Dict[str, List[int]] = {}
+        for id, comunidade, data_hora in rows:
+            self.data_hora[id] = data_hora
+            self.local[id] = fold(comunidade)
+            self.por_local.setdefault(self.local[id], []).append(id)
+
+        self.habilidades : Dict[int, FrozenSet[int]] = {}
+        self.por_habilidade : Dict[int, List[int]] = {}
+        agrupadas : Dict[int, List[int]] = {}
+        for id_oportunidade, id_habilidade in vinculos:
+            if id_oportunidade in self.data_hora:
+                agrupadas.setdefault(id_oportunidade, []).append(id_habilidade)
+                self.por_habilidade.setdefault(id_habilidade, []).append(id_oportunidade)
+        self.habilidades = {id: frozenset(hids) for id, hids in agrupadas.items()}
+
+        self.proximas = heapq.nsmallest(tamanho, self.data_hora, key=self.data_hora.get)
+
+    def versao_de(self, *comunidades: str) -> int:
+        # Maior versão entre as comunidades (já normalizadas), 0 se nenhuma mudou
+        return max((self.versoes.get(c, 0) for c in comunidades), default=0)
+
+    def ranquear(self, habilidades: FrozenSet[int], cidade: str, bairro: str, agora: datetime, tamanho: int) -> List[int]:
+        """
+        Ids das `tamanho` oportunidades com maior score para o usuário:
+        habilidades em comum (fração das do usuário), comunidade igual ao bairro
+        ou à cidade, e proximidade da data_hora.
+        """
+        cidade, bairro = fold(cidade or ''), fold(bairro or '')
+
+        candidatas = set(self.proximas)
+        for hid in habilidades:
+            candidatas.update(self.por_habilidade.get(hid, ()))
+        for local in (cidade, bairro):
+            if local:
+                candidatas.update(self.por_local.get(local, ()))
+
+        def score(id):
+            s = 0.0
+            if habilidades:
+                s += PESO_HABILIDADES * len(habilidades & self.habilidades.get(id, frozenset())) / len(habilidades)
+
+            local = self.local[id]
+            if bairro and local == bairro:
+                s += PESO_BAIRRO
+            elif cidade and local == cidade:
+                s += PESO_CIDADE
+
+            horas = max((self.data_hora[id] - agora).total_seconds() / 3600, 0)
+            s += PESO_PROXIMIDADE * 0.5 ** (horas / MEIA_VIDA_HORAS)
+            return s, -id
+
+        return [id for id in heapq.nlargest(tamanho, candidatas, key=score) if self.data_hora[id] >= agora]
+
+
+class FeedCandidatosCache:
+    """
+    Mantém a fotografia de candidatas do processo, recarregada pelo `loader`
+    depois de `ttl` segundos, quando uma oportunidade muda neste processo
+    (`invalidate`) ou quando a versão pedida de alguma comunidade é mais nova
+    que a da fotografia (mudança feita em outro processo). Mudanças em outras
+    áreas chegam aos outros processos em até `ttl` segundos.
+    `tamanho` é quantas oportunidades cada feed guarda e `feed_ttl` por quanto
+    tempo um feed salvo vale antes de ser recalculado.
+    """
+    def __init__(self, ttl: float = 60.0, tamanho: int = 200, feed_ttl: float = 3600.0):
+        self.ttl = ttl
+        self.tamanho = tamanho
+        self.feed_ttl = feed_ttl
+        self._snapshot : Optional[FeedCandidatos] = None
+        self._lock = Lock()
+
+    def configure(self, ttl: float, tamanho: int, feed_ttl: float) -> None:
+        self.ttl = ttl
+        self.tamanho = tamanho
+        self.feed_ttl = feed_ttl
+        self.invalidate()
+
+    def get(self, loader, versoes: Optional[Dict[str, int]] = None) -> FeedCandidatos:
+        """
+        Fotografia atual. `versoes` são as versões das comunidades que o
+        chamador leu do banco; `loader` devolve (versoes, rows, vinculos),
+        com as versões de todas as comunidades lidas antes das candidatas.
+        """
+        versoes = versoes or {}
+        snapshot = self._snapshot
+        if self._vencida(snapshot, versoes):
+            with self._lock:
+                snapshot = self._snapshot
+                if self._vencida(snapshot, versoes):
+                    lidas, rows, vinculos = loader()
+                    snapshot = self._snapshot = FeedCandidatos(rows, vinculos, self.tamanho, lidas)
+        return snapshot
+
+    def _vencida(self, snapshot: Optional[FeedCandidatos], versoes: Dict[str, int]) -> bool:
+        return (
+            snapshot is None
+            or any(snapshot.versao_de(comunidade) < versao for comunidade, versao in versoes.items())
+            or time.monotonic() - snapshot.carregado_em > self.ttl
+        )
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+
+feed_candidatos = FeedCandidatosCache()
@@ -0,0 +1,105 @@
+import multiprocessing
+from threading import BoundedSemaphore, Lock
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from werkzeug.security import check_password_hash, generate_password_hash
+
+class PoolSaturated(Exception):
+    """
+    Lançada quando o pool de verificação de senhas não aceita mais tarefas.
+    """
+
+
+def _hash_prefix(senha_hash: str) -> str:
+    # Formato do werkzeug: "método:parâmetros$salt$hash"
+    return senha_hash.split('$', 1)[0]
+
+def _verify(senha_hash: str, senha: str, method: str, current_prefix: str) -> Tuple[bool, Optional[str]]:
+    """
+    Executada no processo worker. Retorna (senha_valida, novo_hash), onde novo_hash
+    só é calculado quando o hash armazenado usa parâmetros desatualizados.
+    """
+    if not check_password_hash(senha_hash, senha):
+        return False, None
+
+    if _hash_prefix(senha_hash) != current_prefix:
+        return True, generate_password_hash(senha, method=method)
+
+    return True, None
+
+
+class PasswordPool:
+    """
+    Pool de processos limitado para a verificação de senhas, que é deliberadamente
+    cara em CPU. Além dos workers, aceita no máximo `queue_depth` tarefas em espera;
+    acima disso, `verify` falha imediatamente com PoolSaturated.
+    """
+    def __init__(self, workers: int = 0, queue_depth: int = 32, timeout: float = 5.0, method: str = 'scrypt'):
+        self._lock = Lock()
+        self._executor : Optional[ProcessPoolExecutor] = None
+        self.configure(workers, queue_depth, timeout, method)
+
+    def configure(self, workers: int, queue_depth: int, timeout: float, method: str) -> None:
+        self.shutdown()
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.method = method
+        self.current_prefix = _hash_prefix(generate_password_hash('', method=method))
+        self._slots = BoundedSemaphore(max(workers, 1) + queue_depth)
+
+    def hash_password(self, senha: str) -> str:
+        return generate_password_hash(senha, method=self.method)
+
+    def verify(self, senha_hash: str, senha: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica a senha e retorna (senha_valida, novo_hash).
+        Com `workers == 0` a verificação roda na própria thread da requisição.
+        """
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PoolSaturated()
+
+        if self.workers <= 0:
+            try:
+                return _verify(senha_hash, senha, self.method, self.current_prefix)
+            finally:
+                slots.release()
+
+        try:
+            future = self._get_executor().submit(_verify, senha_hash, senha, self.method, self.current_prefix)
+        except Exception:
+            slots.release()
+            raise
+
+        # A vaga só é liberada quando o worker termina, mesmo que a requisição desista antes
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PoolSaturated()
+        except BrokenProcessPool:
+            # Um worker morreu: descarta o executor para que o próximo login crie outro
+            self.shutdown()
+            raise PoolSaturated()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if not self._executor:
+                # 'spawn' evita herdar conexões do banco e locks das threads do servidor
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,234 @@
+import time
+import atexit
+import hmac
+import logging
+from datetime import datetime, timedelta
+from threading import Lock, Thread, Event
+from typing import Optional, Dict, List, Tuple, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+ENTRADA = 'entrada'
+SAIDA = 'saida'
+
+
+class ForaDaJanela(Exception):
+    """
+    Lançada quando o check-in/check-out acontece fora da janela do evento.
+    """
+
+class PinInvalido(Exception):
+    """
+    Lançada quando o PIN não confere com o da inscrição.
+    """
+
+class SemCheckIn(Exception):
+    """
+    Lançada no check-out de uma inscrição que não fez check-in.
+    """
+
+
+class TabelaPresenca:
+    """
+    PINs e horários de presença das inscrições de um evento, em memória.
+    Check-in e check-out validam e marcam aqui; a gravação no banco fica a
+    cargo do EscritorPresenca. Guarda também o id do responsável pela
+    organização, que é quem pode validar os PINs.
+    """
+    def __init__(self, id_oportunidade: int, id_organizacao: int, id_responsavel: int, data_hora: datetime,
+                 registros: Iterable[Tuple[int, str, Optional[datetime], Optional[datetime]]]):
+        self.id_oportunidade = id_oportunidade
+        self.id_organizacao = id_organizacao
+        self.id_responsavel = id_responsavel
+        self.data_hora = data_hora
+        self.carregada_em = time.monotonic()
+        self.pins : Dict[int, str] = {}
+        self.entradas : Dict[int, datetime] = {}
+        self.saidas : Dict[int, datetime] = {}
+        self._lock = Lock()
+
+        for id_inscricao, pin, entrada, saida in registros:
+            self.adicionar(id_inscricao, pin, entrada, saida)
+
+    def adicionar(self, id_inscricao: int, pin: str, entrada: Optional[datetime] = None, saida: Optional[datetime] = None) -> None:
+        self.pins[id_inscricao] = pin
+        if entrada:
+            self.entradas[id_inscricao] = entrada
+        if saida:
+            self.saidas[id_inscricao] = saida
+
+    def na_janela(self, agora: datetime, antes: float, depois: float) -> bool:
+        return self.data_hora - timedelta(seconds=antes) <= agora <= self.data_hora + timedelta(seconds=depois)
+
+    def conhece(self, id_inscricao: int) -> bool:
+        return id_inscricao in self.pins
+
+    def marcada(self, tipo: str, id_inscricao: int) -> bool:
+        return id_inscricao in (self.entradas if tipo == ENTRADA else self.saidas)
+
+    def remover(self, id_inscricao: int) -> None:
+        # Inscrição que deixou de estar aprovada
+        with self._lock:
+            self.pins.pop(id_inscricao, None)
+            self.entradas.pop(id_inscricao, None)
+            self.saidas.pop(id_inscricao, None)
+
+    def registrar_entrada(self, id_inscricao: int, entrada: datetime) -> None:
+        # Entrada marcada fora desta tabela (outro processo ou carga anterior)
+        with self._lock:
+            self.entradas.setdefault(id_inscricao, entrada)
+
+    def marcar(self, tipo: str, id_inscricao: int, pin: str, agora: datetime) -> Tuple[datetime, bool]:
+        """
+        Marca a entrada ou a saída. Retorna (horário, novo): repetir a operação
+        devolve o horário já marcado com novo=False.
+        """
+        if not hmac.compare_digest(self.pins.get(id_inscricao, ''), pin):
+            raise PinInvalido()
+
+        with self._lock:
+            if tipo == SAIDA and id_inscricao not in self.entradas:
+                raise SemCheckIn()
+
+            marcados = self.entradas if tipo == ENTRADA else self.saidas
+            if id_inscricao in marcados:
+                return marcados[id_inscricao], False
+            marcados[id_inscricao] = agora
+            return agora, True
+
+
+class PresencaCache:
+    """
+    Mantém as tabelas de presença dos eventos em andamento. Uma tabela é
+    carregada pelo `loader` na primeira validação do evento e vale por `ttl`
+    segundos; check-in e check-out só são aceitos entre `janela_antes`
+    segundos antes e `janela_depois` segundos depois da data_hora.
+    """
+    def __init__(self, janela_antes: float = 7200.0, janela_depois: float = 43200.0, ttl: float = 3600.0):
+        self.janela_antes = janela_antes
+        self.janela_depois = janela_depois
+        self.ttl = ttl
+        self._tabelas : Dict[int, TabelaPresenca] = {}
+        self._lock = Lock()
+
+    def configure(self, janela_antes: float, janela_depois: float, ttl: float) -> None:
+        self.janela_antes = janela_antes
+        self.janela_depois = janela_depois
+        self.ttl = ttl
+        self.invalidate()
+
+    def get(self, id_oportunidade: int, loader: Callable[[int], Optional[TabelaPresenca]]) -> Optional[TabelaPresenca]:
+        tabela = self._tabelas.get(id_oportunidade)
+        if tabela is None or time.monotonic() - tabela.carregada_em > self.ttl:
+            with self._lock:
+                tabela = self._tabelas.get(id_oportunidade)
+                if tabela is None or time.monotonic() - tabela.carregada_em > self.ttl:
+                    tabela = loader(id_oportunidade)
+                    if tabela is None:
+                        self._tabelas.pop(id_oportunidade, None)
+                        return None
+                    self._tabelas[id_oportunidade] = tabela
+        return tabela
+
+    def get_loaded(self, id_oportunidade: int) -> Optional[TabelaPresenca]:
+        return self._tabelas.get(id_oportunidade)
+
+    def descartar_encerrados(self, agora: datetime) -> None:
+        # Libera a memória dos eventos cuja janela já fechou
+        for id_oportunidade, tabela in list(self._tabelas.items()):
+            if agora > tabela.data_hora + timedelta(seconds=self.janela_depois):
+                self._tabelas.pop(id_oportunidade, None)
+
+    def invalidate(self, id_oportunidade: Optional[int] = None) -> None:
+        if id_oportunidade is None:
+            self._tabelas = {}
+        else:
+            self._tabelas.pop(id_oportunidade, None)
+
+
+class EscritorPresenca:
+    """
+    Grava os horários de presença em micro-lotes: as marcações entram numa
+    fila em memória e uma thread as entrega a `gravar` a cada `intervalo`
+    segundos, ou antes, quando a fila chega a `lote` itens. Assim centenas de
+    check-ins por minuto viram poucos UPDATEs em lote.
+
+    Com até `sincrono_ate` marcações na fila, quem enfileira grava na hora,
+    antes de responder. Acima disso, o que ainda está na fila se perde se o
+    processo cair; `flush` esvazia a fila na hora (usado no encerramento do
+    processo). `pendente` procura uma marcação que ainda não chegou ao banco.
+    """
+    def __init__(self, lote: int = 200, intervalo: float = 0.5, sincrono_ate: int = 20):
+        self.lote = lote
+        self.intervalo = intervalo
+        self.sincrono_ate = sincrono_ate
+        self._gravar : Optional[Callable[[List[Tuple[str, int, datetime]]], None]] = None
+        self._fila : List[Tuple[str, int, datetime]] = []
+        # Lotes sendo gravados agora (pela thread e por quem grava na hora)
+        self._gravando : List[List[Tuple[str, int, datetime]]] = []
+        self._lock = Lock()
+        self._cheia = Event()
+        self._thread : Optional[Thread] = None
+        atexit.register(self.flush)
+
+    def configure(self, gravar: Callable[[List[Tuple[str, int, datetime]]], None], lote: int, intervalo: float, sincrono_ate: int) -> None:
+        self._gravar = gravar
+        self.lote = lote
+        self.intervalo = intervalo
+        self.sincrono_ate = sincrono_ate
+
+    def enfileirar(self, tipo: str, id_inscricao: int, hora: datetime) -> None:
+        with self._lock:
+            self._fila.append((tipo, id_inscricao, hora))
+            pequena = len(self._fila) <= self.sincrono_ate
+            cheia = len(self._fila) >= self.lote
+            # A thread nasce no primeiro uso, já no processo que vai atender
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._loop, name='escritor-presenca', daemon=True)
+                self._thread.start()
+        if pequena:
+            # Pouco movimento: não vale esperar o lote, e a marcação chega ao banco antes da resposta
+            self.flush()
+        elif cheia:
+            self._cheia.set()
+
+    def pendentes(self) -> int:
+        return len(self._fila)
+
+    def pendente(self, tipo: str, id_inscricao: int) -> Optional[datetime]:
+        # Horário ainda na fila ou no lote sendo gravado, se houver
+        with self._lock:
+            for itens in self._gravando + [self._fila]:
+                for t, id_pendente, hora in itens:
+                    if t == tipo and id_pendente == id_inscricao:
+                        return hora
+        return None
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._gravar is None:
+                return
+            itens, self._fila = self._fila, []
+            if not itens:
+                return
+            self._gravando.append(itens)
+        try:
+            self._gravar(itens)
+        except Exception:
+            # Devolve o lote à fila para a próxima rodada
+            logger.exception('Falha ao gravar %d marcações de presença', len(itens))
+            with self._lock:
+                self._fila[:0] = itens
+        finally:
+            with self._lock:
+                self._gravando.remove(itens)
+
+    def _loop(self) -> None:
+        while True:
+            self._cheia.wait(self.intervalo)
+            self._cheia.clear()
+            self.flush()
+
+
+presenca_cache = PresencaCache()
+escritor_presenca = EscritorPresenca()
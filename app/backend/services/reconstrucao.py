@@ -0,0 +1,38 @@
+from threading import Lock
+from typing import Callable
+
+Tarefa = Callable[[], None]
+
+
+class Reconstrucao:
+    """
+    Coordena a reconstrução a partir do banco de uma estrutura em memória
+    (índice de busca, matriz de habilidades). A primeira construção acontece
+    na hora, e as chamadas concorrentes esperam por ela em vez de ler o banco
+    de novo. Depois disso, uma estrutura vencida continua servindo enquanto
+    uma única reconstrução roda por `executar` (ex.: numa thread).
+    """
+    def __init__(self):
+        self._lock = Lock()
+
+    def garantir(self, construida: Callable[[], bool], vencida: Callable[[], bool], reconstruir: Tarefa, executar: Callable[[Tarefa], None]) -> None:
+        if not construida():
+            with self._lock:
+                if not construida():
+                    reconstruir()
+            return
+
+        if not vencida() or not self._lock.acquire(blocking=False):
+            return
+
+        def tarefa():
+            try:
+                reconstruir()
+            finally:
+                self._lock.release()
+
+        try:
+            executar(tarefa)
+        except BaseException:
+            self._lock.release()
+            raise
@@ -0,0 +1,197 @@
+import math
+import time
+import heapq
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from threading import RLock
+from typing import Optional, Dict, List, Tuple, Iterable, Callable
+from .text_index import fold
+from .reconstrucao import Reconstrucao, Tarefa
+
+# Bônus de afinidade quando a comunidade da oportunidade coincide com o local do voluntário
+BONUS_BAIRRO = 0.2
+BONUS_CIDADE = 0.1
+
+METODOS = ('jaccard', 'ponderado')
+
+
+class SkillMatrix:
+    """
+    Matriz esparsa voluntário x habilidade em memória, guardada por colunas:
+    para cada habilidade, um array ordenado com os ids dos voluntários que a têm.
+    Pontuar uma oportunidade percorre só as colunas das habilidades pedidas
+    (uma multiplicação esparsa matriz-vetor), sem consultar o banco.
+
+    É atualizada incrementalmente pelo UserRepo e reconstruída a partir do banco
+    na primeira consulta ou quando passa de `max_age` segundos (ver `garantir`).
+    """
+    def __init__(self, max_age: float = 600.0):
+        self.max_age = max_age
+        self._lock = RLock()
+        self._colunas : Dict[int, array] = {}
+        self._linhas : Dict[int, Tuple[int, ...]] = {}
+        self._locais : Dict[int, Tuple[str, str]] = {}
+        self._construida_em : Optional[float] = None
+        # Uma reconstrução por vez; as escritas feitas durante ela são repetidas na matriz nova
+        self._reconstrucao = Reconstrucao()
+        self._pendentes : Optional[List[Tuple[int, Optional[tuple]]]] = None
+
+    def configure(self, max_age: float) -> None:
+        self.max_age = max_age
+        # A próxima consulta reconstrói a partir do banco do app recém-configurado
+        self._construida_em = None
+
+    # ================= ESCRITA ===================
+
+    def set_user(self, user_id: int, habilidade_ids: Iterable[int], cidade: str, bairro: str) -> None:
+        linha = tuple(sorted(set(habilidade_ids)))
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append((user_id, (linha, cidade, bairro)))
+            self._remove_linha(user_id)
+            for hid in linha:
+                insort(self._colunas.setdefault(hid, array('I')), user_id)
+            self._linhas[user_id] = linha
+            self._locais[user_id] = (fold(cidade or ''), fold(bairro or ''))
+
+    def remove_user(self, user_id: int) -> None:
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append((user_id, None))
+            self._remove_linha(user_id)
+            self._locais.pop(user_id, None)
+
+    def rebuild(self, usuarios: Iterable[Tuple[int, str, str]], vinculos: Iterable[Tuple[int, int]]) -> None:
+        """
+        Reconstrói a matriz a partir de (id, cidade, bairro) dos voluntários e
+        dos pares (id_usuario, id_habilidade) ordenados por id_usuario.
+        """
+        with self._lock:
+            self._pendentes = []
+        try:
+            locais = {uid: (fold(cidade or ''), fold(bairro or '')) for uid, cidade, bairro in usuarios}
+
+            linhas : Dict[int, List[int]] = {}
+            colunas : Dict[int, array] = {}
+            for uid, hid in vinculos:
+                if uid in locais:
+                    linhas.setdefault(uid, []).append(hid)
+                    colunas.setdefault(hid, array('I')).append(uid)
+        except BaseException:
+            with self._lock:
+                self._pendentes = None
+            raise
+
+        # Vínculos vêm ordenados por usuário, então cada coluna já está ordenada
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, None
+            self._colunas = colunas
+            self._linhas = {uid: tuple(sorted(hids)) for uid, hids in linhas.items()}
+            self._locais = locais
+            self._construida_em = time.monotonic()
+
+            # Escritas que chegaram durante a leitura podem não estar nela: repete na ordem em que vieram
+            for user_id, dados in pendentes:
+                if dados is None:
+                    self.remove_user(user_id)
+                else:
+                    self.set_user(user_id, *dados)
+
+    def needs_rebuild(self) -> bool:
+        return self._construida_em is None or time.monotonic() - self._construida_em > self.max_age
+
+    def garantir(self, carregar: Callable[[], tuple], executar: Callable[[Tarefa], None]) -> None:
+        # Matriz pronta para a consulta; `carregar` devolve (usuarios, vinculos) para o rebuild. Ver Reconstrucao
+        self._reconstrucao.garantir(
+            lambda: self._construida_em is not None,
+            self.needs_rebuild,
+            lambda: self.rebuild(*carregar()),
+            executar
+        )
+
+    # ================= LEITURA ===================
+
+    def top_k(
+        self,
+        habilidade_ids: Iterable[int],
+        comunidade: Optional[str],
+        k: int,
+        metodo: str = 'jaccard',
+        excluir: Iterable[int] = ()
+    ) -> List[Tuple[int, float, int]]:
+        """
+        Retorna até `k` tuplas (id_usuario, score, habilidades_em_comum) ordenadas
+        por score. Só são candidatos os voluntários com ao menos uma habilidade em
+        comum; a afinidade de local entra como bônus.
+
+        - jaccard: |U ∩ O| / |U ∪ O|
+        - ponderado: soma dos pesos (idf) das habilidades em comum / soma dos pesos
+          das habilidades da oportunidade, favorecendo habilidades raras.
+        """
+        pedidas = set(habilidade_ids)
+        excluir = set(excluir)
+        local = fold(comunidade or '')
+
+        with self._lock:
+            colunas = [(hid, self._colunas[hid]) for hid in pedidas if hid in self._colunas]
+            if not colunas:
+                return []
+
+            # Produto esparso: contagem de habilidades em comum por voluntário
+            em_comum = Counter()
+            for _, coluna in colunas:
+                em_comum.update(coluna)
+
+            if metodo == 'ponderado':
+                n = len(self._linhas) or 1
+                pesos = {hid: math.log(1 + n / len(coluna)) for hid, coluna in colunas}
+                total = sum(pesos.values()) + sum(math.log(1 + n) for hid in pedidas if hid not in pesos)
+                similaridade = Counter()
+                for hid, coluna in colunas:
+                    peso = pesos[hid] / total
+                    for uid in coluna:
+                        similaridade[uid] += peso
+            else:
+                n_pedidas = len(pedidas)
+                linhas = self._linhas
+                similaridade = {uid: c / (len(linhas[uid]) + n_pedidas - c) for uid, c in em_comum.items()}
+
+            locais = self._locais
+
+            def bonus(uid):
+                cidade, bairro = locais.get(uid, ('', ''))
+                if bairro == local:
+                    return BONUS_BAIRRO
+                return BONUS_CIDADE if cidade == local else 0.0
+
+            if local:
+                pontuados = ((similaridade[uid] + bonus(uid), -uid) for uid in em_comum if uid not in excluir)
+            else:
+                pontuados = ((similaridade[uid], -uid) for uid in em_comum if uid not in excluir)
+
+            # Desempate pelo menor id, para o ranking ser estável
+            melhores = heapq.nlargest(k, pontuados)
+            return [(-neg_uid, round(score, 4), em_comum[-neg_uid]) for score, neg_uid in melhores]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'voluntarios': len(self._locais),
+                'habilidades': len(self._colunas),
+                'vinculos': sum(len(c) for c in self._colunas.values())
+            }
+
+    def _remove_linha(self, user_id: int) -> None:
+        for hid in self._linhas.pop(user_id, ()):
+            coluna = self._colunas.get(hid)
+            if coluna is None:
+                continue
+            i = bisect_left(coluna, user_id)
+            if i < len(coluna) and coluna[i] == user_id:
+                del coluna[i]
+            if not coluna:
+                del self._colunas[hid]
+
+
+skill_matrix = SkillMatrix()
@@ -0,0 +1,225 @@
+import re
+import math
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from threading import RLock
+from typing import Optional, Dict, List, Tuple, Iterable, Callable
+from .reconstrucao import Reconstrucao, Tarefa
+
+# Palavras muito frequentes em português que não ajudam a diferenciar documentos
+STOPWORDS = frozenset('''
+a ao aos as ate com como da das de do dos e ela elas ele eles em entre era essa esse esta este
+eu foi for ha isso isto ja la mais mas me mesmo meu minha muito na nas nao nem no nos nossa
+nosso num numa o os ou para pela pelas pelo pelos por qual quando que quem se sem ser seu sua
+suas seus so sob sobre tambem te tem ter um uma umas uns voce voces
+'''.split())
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Peso de cada campo na frequência do termo
+PESO_TITULO = 3
+PESO_TAGS = 2
+PESO_DESCRICAO = 1
+
+
+def fold(texto: str) -> str:
+    """
+    Remove acentos e diferença entre maiúsculas/minúsculas ("Ação" -> "acao").
+    """
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def _radical(token: str) -> str:
+    # Normalização leve de plural: "acoes" -> "acao", "jardins" -> "jardim", "criancas" -> "crianca"
+    if len(token) > 4 and token.endswith(('oes', 'aes')):
+        return token[:-3] + 'ao'
+    if len(token) > 3 and token.endswith('ns'):
+        return token[:-2] + 'm'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(texto: Optional[str]) -> List[str]:
+    if not texto:
+        return []
+    return [_radical(t) for t in _TOKEN_RE.findall(fold(texto)) if len(t) > 1 and t not in STOPWORDS]
+
+
+class _Postings:
+    """
+    Lista invertida de um termo: ids de documentos ordenados e frequências
+    ponderadas, em arrays de inteiros compactos.
+    """
+    __slots__ = ('docs', 'freqs')
+
+    def __init__(self):
+        self.docs = array('I')
+        self.freqs = array('H')
+
+    def set(self, doc_id: int, freq: int) -> None:
+        i = bisect_left(self.docs, doc_id)
+        if i < len(self.docs) and self.docs[i] == doc_id:
+            self.freqs[i] = freq
+        else:
+            self.docs.insert(i, doc_id)
+            self.freqs.insert(i, freq)
+
+    def remove(self, doc_id: int) -> None:
+        i = bisect_left(self.docs, doc_id)
+        if i < len(self.docs) and self.docs[i] == doc_id:
+            del self.docs[i]
+            del self.freqs[i]
+
+
+Documento = Tuple[int, str, str, Optional[str]]
+
+
+class TextIndex:
+    """
+    Índice invertido em memória com ranking BM25 sobre título, descrição e tags
+    das oportunidades abertas. É atualizado incrementalmente pelo OportunidadeRepo
+    e reconstruído a partir do banco na primeira busca ou quando passa de `max_age`
+    segundos, para absorver escritas feitas por outros workers (ver `garantir`).
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self._lock = RLock()
+        self._postings : Dict[str, _Postings] = {}
+        self._doc_terms : Dict[int, Tuple[str, ...]] = {}
+        self._doc_len : Dict[int, int] = {}
+        self._total_len = 0
+        self._construido_em : Optional[float] = None
+        # Uma reconstrução por vez; as escritas feitas durante ela são repetidas no índice novo
+        self._reconstrucao = Reconstrucao()
+        self._pendentes : Optional[List[Tuple[int, Optional[Documento]]]] = None
+
+    def configure(self, max_age: float) -> None:
+        self.max_age = max_age
+        # A próxima busca reconstrói a partir do banco do app recém-configurado
+        self._construido_em = None
+
+    # ================= ESCRITA ===================
+
+    def upsert(self, doc_id: int, titulo: str, descricao: str, tags: Optional[str]) -> None:
+        freqs : Dict[str, int] = {}
+        for peso, texto in ((PESO_TITULO, titulo), (PESO_TAGS, tags), (PESO_DESCRICAO, descricao)):
+            for termo in tokenize(texto):
+                freqs[termo] = min(freqs.get(termo, 0) + peso, 0xFFFF)
+
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append((doc_id, (doc_id, titulo, descricao, tags)))
+            self._remove_doc(doc_id)
+            for termo, freq in freqs.items():
+                self._postings.setdefault(termo, _Postings()).set(doc_id, freq)
+
+            tamanho = sum(freqs.values())
+            self._doc_terms[doc_id] = tuple(freqs)
+            self._doc_len[doc_id] = tamanho
+            self._total_len += tamanho
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append((doc_id, None))
+            self._remove_doc(doc_id)
+
+    def rebuild(self, docs: Iterable[Documento]) -> None:
+        """
+        Reconstrói o índice a partir de tuplas (id, titulo, descricao, tags).
+        """
+        # Monta um índice novo e troca de uma vez, sem bloquear buscas durante a leitura do banco
+        with self._lock:
+            self._pendentes = []
+        novo = TextIndex(self.max_age)
+        try:
+            for doc in docs:
+                novo.upsert(*doc)
+        except BaseException:
+            with self._lock:
+                self._pendentes = None
+            raise
+
+        with self._lock:
+            # Escritas que chegaram durante a leitura podem não estar nela: repete na ordem em que vieram
+            for doc_id, doc in self._pendentes:
+                if doc is None:
+                    novo.remove(doc_id)
+                else:
+                    novo.upsert(*doc)
+            self._pendentes = None
+
+            self._postings = novo._postings
+            self._doc_terms = novo._doc_terms
+            self._doc_len = novo._doc_len
+            self._total_len = novo._total_len
+            self._construido_em = time.monotonic()
+
+    def needs_rebuild(self) -> bool:
+        return self._construido_em is None or time.monotonic() - self._construido_em > self.max_age
+
+    def garantir(self, carregar: Callable[[], Iterable[Documento]], executar: Callable[[Tarefa], None]) -> None:
+        # Índice pronto para a busca; ver Reconstrucao
+        self._reconstrucao.garantir(
+            lambda: self._construido_em is not None,
+            self.needs_rebuild,
+            lambda: self.rebuild(carregar()),
+            executar
+        )
+
+    # ================= LEITURA ===================
+
+    def search(self, consulta: str, limit: int) -> List[Tuple[int, float]]:
+        """
+        Retorna até `limit` pares (id, score) ordenados por relevância BM25.
+        """
+        termos = set(tokenize(consulta))
+        if not termos:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            media = self._total_len / n_docs
+
+            scores : Dict[int, float] = {}
+            for termo in termos:
+                postings = self._postings.get(termo)
+                if not postings:
+                    continue
+
+                df = len(postings.docs)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in zip(postings.docs, postings.freqs):
+                    norm = self.K1 * (1 - self.B + self.B * self._doc_len[doc_id] / media)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'documentos': len(self._doc_len),
+                'termos': len(self._postings),
+                'postings': sum(len(p.docs) for p in self._postings.values())
+            }
+
+    def _remove_doc(self, doc_id: int) -> None:
+        for termo in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings.get(termo)
+            if postings:
+                postings.remove(doc_id)
+                if not postings.docs:
+                    del self._postings[termo]
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+
+
+oportunidade_index = TextIndex()
@@ -0,0 +1,167 @@
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from threading import Lock
+from typing import Optional, List, Tuple, Callable, Iterable, Deque
+
+# Uma timeline é identificada por (campo, valor): ('comunidade', bairro) ou ('cidade', cidade)
+Chave = Tuple[str, str]
+Item = Tuple[int, datetime]
+
+
+class Timeline:
+    """
+    Buffer circular com as `tamanho` publicações mais recentes de uma
+    comunidade, da mais nova para a mais antiga. Uma timeline em modo pull
+    não guarda itens: a comunidade publica tão rápido que o buffer cobriria
+    poucos minutos, então as leituras vão direto ao índice do banco.
+    """
+    __slots__ = ('itens', 'pull', 'completa', 'carregada_em', 'sincronizada_em', '_lock')
+
+    def __init__(self, itens: Iterable[Item], tamanho: int, pull: bool = False):
+        self.itens : Deque[Item] = deque(() if pull else itens, maxlen=tamanho)
+        self.pull = pull
+        # Enquanto nada foi descartado, o buffer guarda a comunidade inteira
+        self.completa = not pull and len(self.itens) < tamanho
+        self.carregada_em = self.sincronizada_em = time.monotonic()
+        self._lock = Lock()
+
+    @property
+    def cheia(self) -> bool:
+        return len(self.itens) == self.itens.maxlen
+
+    def inserir(self, id: int, criado_em: datetime) -> None:
+        with self._lock:
+            if not self.itens or id > self.itens[0][0]:
+                if self.cheia:
+                    self.completa = False
+                self.itens.appendleft((id, criado_em))
+                return
+            # Fora de ordem (commits concorrentes): insere na posição, se couber
+            ids = [i for i, _ in self.itens]
+            posicao = next((p for p, i in enumerate(ids) if i < id), len(ids))
+            if id in ids or (self.cheia and posicao == len(ids)):
+                return
+            if self.cheia:
+                self.itens.pop()
+                self.completa = False
+            self.itens.insert(posicao, (id, criado_em))
+
+    def remover(self, id: int) -> None:
+        with self._lock:
+            for item in self.itens:
+                if item[0] == id:
+                    self.itens.remove(item)
+                    return
+
+    def piso_sync(self, janela: int) -> int:
+        """
+        Id a partir do qual a sincronização relê o banco: logo abaixo das
+        `janela` publicações mais novas do buffer. Uma publicação de outro
+        processo pode ser confirmada depois de outra com id maior já estar
+        aqui, então não basta buscar acima da mais recente.
+        """
+        with self._lock:
+            if len(self.itens) > janela:
+                return self.itens[janela][0]
+            return 0 if self.completa else self.itens[-1][0]
+
+    def sincronizar(self, itens: Iterable[Item]) -> None:
+        # Itens relidos do banco: os que já estão no buffer são ignorados
+        with self._lock:
+            presentes = {id for id, _ in self.itens}
+        for id, criado_em in itens:
+            if id not in presentes:
+                self.inserir(id, criado_em)
+
+    def pagina(self, antes: Optional[int], limit: int) -> Tuple[List[int], Optional[int]]:
+        """
+        Até `limit` ids menores que `antes` (cursor), do buffer. O segundo valor
+        é o id a partir do qual o restante deve vir do banco, ou None quando o
+        buffer responde sozinho (guarda a comunidade inteira ou já deu `limit`
+        itens).
+        """
+        with self._lock:
+            itens = list(self.itens)
+
+        ids = [id for id, _ in itens if antes is None or id < antes][:limit]
+        if len(ids) == limit or self.completa:
+            return ids, None
+        return ids, ids[-1] if ids else antes
+
+
+class TimelineCache:
+    """
+    Timelines das comunidades lidas recentemente (no máximo `max_timelines`,
+    descartando a menos usada). Publicar empurra o id nas timelines já
+    carregadas (fan-out na escrita); publicações de outros processos chegam
+    na sincronização feita a cada `sync` segundos, e a timeline inteira é
+    recarregada depois de `ttl` segundos. A sincronização relê as
+    `janela_sync` publicações mais novas de cada timeline, para pegar as
+    confirmadas fora de ordem. Quando as `tamanho` publicações
+    mais recentes cabem em menos de `janela_pull` segundos, a comunidade
+    passa para o modo pull até a próxima recarga.
+    """
+    def __init__(self, tamanho: int = 500, ttl: float = 300.0, sync: float = 2.0, janela_pull: float = 3600.0, max_timelines: int = 1000, janela_sync: int = 50):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self.sync = sync
+        self.janela_sync = janela_sync
+        self.janela_pull = janela_pull
+        self.max_timelines = max_timelines
+        self._timelines : "OrderedDict[Chave, Timeline]" = OrderedDict()
+        self._lock = Lock()
+
+    def configure(self, tamanho: int, ttl: float, sync: float, janela_pull: float, max_timelines: int, janela_sync: int = 50) -> None:
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self.sync = sync
+        self.janela_sync = janela_sync
+        self.janela_pull = janela_pull
+        self.max_timelines = max_timelines
+        self.invalidate()
+
+    def get(self, chave: Chave, carregar: Callable[[Chave, int], List[Item]], novos: Callable[[Chave, int], List[Item]]) -> Timeline:
+        """
+        `carregar(chave, n)` devolve as n publicações mais recentes (da mais nova
+        para a mais antiga) e `novos(chave, id)` as com id maior, em ordem crescente.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            timeline = self._timelines.get(chave)
+            if timeline is not None:
+                self._timelines.move_to_end(chave)
+
+        if timeline is None or agora - timeline.carregada_em > self.ttl:
+            itens = carregar(chave, self.tamanho)
+            pull = len(itens) == self.tamanho and (itens[0][1] - itens[-1][1]).total_seconds() < self.janela_pull
+            timeline = Timeline(itens, self.tamanho, pull)
+            with self._lock:
+                self._timelines[chave] = timeline
+                while len(self._timelines) > self.max_timelines:
+                    self._timelines.popitem(last=False)
+
+        elif not timeline.pull and agora - timeline.sincronizada_em > self.sync:
+            timeline.sincronizada_em = agora
+            timeline.sincronizar(novos(chave, timeline.piso_sync(self.janela_sync)))
+
+        return timeline
+
+    def publicar(self, chaves: Iterable[Chave], id: int, criado_em: datetime) -> None:
+        for chave in chaves:
+            timeline = self._timelines.get(chave)
+            if timeline is not None and not timeline.pull:
+                timeline.inserir(id, criado_em)
+
+    def remover(self, chaves: Iterable[Chave], id: int) -> None:
+        for chave in chaves:
+            timeline = self._timelines.get(chave)
+            if timeline is not None:
+                timeline.remover(id)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._timelines = OrderedDict()
+
+
+timeline_cache = TimelineCache()
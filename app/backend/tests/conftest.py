@@ -0,0 +1,116 @@
+import os
+
+# Banco SQLite em memória e serviços sem efeitos externos; precisa vir antes de importar o app
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('SECRET_KEY', 'chave-de-teste-com-32-bytes-ou-mais')
+os.environ.setdefault('PASSWORD_POOL_WORKERS', '0')
+os.environ.setdefault('EMAIL_TRANSPORT', 'memoria')
+
+from contextlib import contextmanager
+from itertools import count
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+from app import create_app
+from extensions import Config, db
+from middleware.principal_cache import principal_cache
+from models import Usuario, Organizacao, Oportunidade, Habilidade
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    principal_cache.clear()
+
+
+@pytest.fixture
+def app_arquivo(tmp_path, monkeypatch):
+    """
+    App sobre um SQLite em arquivo, para testes com várias threads (cada uma
+    com a própria conexão, ao contrário do banco em memória).
+    """
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path}/ami.db?timeout=60')
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    principal_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def contar_comandos(app):
+    """
+    Context manager que devolve a lista dos comandos SQL executados dentro dele.
+    """
+    @contextmanager
+    def contar():
+        comandos = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            comandos.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            yield comandos
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+    return contar
+
+
+_cpfs = count(10000000000)
+
+
+def criar_usuario(email, tipo_usuario='regular', senha='senha', cidade='Cidade', bairro='Bairro') -> Usuario:
+    usuario = Usuario(
+        nome_completo='Usuário de Teste', cpf=str(next(_cpfs)), email=email, senha=generate_password_hash(senha),
+        cidade=cidade, bairro=bairro, telefone='11999999999', data_nasc=date(2000, 1, 1), tipo_usuario=tipo_usuario
+    )
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+def criar_organizacao(id_responsavel, cnpj='12345678000190') -> Organizacao:
+    organizacao = Organizacao(id_responsavel, 'ONG de Teste', f'{cnpj}@ong.org', 'x', cnpj, 'Descrição', 'Rua 1', '11999999999')
+    db.session.add(organizacao)
+    db.session.commit()
+    return organizacao
+
+
+def criar_oportunidade(id_organizacao, num_vagas=10, data_hora=None, comunidade='Bairro') -> Oportunidade:
+    oportunidade = Oportunidade(
+        id_organizacao, 'Mutirão', 'Descrição', 'Rua 2', comunidade,
+        data_hora or datetime.now() + timedelta(days=7), 3, num_vagas
+    )
+    db.session.add(oportunidade)
+    db.session.commit()
+    return oportunidade
+
+
+def criar_habilidades(n) -> list:
+    habilidades = [Habilidade(f'Habilidade {i}') for i in range(n)]
+    db.session.add_all(habilidades)
+    db.session.commit()
+    return [h.id for h in habilidades]
+
+
+def login(client, email, senha='senha') -> dict:
+    resposta = client.post('/auth/login', json={'email': email, 'senha': senha})
+    assert resposta.status_code == 200, resposta.get_data(as_text=True)
+    return {'Authorization': f"Bearer {resposta.json['token']}"}
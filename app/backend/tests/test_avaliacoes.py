@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from models import Avaliacao, AvaliacaoAgregada
+from models.avaliacao import NOTAS, resumo_avaliacao
+from models.enums import AlvoAvaliacao
+from repositories import AvaliacaoRepo, InscricaoRepo, UserRepo
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade
+
+
+def _avaliacoes():
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    oportunidade = criar_oportunidade(organizacao.id, data_hora=datetime.now() + timedelta(days=1))
+    voluntarios = [criar_usuario(f'voluntario{i}@teste.com') for i in range(2)]
+
+    inscricoes = []
+    for voluntario, nota in zip(voluntarios, (5, 3)):
+        inscricao = InscricaoRepo.create_inscricao(voluntario.id, oportunidade.id)
+        inscricoes.append(inscricao.id)
+        AvaliacaoRepo.create_avaliacao(inscricao.id, voluntario.id, AlvoAvaliacao.organizacao, organizacao.id, nota)
+        AvaliacaoRepo.create_avaliacao(inscricao.id, responsavel.id, AlvoAvaliacao.usuario, voluntario.id, 4)
+    return responsavel, organizacao, voluntarios, inscricoes
+
+
+def _agregado(tipo_alvo, id_alvo):
+    return AvaliacaoRepo.get_agregado(tipo_alvo, id_alvo)
+
+
+def _agregado_esperado(*notas):
+    return resumo_avaliacao(len(notas), sum(notas), [notas.count(nota) for nota in NOTAS])
+
+
+def test_remover_usuario_desconta_as_avaliacoes_dele(app):
+    _, organizacao, (voluntario, _), _ = _avaliacoes()
+
+    assert UserRepo.delete_user(voluntario.id)
+
+    assert _agregado(AlvoAvaliacao.organizacao, organizacao.id) == _agregado_esperado(3)
+    assert AvaliacaoAgregada.query.filter_by(tipo_alvo=AlvoAvaliacao.usuario, id_alvo=voluntario.id).count() == 0
+    assert Avaliacao.query.count() == 2
+
+
+def test_remover_inscricao_desconta_as_avaliacoes_dela(app):
+    _, organizacao, (voluntario, _), inscricoes = _avaliacoes()
+
+    assert InscricaoRepo.delete_inscricao(inscricoes[1])
+
+    assert _agregado(AlvoAvaliacao.organizacao, organizacao.id) == _agregado_esperado(5)
+    assert _agregado(AlvoAvaliacao.usuario, voluntario.id) == _agregado_esperado(4)
+    assert Avaliacao.query.count() == 2
+
+
+def test_remover_responsavel_leva_a_organizacao_e_as_avaliacoes(app):
+    responsavel, organizacao, (voluntario, _), _ = _avaliacoes()
+
+    assert UserRepo.delete_user(responsavel.id)
+
+    assert Avaliacao.query.count() == 0
+    assert AvaliacaoAgregada.query.filter_by(tipo_alvo=AlvoAvaliacao.organizacao).count() == 0
+    assert _agregado(AlvoAvaliacao.usuario, voluntario.id) == _agregado_esperado()
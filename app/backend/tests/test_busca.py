@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from extensions import db
+from models import Tag
+from repositories import OportunidadeRepo, TagRepo
+from services.text_index import TextIndex, fold, tokenize
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade
+
+
+def _criar(id_organizacao, titulo, descricao='Descrição', tags=None):
+    return OportunidadeRepo.create_oportunidade(
+        id_organizacao, titulo, descricao, 'Rua 2', 'Bairro', datetime.now() + timedelta(days=7), 3, 10, tags=tags
+    )
+
+
+def _ids(consulta):
+    return [o.id for o in OportunidadeRepo.buscar_texto(consulta, 10)]
+
+
+def test_tokenize_ignora_acentos_stopwords_e_plural():
+    assert fold('Ação SOLIDÁRIA') == 'acao solidaria'
+    assert tokenize('As Ações com Crianças nos Jardins') == ['acao', 'crianca', 'jardim']
+    assert tokenize(None) == []
+
+
+def test_ranking_prefere_o_termo_no_titulo():
+    indice = TextIndex()
+    indice.rebuild([
+        (1, 'Reforma da praça', 'Vamos plantar árvores', None),
+        (2, 'Plantio de árvores', 'Mutirão no parque', None),
+        (3, 'Aula de violão', 'Música para crianças', None),
+    ])
+
+    assert [doc_id for doc_id, _ in indice.search('árvore', 10)] == [2, 1]
+    assert indice.search('futebol', 10) == []
+
+
+def test_escritas_durante_a_reconstrucao_nao_se_perdem():
+    indice = TextIndex()
+
+    def documentos():
+        yield (1, 'Plantio de árvores', 'Mutirão', None)
+        # Escritas de requisições enquanto o banco é lido para o índice novo
+        indice.upsert(2, 'Pintura de escola', 'Mutirão', None)
+        indice.remove(1)
+
+    indice.rebuild(documentos())
+
+    assert indice.search('arvore', 10) == []
+    assert [doc_id for doc_id, _ in indice.search('pintura', 10)] == [2]
+
+
+def test_indice_velho_reconstroi_uma_vez_em_segundo_plano():
+    indice = TextIndex(max_age=0)
+    indice.rebuild([])
+    agendadas = []
+
+    indice.garantir(lambda: [(1, 'Plantio', 'Mutirão', None)], agendadas.append)
+    indice.garantir(lambda: [], agendadas.append)
+    assert len(agendadas) == 1
+
+    # A busca seguiu no índice atual; a reconstrução só vale quando roda
+    assert indice.search('plantio', 10) == []
+    agendadas[0]()
+    assert [doc_id for doc_id, _ in indice.search('plantio', 10)] == [1]
+
+
+def test_busca_acompanha_as_escritas_das_oportunidades(app):
+    organizacao = criar_organizacao(criar_usuario('org@teste.com', tipo_usuario='organizacao').id)
+    plantio = _criar(organizacao.id, 'Plantio de árvores', tags='meio ambiente')
+    assert _ids('arvores') == [plantio.id]
+
+    # Criada depois do índice construído: entra pelo upsert do repositório
+    pintura = _criar(organizacao.id, 'Pintura de escola')
+    assert _ids('pintura') == [pintura.id]
+
+    OportunidadeRepo.update_oportunidade(plantio.id, {'titulo': 'Limpeza de praia'})
+    assert _ids('arvore') == []
+    assert _ids('praia') == [plantio.id]
+
+    OportunidadeRepo.delete_oportunidade(pintura.id)
+    assert _ids('pintura') == []
+
+
+def _ids_por_tags(tags, todas=False):
+    return [o['id'] for o in OportunidadeRepo.get_oportunidades_by_tags(tags, todas, 10).items]
+
+
+def test_backfill_de_tags_ignora_acentos_e_busca_por_tag(app):
+    organizacao = criar_organizacao(criar_usuario('org@teste.com', tipo_usuario='organizacao').id)
+    # Oportunidades antigas: só a coluna de texto, sem vínculos em oportunidade_tag
+    saude = criar_oportunidade(organizacao.id)
+    saude.tags = 'Saúde, saude, Idosos'
+    sem_acento = criar_oportunidade(organizacao.id)
+    sem_acento.tags = 'SAUDE'
+    db.session.commit()
+
+    assert TagRepo.backfill_oportunidade_tags(batch_size=1) == 2
+    assert TagRepo.backfill_oportunidade_tags() == 2
+    assert sorted(nome for (nome,) in db.session.query(Tag.nome)) == ['idosos', 'saude']
+
+    assert _ids_por_tags(['Saúde']) == _ids_por_tags(['saude']) == [saude.id, sem_acento.id]
+    assert _ids_por_tags(['saúde', 'Saude', 'idosos'], todas=True) == [saude.id]
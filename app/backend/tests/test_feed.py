@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from extensions import db
+from models import FeedUsuario
+from repositories import FeedRepo, OportunidadeRepo
+from services.feed_ranking import feed_candidatos
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade
+
+
+def test_invalidate_area_ignora_acentos_e_maiusculas(app):
+    usuario = criar_usuario('voluntario@teste.com', cidade='São Paulo', bairro='Água Branca')
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    assert FeedRepo.get_feed(usuario.id, usuario.cidade, usuario.bairro, 10) == []
+
+    # Gravada direto no banco, sem invalidar: o feed salvo continua valendo
+    oportunidade = criar_oportunidade(criar_organizacao(responsavel.id).id, comunidade='Água Branca')
+    feed_candidatos.invalidate()
+    assert FeedRepo.get_feed(usuario.id, usuario.cidade, usuario.bairro, 10) == []
+
+    FeedRepo.invalidate_area('agua branca')
+    db.session.commit()
+
+    assert db.session.get(FeedUsuario, usuario.id) is not None
+    assert [o.id for o in FeedRepo.get_feed(usuario.id, usuario.cidade, usuario.bairro, 10)] == [oportunidade.id]
+
+
+def test_invalidate_area_so_sobe_a_versao_das_comunidades(app):
+    FeedRepo.invalidate_area('Centro')
+    FeedRepo.invalidate_area('Centro', 'Vila Nova')
+    db.session.commit()
+
+    assert FeedRepo._versoes('centro', 'vila nova', 'outra') == {'centro': 2, 'vila nova': 1}
+
+
+def test_alterar_so_o_texto_nao_invalida_o_feed(app):
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    oportunidade = OportunidadeRepo.create_oportunidade(
+        organizacao.id, 'Mutirão', 'Descrição', 'Rua 2', 'Centro', datetime.now() + timedelta(days=1), 3, 10
+    )
+    versao = FeedRepo._versao_da_area('centro', '')
+
+    OportunidadeRepo.update_oportunidade(oportunidade.id, {'titulo': 'Mutirão de limpeza', 'comunidade': 'Centro'})
+    assert FeedRepo._versao_da_area('centro', '') == versao
+
+    OportunidadeRepo.update_oportunidade(oportunidade.id, {'comunidade': 'Vila Nova'})
+    assert FeedRepo._versao_da_area('centro', '') == versao + 1
+    assert FeedRepo._versao_da_area('vila nova', '') == 1
+
+
+def test_feed_salvo_de_fotografia_antiga_e_recalculado(app):
+    usuario = criar_usuario('voluntario@teste.com', bairro='Centro')
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    FeedRepo.get_feed(usuario.id, usuario.cidade, usuario.bairro, 10)
+    fotografia = feed_candidatos._snapshot
+
+    oportunidade = OportunidadeRepo.create_oportunidade(
+        organizacao.id, 'Mutirão', 'Descrição', 'Rua 2', 'Centro', datetime.now() + timedelta(days=1), 3, 10
+    )
+    # Outro processo, ainda com a fotografia antiga, salva o feed depois da mudança
+    feed_candidatos._snapshot = fotografia
+    FeedRepo._salvar(usuario.id, usuario.cidade, usuario.bairro, [], datetime.now(), fotografia.versao_de('centro'))
+    db.session.commit()
+
+    assert [o.id for o in FeedRepo.get_feed(usuario.id, usuario.cidade, usuario.bairro, 10)] == [oportunidade.id]
+
+
+def test_primeira_carga_concorrente_sobrescreve_o_feed(app, monkeypatch):
+    usuario = criar_usuario('voluntario@teste.com')
+    agora = datetime.now()
+    get = db.session.get
+
+    def get_com_corrida(modelo, chave, **kwargs):
+        # Outra requisição grava o feed logo depois da leitura desta
+        monkeypatch.setattr(db.session, 'get', get)
+        db.session.execute(db.insert(FeedUsuario).values(
+            id_usuario=chave, cidade='cidade', bairro='bairro', oportunidade_ids='9', gerado_em=agora, versao=0
+        ))
+        return None
+
+    monkeypatch.setattr(db.session, 'get', get_com_corrida)
+    FeedRepo._salvar(usuario.id, 'Cidade', 'Bairro', [3, 1], agora, 0)
+    db.session.commit()
+
+    assert db.session.get(FeedUsuario, usuario.id).get_ids() == [3, 1]
@@ -0,0 +1,112 @@
+import pytest
+from extensions import db
+from models import Habilidade
+from repositories import HabilidadeRepo
+from repositories import habilidade_catalog as modulo
+from repositories.habilidade_catalog import habilidade_catalog
+from repositories.habilidades_repo import TAMANHO_NOME
+from .conftest import criar_habilidades
+
+
+@pytest.fixture
+def catalogo(app):
+    # O catálogo é do processo: não reaproveita o snapshot de outro teste
+    habilidade_catalog.invalidate()
+    yield habilidade_catalog
+    habilidade_catalog.invalidate()
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(modulo.time, 'monotonic', lambda: agora[0])
+    return agora
+
+
+def test_nomes_resolvem_sem_acentos_nem_maiusculas(app):
+    musica = HabilidadeRepo.create_habilidade('Música')
+
+    ids = HabilidadeRepo.get_or_create_ids_by_names(['musica', 'MÚSICA'])
+
+    assert ids == {'musica': musica.id, 'MÚSICA': musica.id}
+    assert Habilidade.query.count() == 1
+
+
+def test_habilidades_novas_ficam_na_transacao_de_quem_chamou(app):
+    ids = HabilidadeRepo.get_or_create_ids_by_names(['Jardinagem', 'Pintura'])
+    assert set(ids) == {'Jardinagem', 'Pintura'} and all(ids.values())
+
+    # Quem chamou desiste (ex.: validação falhou depois): nada fica gravado
+    db.session.rollback()
+    assert Habilidade.query.count() == 0
+
+
+def test_habilidades_novas_entram_no_catalogo_depois_do_commit(app):
+    assert HabilidadeRepo.get_catalog().get_by_nome('Jardinagem') is None
+    versao = HabilidadeRepo.get_catalog().version
+
+    ids = HabilidadeRepo.get_or_create_ids_by_names(['Jardinagem'])
+    db.session.commit()
+
+    catalogo = HabilidadeRepo.get_catalog()
+    assert catalogo.version > versao
+    assert catalogo.get_by_nome('jardinagem')['id'] == ids['Jardinagem']
+
+
+def test_nome_de_habilidade_longo_demais_e_recusado(app):
+    with pytest.raises(ValueError):
+        HabilidadeRepo.get_or_create_ids_by_names(['x' * (TAMANHO_NOME + 1)])
+    assert Habilidade.query.count() == 0
+
+
+def test_paginas_por_keyset_sobre_o_snapshot(client, catalogo):
+    ids = criar_habilidades(5)
+    # Gravada sem passar pelo repositório: fica fora do snapshot carregado
+    HabilidadeRepo.get_catalog()
+    db.session.add(Habilidade('Fora do snapshot'))
+    db.session.commit()
+
+    vistos, cursor = [], None
+    while True:
+        resposta = client.get('/habilidade/', query_string={'limit': 2, **({'cursor': cursor} if cursor else {})})
+        assert resposta.status_code == 200
+        vistos += [h['id'] for h in resposta.json]
+        cursor = resposta.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert vistos == ids
+    assert client.get('/habilidade/', query_string={'limit': 2, 'cursor': 'invalido'}).status_code == 400
+
+
+def test_busca_por_nome_ignora_acentos_e_maiusculas(client, catalogo):
+    musica = HabilidadeRepo.create_habilidade('Música')
+
+    assert HabilidadeRepo.get_catalog().get_by_nome('musica')['id'] == musica.id
+    assert client.get('/habilidade/nome/MUSICA').json['id'] == musica.id
+    assert HabilidadeRepo.habilidade_exists('música')
+    assert client.get('/habilidade/nome/musicas').status_code == 404
+
+
+def test_snapshot_recarrega_depois_do_ttl_ou_de_escrita(catalogo, relogio, monkeypatch):
+    monkeypatch.setattr(catalogo, 'ttl', 60)
+    versao = HabilidadeRepo.get_catalog().version
+
+    # Escrita de outro processo: só aparece quando o TTL vence
+    db.session.add(Habilidade('Jardinagem'))
+    db.session.commit()
+    relogio[0] += 59
+    assert HabilidadeRepo.get_catalog().get_by_nome('jardinagem') is None
+    assert HabilidadeRepo.get_catalog().version == versao
+
+    relogio[0] += 2
+    assert HabilidadeRepo.get_catalog().get_by_nome('jardinagem')
+    assert HabilidadeRepo.get_catalog().version == versao + 1
+
+    # Escrita pelo repositório: recarrega na hora
+    pintura = HabilidadeRepo.create_habilidade('Pintura')
+    assert HabilidadeRepo.get_catalog().version == versao + 2
+    HabilidadeRepo.update_habilidade(pintura.id, {'nome': 'Pintura de paredes'})
+    assert HabilidadeRepo.get_catalog().get_by_id(pintura.id)['nome'] == 'Pintura de paredes'
+    HabilidadeRepo.delete_habilidade(pintura.id)
+    assert HabilidadeRepo.get_catalog().get_by_id(pintura.id) is None
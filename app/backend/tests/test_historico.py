@@ -0,0 +1,52 @@
+from repositories import HistoricoRepo, InscricaoRepo
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade, login
+
+
+def _inscricao_aprovada(email='voluntario@teste.com'):
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    oportunidade = criar_oportunidade(organizacao.id)
+    voluntario = criar_usuario(email)
+    inscricao = InscricaoRepo.create_inscricao(voluntario.id, oportunidade.id)
+    InscricaoRepo.update_inscricao(inscricao.id, {'status_inscricao': 'aprovada'})
+    return voluntario.id, inscricao.id
+
+
+def test_responsavel_confirma_horas_e_atualiza_os_totais(client):
+    id_voluntario, id_inscricao = _inscricao_aprovada()
+    headers = login(client, 'org@teste.com')
+
+    resposta = client.post('/historico/', json={'id_inscricao': id_inscricao, 'horas_confirmadas': 4}, headers=headers)
+    assert resposta.status_code == 201, resposta.get_data(as_text=True)
+    id_historico = resposta.json['id']
+    assert HistoricoRepo.get_totais(id_voluntario) == {
+        'total_horas': 4, 'total_servicos': 1, 'total_oportunidades': 1, 'total_organizacoes': 1
+    }
+
+    assert client.put(f'/historico/{id_historico}', json={'horas_confirmadas': 2.5}, headers=headers).status_code == 200
+    assert HistoricoRepo.get_totais(id_voluntario)['total_horas'] == 2.5
+
+    assert client.delete(f'/historico/{id_historico}', headers=headers).status_code == 200
+    assert HistoricoRepo.get_totais(id_voluntario) == {
+        'total_horas': 0, 'total_servicos': 0, 'total_oportunidades': 0, 'total_organizacoes': 0
+    }
+
+
+def test_so_o_responsavel_confirma_horas(client):
+    id_voluntario, id_inscricao = _inscricao_aprovada()
+
+    resposta = client.post('/historico/', json={'id_inscricao': id_inscricao, 'horas_confirmadas': 4}, headers=login(client, 'voluntario@teste.com'))
+    assert resposta.status_code == 403
+    assert HistoricoRepo.get_totais(id_voluntario)['total_servicos'] == 0
+
+
+def test_confirmar_horas_concede_conquistas(client):
+    id_voluntario, id_inscricao = _inscricao_aprovada()
+    headers = login(client, 'org@teste.com')
+
+    assert client.post('/historico/', json={'id_inscricao': id_inscricao, 'horas_confirmadas': 6}, headers=headers).status_code == 201
+    assert {c['codigo'] for c in client.get(f'/user/{id_voluntario}/conquistas').json} == {'oportunidades_1'}
+
+    # Segundo serviço na mesma inscrição: cruza as 10 horas sem contar outra oportunidade
+    assert client.post('/historico/', json={'id_inscricao': id_inscricao, 'horas_confirmadas': 5}, headers=headers).status_code == 201
+    assert {c['codigo'] for c in client.get(f'/user/{id_voluntario}/conquistas').json} == {'oportunidades_1', 'horas_10'}
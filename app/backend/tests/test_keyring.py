@@ -0,0 +1,77 @@
+import json
+import time
+import jwt
+import pytest
+from middleware.jwt_util import generate_token, decode_token
+from middleware.keyring import KeyRing, keyring
+from .conftest import criar_usuario
+
+
+@pytest.fixture
+def chaves(app):
+    # Restaura as chaves do app depois do teste
+    yield keyring
+    keyring.load(app.config)
+
+
+def test_token_antigo_continua_valido_depois_da_rotacao(chaves):
+    usuario = criar_usuario('voluntario@teste.com')
+    chaves.load({'JWT_KEYS': 'v1:' + '1' * 32})
+    antigo = generate_token(usuario)
+
+    chaves.load({'JWT_KEYS': 'v1:' + '1' * 32 + ',v2:' + '2' * 32})
+    novo = generate_token(usuario)
+    assert jwt.get_unverified_header(novo)['kid'] == 'v2'
+    assert decode_token(antigo)['id'] == decode_token(novo)['id'] == usuario.id
+
+    # A chave antiga saiu do keyring: os tokens dela deixam de valer
+    chaves.load({'JWT_KEYS': 'v2:' + '2' * 32})
+    assert decode_token(antigo) is None
+    assert decode_token(novo)['id'] == usuario.id
+
+
+def test_kid_desconhecido_ou_ausente_e_recusado(chaves):
+    segredo = 's' * 32
+    chaves.load({'JWT_KEYS': f'v1:{segredo}'})
+    agora = int(time.time())
+    payload = {'id': 1, 'tipo_usuario': 'regular', 'is_admin': False, 'iat': agora, 'exp': agora + 60}
+
+    assert decode_token(jwt.encode(payload, segredo, algorithm='HS256', headers={'kid': 'v9'})) is None
+    assert decode_token(jwt.encode(payload, segredo, algorithm='HS256')) is None
+    assert decode_token(jwt.encode(payload, 'o' * 32, algorithm='HS256', headers={'kid': 'v1'})) is None
+    assert decode_token(jwt.encode(payload, segredo, algorithm='HS256', headers={'kid': 'v1'}))['id'] == 1
+
+
+def test_carrega_do_arquivo_de_chaves(tmp_path):
+    arquivo = tmp_path / 'chaves.json'
+    arquivo.write_text(json.dumps({'keys': {'a': 'segredo-a', 'b': 'segredo-b'}, 'active_kid': 'a'}))
+    anel = KeyRing()
+
+    # O arquivo tem prioridade sobre JWT_KEYS e SECRET_KEY
+    anel.load({'JWT_KEY_FILE': str(arquivo), 'JWT_KEYS': 'c:segredo-c', 'SECRET_KEY': 'x'})
+    assert (anel.active_kid, anel.signing_key(), sorted(anel.kids())) == ('a', 'segredo-a', ['a', 'b'])
+
+    anel.load({'JWT_KEY_FILE': str(arquivo), 'JWT_ACTIVE_KID': 'b'})
+    assert anel.signing_key() == 'segredo-b'
+
+
+def test_carrega_de_jwt_keys():
+    anel = KeyRing()
+    anel.load({'JWT_KEYS': 'a:segredo-a, b:segredo-b', 'SECRET_KEY': 'x'})
+    # Sem JWT_ACTIVE_KID, assina com a última
+    assert (anel.active_kid, anel.verification_key('a'), anel.kids()) == ('b', 'segredo-a', ['a', 'b'])
+
+    with pytest.raises(RuntimeError):
+        anel.load({'JWT_KEYS': 'a:segredo-a,sem-segredo'})
+    with pytest.raises(RuntimeError):
+        anel.load({'JWT_KEYS': 'a:segredo-a', 'JWT_ACTIVE_KID': 'z'})
+
+
+def test_sem_chaves_usa_secret_key():
+    anel = KeyRing()
+    anel.load({'SECRET_KEY': 'segredo'})
+    assert (anel.active_kid, anel.signing_key(), anel.ephemeral) == (KeyRing.DEFAULT_KID, 'segredo', False)
+
+    anel.load({'SECRET_KEY': 'gerada', 'SECRET_KEY_EPHEMERAL': True})
+    assert anel.ephemeral
+    assert anel.verification_key(None) is None
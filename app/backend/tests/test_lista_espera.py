@@ -0,0 +1,47 @@
+from extensions import db
+from models import Inscricao, ListaEspera, Oportunidade
+from repositories import InscricaoRepo
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade, login
+
+
+def _lotada():
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    oportunidade = criar_oportunidade(criar_organizacao(responsavel.id).id, num_vagas=1)
+    primeiro, segundo, terceiro = (criar_usuario(f'voluntario{i}@teste.com').id for i in range(3))
+    InscricaoRepo.create_inscricao(primeiro, oportunidade.id)
+    return oportunidade.id, primeiro, segundo, terceiro
+
+
+def test_inscricao_tira_o_usuario_da_lista_de_espera(app):
+    id_oportunidade, _, segundo, _ = _lotada()
+    InscricaoRepo.entrar_lista_espera(segundo, id_oportunidade)
+
+    # Sobra uma vaga no contador (ex.: corrida entre uma liberação e a entrada na fila)
+    db.session.execute(db.update(Oportunidade).values(vagas_restantes=1))
+    db.session.commit()
+
+    assert InscricaoRepo.create_inscricao(segundo, id_oportunidade)
+    assert InscricaoRepo.get_lista_espera_entry(segundo, id_oportunidade) is None
+
+
+def test_promocao_pula_quem_ja_esta_inscrito(app):
+    id_oportunidade, primeiro, segundo, terceiro = _lotada()
+    InscricaoRepo.entrar_lista_espera(segundo, id_oportunidade)
+    InscricaoRepo.entrar_lista_espera(terceiro, id_oportunidade)
+    # O segundo ganhou uma inscrição sem passar pela fila (ex.: criada por um admin)
+    db.session.add(Inscricao(segundo, id_oportunidade, status_inscricao='recusada'))
+    db.session.commit()
+
+    assert InscricaoRepo.delete_inscricao(InscricaoRepo.get_inscricao_by_usuario_oportunidade(primeiro, id_oportunidade).id)
+
+    assert InscricaoRepo.get_inscricao_by_usuario_oportunidade(terceiro, id_oportunidade)
+    assert ListaEspera.query.filter_by(id_oportunidade=id_oportunidade).count() == 0
+
+
+def test_prioridade_invalida_retorna_400(client):
+    id_oportunidade, *_ = _lotada()
+    criar_usuario('admin@teste.com', tipo_usuario='admin')
+
+    resposta = client.post('/inscricao/', headers=login(client, 'admin@teste.com'),
+                           json={'id_oportunidade': id_oportunidade, 'lista_espera': True, 'prioridade': 'alta'})
+    assert resposta.status_code == 400
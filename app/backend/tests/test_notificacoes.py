@@ -0,0 +1,128 @@
+import smtplib
+from datetime import datetime
+from extensions import db
+from models import Notificacao, OutboxEvento, EmailPendente
+from repositories import InscricaoRepo, NotificacaoRepo, notificacao_repo
+from repositories.notificacao_repo import INSCRICAO_CRIADA, INSCRICAO_APROVADA, INSCRICAO_RECUSADA, INSCRICAO_PROMOVIDA
+from services.email import correio, TransporteMemoria
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade
+
+
+def _despachar():
+    eventos = NotificacaoRepo.despachar_lote(lote=100, max_tentativas=3, backoff=1)
+    NotificacaoRepo.enviar_emails(lote=100, max_tentativas=3, backoff=1)
+    return eventos
+
+
+class _RecusaDestinatario(TransporteMemoria):
+    # Transporte de memória que recusa um endereço, como um servidor SMTP faria
+    def __init__(self, recusado):
+        super().__init__()
+        self.recusado = recusado
+
+    def enviar(self, mensagens):
+        erros = []
+        for mensagem in mensagens:
+            if mensagem.para == self.recusado:
+                erros.append(smtplib.SMTPRecipientsRefused({mensagem.para: (550, b'no such user')}))
+            else:
+                self.enviadas.append(mensagem)
+                erros.append(None)
+        return erros
+
+
+def _liberar_retentativas():
+    db.session.execute(db.update(EmailPendente).values(proxima_tentativa=datetime(2000, 1, 1)))
+    db.session.commit()
+
+
+def test_decisoes_em_lote_notificam_os_voluntarios(app):
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    oportunidade = criar_oportunidade(organizacao.id)
+    voluntarios = [criar_usuario(f'voluntario{i}@teste.com') for i in range(3)]
+    inscricoes = [InscricaoRepo.create_inscricao(v.id, oportunidade.id).id for v in voluntarios]
+    _despachar()
+    correio.transporte.enviadas.clear()
+
+    InscricaoRepo.decidir_em_lote(organizacao.id, inscricoes[:2], 'aprovada', datetime.now())
+    InscricaoRepo.decidir_em_lote(organizacao.id, inscricoes[2:], 'recusada', datetime.now())
+
+    assert OutboxEvento.query.filter_by(tipo=INSCRICAO_APROVADA).count() == 2
+    assert OutboxEvento.query.filter_by(tipo=INSCRICAO_RECUSADA).count() == 1
+    assert _despachar() == 3
+
+    notificacoes = {(n.id_usuario, n.tipo) for n in Notificacao.query.filter(Notificacao.tipo.in_([INSCRICAO_APROVADA, INSCRICAO_RECUSADA]))}
+    assert notificacoes == {
+        (voluntarios[0].id, INSCRICAO_APROVADA),
+        (voluntarios[1].id, INSCRICAO_APROVADA),
+        (voluntarios[2].id, INSCRICAO_RECUSADA),
+    }
+    assert sorted(m.para for m in correio.transporte.enviadas) == [v.email for v in voluntarios]
+
+
+def test_promocao_da_lista_de_espera_notifica_o_voluntario(app):
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    oportunidade = criar_oportunidade(organizacao.id, num_vagas=1)
+    inscrito, esperando = criar_usuario('inscrito@teste.com'), criar_usuario('esperando@teste.com')
+    id_inscricao = InscricaoRepo.create_inscricao(inscrito.id, oportunidade.id).id
+    InscricaoRepo.entrar_lista_espera(esperando.id, oportunidade.id)
+
+    InscricaoRepo.decidir_em_lote(organizacao.id, [id_inscricao], 'recusada', datetime.now())
+
+    promovida = InscricaoRepo.get_inscricao_by_usuario_oportunidade(esperando.id, oportunidade.id)
+    assert OutboxEvento.query.filter_by(tipo=INSCRICAO_PROMOVIDA, id_referencia=promovida.id).count() == 1
+    _despachar()
+    assert Notificacao.query.filter_by(id_usuario=esperando.id, tipo=INSCRICAO_PROMOVIDA).count() == 1
+
+
+def test_destinatario_recusado_nao_reenvia_os_outros(app):
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    oportunidade = criar_oportunidade(organizacao.id)
+    voluntarios = [criar_usuario(f'voluntario{i}@teste.com') for i in range(3)]
+    inscricoes = [InscricaoRepo.create_inscricao(v.id, oportunidade.id).id for v in voluntarios]
+    _despachar()
+
+    transporte_original = correio.transporte
+    correio.configure(_RecusaDestinatario('voluntario1@teste.com'))
+    try:
+        InscricaoRepo.decidir_em_lote(organizacao.id, inscricoes, 'aprovada', datetime.now())
+        assert _despachar() == 3
+
+        # O evento foi consumido e as notificações in-app ficaram; só o email recusado volta para a fila
+        assert OutboxEvento.query.filter(OutboxEvento.processado_em.is_(None)).count() == 0
+        assert Notificacao.query.filter_by(tipo=INSCRICAO_APROVADA).count() == 3
+        assert sorted(m.para for m in correio.transporte.enviadas) == ['voluntario0@teste.com', 'voluntario2@teste.com']
+        pendente = EmailPendente.query.filter(EmailPendente.processado_em.is_(None)).one()
+        assert (pendente.para, pendente.tentativas) == ('voluntario1@teste.com', 1)
+
+        _liberar_retentativas()
+        correio.transporte.recusado = None
+        assert NotificacaoRepo.enviar_emails(lote=100, max_tentativas=3, backoff=1) == 1
+        assert [m.para for m in correio.transporte.enviadas].count('voluntario0@teste.com') == 1
+        assert [m.para for m in correio.transporte.enviadas].count('voluntario1@teste.com') == 1
+    finally:
+        correio.configure(transporte_original)
+
+
+def test_evento_que_falha_nao_grava_notificacoes_nem_emails(app, monkeypatch):
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    oportunidade = criar_oportunidade(criar_organizacao(responsavel.id).id)
+    voluntario = criar_usuario('voluntario@teste.com')
+    InscricaoRepo.create_inscricao(voluntario.id, oportunidade.id)
+
+    original = notificacao_repo.HANDLERS[INSCRICAO_CRIADA]
+
+    def falhar_depois_de_gravar(ids):
+        original(ids)
+        raise RuntimeError('falha no meio do despacho')
+
+    monkeypatch.setitem(notificacao_repo.HANDLERS, INSCRICAO_CRIADA, falhar_depois_de_gravar)
+    _despachar()
+
+    evento = OutboxEvento.query.one()
+    assert (evento.processado_em, evento.tentativas) == (None, 1)
+    assert Notificacao.query.count() == 0
+    assert EmailPendente.query.count() == 0
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+import pytest
+from models import Oportunidade
+from repositories.habilidade_catalog import habilidade_catalog
+from repositories.pagination import paginate, encode_cursor, decode_cursor
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade, criar_habilidades
+
+
+def _todas_as_paginas(client, url, limit):
+    """
+    Segue o X-Next-Cursor até a última página. Retorna os ids e quantas páginas vieram.
+    """
+    ids, paginas, cursor = [], 0, None
+    while True:
+        resposta = client.get(url, query_string={'limit': limit, **({'cursor': cursor} if cursor else {})})
+        assert resposta.status_code == 200
+        ids += [item['id'] for item in resposta.json]
+        paginas += 1
+        cursor = resposta.headers.get('X-Next-Cursor')
+        if not cursor:
+            return ids, paginas
+
+
+def test_cursor_ida_e_volta():
+    colunas = [Oportunidade.data_hora, Oportunidade.id]
+    valores = [datetime(2026, 5, 1, 14, 30), 42]
+
+    cursor = encode_cursor(valores)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, colunas) == valores
+
+
+@pytest.mark.parametrize('cursor', [
+    'nao-e-base64!',
+    encode_cursor([1]),
+    encode_cursor(['2026-05-01T14:30:00', '42']),
+    encode_cursor([1, 42]),
+    encode_cursor(['ontem', 42]),
+    encode_cursor(['2026-05-01T14:30:00', True]),
+])
+def test_cursor_invalido_lanca_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, [Oportunidade.data_hora, Oportunidade.id])
+
+
+def test_paginate_desempata_chaves_repetidas_pelo_id(app):
+    organizacao = criar_organizacao(criar_usuario('org@teste.com', tipo_usuario='organizacao').id)
+    mesma_data = datetime.now() + timedelta(days=3)
+    ids = [criar_oportunidade(organizacao.id, data_hora=mesma_data).id for _ in range(5)]
+    antes = criar_oportunidade(organizacao.id, data_hora=mesma_data - timedelta(hours=1)).id
+
+    vistos, cursor = [], None
+    while True:
+        pagina = paginate(Oportunidade.query, [Oportunidade.data_hora, Oportunidade.id], 2, cursor)
+        vistos += [o.id for o in pagina.items]
+        cursor = pagina.next_cursor
+        if not cursor:
+            break
+
+    assert vistos == [antes] + ids
+
+
+def test_rotas_paginadas_seguem_o_x_next_cursor(client):
+    ids = criar_habilidades(5)
+    habilidade_catalog.invalidate()
+    assert _todas_as_paginas(client, '/habilidade/', 2) == (ids, 3)
+
+    organizacao = criar_organizacao(criar_usuario('org@teste.com', tipo_usuario='organizacao').id)
+    mesma_data = datetime.now() + timedelta(days=3)
+    oportunidades = [criar_oportunidade(organizacao.id, data_hora=mesma_data).id for _ in range(4)]
+    # Página exata: a última não traz cursor
+    assert _todas_as_paginas(client, '/oportunidade/', 2) == (oportunidades, 2)
+
+    resposta = client.get('/oportunidade/', query_string={'limit': 10})
+    assert 'X-Next-Cursor' not in resposta.headers
+
+
+@pytest.mark.parametrize('cursor', ['lixo', encode_cursor([1, 2]), encode_cursor(['2026-05-01T14:30:00'])])
+def test_cursor_invalido_na_rota_e_400(client, cursor):
+    for url in ('/oportunidade/', '/user/', '/habilidade/'):
+        resposta = client.get(url, query_string={'limit': 2, 'cursor': cursor})
+        assert resposta.status_code == 400, (url, resposta.status_code)
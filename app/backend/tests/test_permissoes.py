@@ -0,0 +1,60 @@
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade, login
+
+
+def _oportunidade_de_outro_responsavel():
+    # O primeiro usuário fica com o mesmo id da organização, sem ser o responsável por ela
+    outro = criar_usuario('outro@teste.com', tipo_usuario='organizacao')
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    assert organizacao.id == outro.id != responsavel.id
+    return criar_oportunidade(organizacao.id, num_vagas=1)
+
+
+def test_voluntarios_compativeis_exige_o_responsavel(client):
+    oportunidade = _oportunidade_de_outro_responsavel()
+    url = f'/oportunidade/{oportunidade.id}/voluntarios'
+
+    assert client.get(url, headers=login(client, 'outro@teste.com')).status_code == 403
+    assert client.get(url, headers=login(client, 'org@teste.com')).status_code == 200
+
+
+def test_lista_de_espera_exige_o_responsavel(client):
+    oportunidade = _oportunidade_de_outro_responsavel()
+    url = f'/inscricao/espera/oportunidade/{oportunidade.id}'
+
+    assert client.get(url, headers=login(client, 'outro@teste.com')).status_code == 403
+    assert client.get(url, headers=login(client, 'org@teste.com')).status_code == 200
+
+
+def _payload_oportunidade(**extra):
+    return {
+        'titulo': 'Mutirão', 'descricao': 'Descrição', 'local_endereco': 'Rua 2', 'comunidade': 'Bairro',
+        'data_hora': '2030-01-01T09:00:00', 'duracao_horas': 3, 'num_vagas': 5, **extra
+    }
+
+
+def test_criar_oportunidade_usa_a_organizacao_do_responsavel(client):
+    oportunidade = _oportunidade_de_outro_responsavel()
+    headers = login(client, 'org@teste.com')
+
+    resposta = client.post('/oportunidade/', json=_payload_oportunidade(), headers=headers)
+    assert resposta.status_code == 201, resposta.get_data(as_text=True)
+    assert resposta.json['id_organizacao'] == oportunidade.id_organizacao
+    assert client.get(f"/oportunidade/{resposta.json['id']}/voluntarios", headers=headers).status_code == 200
+
+    # Sem organização cadastrada não há onde pendurar a oportunidade
+    assert client.post('/oportunidade/', json=_payload_oportunidade(), headers=login(client, 'outro@teste.com')).status_code == 403
+
+
+def test_editar_e_remover_oportunidade_exigem_o_responsavel(client):
+    oportunidade = _oportunidade_de_outro_responsavel()
+    criar_usuario('admin@teste.com', tipo_usuario='admin')
+    url = f'/oportunidade/{oportunidade.id}'
+
+    # `outro` tem o mesmo id da organização, mas não é o responsável por ela
+    assert client.put(url, json={'titulo': 'Outro'}, headers=login(client, 'outro@teste.com')).status_code == 403
+    assert client.put(url, json={'titulo': 'Novo'}, headers=login(client, 'org@teste.com')).status_code == 200
+    assert client.put(url, json={'titulo': 'Admin'}, headers=login(client, 'admin@teste.com')).status_code == 200
+
+    assert client.delete(url, headers=login(client, 'outro@teste.com')).status_code == 403
+    assert client.delete(url, headers=login(client, 'org@teste.com')).status_code == 200
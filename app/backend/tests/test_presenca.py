@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+import pytest
+from extensions import db
+from models import Inscricao
+from repositories import PresencaRepo, InscricaoRepo
+from services.presenca import ENTRADA, SAIDA, SemCheckIn, presenca_cache, escritor_presenca
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade, login
+
+
+@pytest.fixture
+def evento(app_arquivo):
+    presenca_cache.invalidate()
+    with app_arquivo.app_context():
+        # O primeiro usuário fica com o mesmo id da organização, sem ser o responsável por ela
+        outro = criar_usuario('outro@teste.com', tipo_usuario='organizacao')
+        responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+        organizacao = criar_organizacao(responsavel.id)
+        assert organizacao.id == outro.id != responsavel.id
+
+        oportunidade = criar_oportunidade(organizacao.id, data_hora=datetime.now() + timedelta(minutes=30))
+        voluntario = criar_usuario('voluntario@teste.com')
+        inscricao = Inscricao(voluntario.id, oportunidade.id, status_inscricao='aprovada')
+        db.session.add(inscricao)
+        db.session.commit()
+        registro, _ = PresencaRepo.get_or_create_pin(inscricao)
+        yield oportunidade.id, inscricao.id, registro.codigo_validacao_pin
+    escritor_presenca.flush()
+    presenca_cache.invalidate()
+
+
+def test_check_in_exige_o_responsavel_pela_organizacao(app_arquivo, evento):
+    id_oportunidade, id_inscricao, pin = evento
+    client = app_arquivo.test_client()
+    url = f'/presenca/oportunidade/{id_oportunidade}/checkin'
+
+    resposta = client.post(url, json={'id_inscricao': id_inscricao, 'pin': pin}, headers=login(client, 'outro@teste.com'))
+    assert resposta.status_code == 403
+
+    resposta = client.post(url, json={'id_inscricao': id_inscricao, 'pin': pin}, headers=login(client, 'org@teste.com'))
+    assert resposta.status_code == 200
+
+
+def test_check_out_acha_check_in_feito_em_outro_processo(app_arquivo, evento):
+    id_oportunidade, id_inscricao, pin = evento
+    agora = datetime.now()
+    # Cada tabela faz o papel da memória de um processo diferente
+    tabela_a, tabela_b, tabela_c = (PresencaRepo._carregar(id_oportunidade) for _ in range(3))
+
+    with pytest.raises(SemCheckIn):
+        PresencaRepo.marcar(tabela_b, SAIDA, id_inscricao, pin, agora)
+
+    entrada = PresencaRepo.marcar(tabela_a, ENTRADA, id_inscricao, pin, agora)
+    # Ainda na fila do escritor (ou já gravada, se a thread chegou antes)
+    assert PresencaRepo.marcar(tabela_b, SAIDA, id_inscricao, pin, agora + timedelta(hours=1)) == agora + timedelta(hours=1)
+
+    escritor_presenca.flush()
+    assert PresencaRepo._entrada_gravada(id_inscricao) == entrada
+    # Só no banco
+    assert PresencaRepo.marcar(tabela_c, SAIDA, id_inscricao, pin, agora + timedelta(hours=2)) == agora + timedelta(hours=2)
+
+
+def test_inscricao_recusada_depois_da_carga_nao_faz_check_in(app_arquivo, evento):
+    id_oportunidade, id_inscricao, pin = evento
+    client = app_arquivo.test_client()
+    headers = login(client, 'org@teste.com')
+    url = f'/presenca/oportunidade/{id_oportunidade}/checkin'
+    # Tabela já carregada com a inscrição aprovada
+    assert PresencaRepo.get_tabela(id_oportunidade).conhece(id_inscricao)
+
+    with app_arquivo.app_context():
+        InscricaoRepo.update_inscricao(id_inscricao, {'status_inscricao': 'recusada'})
+
+    resposta = client.post(url, json={'id_inscricao': id_inscricao, 'pin': pin}, headers=headers)
+    assert resposta.status_code == 403
+    assert not PresencaRepo.get_tabela(id_oportunidade).conhece(id_inscricao)
+
+
+def test_check_in_com_fila_pequena_ja_esta_gravado_na_resposta(app_arquivo, evento, monkeypatch):
+    id_oportunidade, id_inscricao, pin = evento
+    client = app_arquivo.test_client()
+    headers = login(client, 'org@teste.com')
+
+    resposta = client.post(f'/presenca/oportunidade/{id_oportunidade}/checkin', json={'id_inscricao': id_inscricao, 'pin': pin}, headers=headers)
+    assert resposta.status_code == 200
+    assert resposta.json['gravado'] is True
+    assert PresencaRepo._entrada_gravada(id_inscricao).isoformat() == resposta.json['check_in_hora']
+
+    # Movimento alto: a saída fica para o próximo lote e a resposta avisa
+    monkeypatch.setattr(escritor_presenca, 'sincrono_ate', 0)
+    monkeypatch.setattr(escritor_presenca, 'flush', lambda: None)
+    resposta = client.post(f'/presenca/oportunidade/{id_oportunidade}/checkout', json={'id_inscricao': id_inscricao, 'pin': pin}, headers=headers)
+    assert resposta.status_code == 200
+    assert resposta.json['gravado'] is False
+    assert escritor_presenca.pendentes() == 1
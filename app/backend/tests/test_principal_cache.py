@@ -0,0 +1,82 @@
+import pytest
+from app import create_app
+from extensions import Config, env
+from middleware import principal_cache as modulo
+from middleware.principal_cache import PrincipalCache, Principal, principal_cache
+from repositories import UserRepo
+from .conftest import criar_usuario, login
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(modulo.time, 'monotonic', lambda: agora[0])
+    return agora
+
+
+def _principal(id):
+    return Principal(id, 'Usuário', f'u{id}@teste.com', 'Cidade', 'Bairro', 'regular', True)
+
+
+def _stats(client, headers):
+    resposta = client.get('/auth/principal-cache/stats', headers=headers)
+    assert resposta.status_code == 200
+    return resposta.json['endpoints']['auth_bp.principal_cache_stats']
+
+
+def test_rota_protegida_usa_o_principal_em_cache(client):
+    criar_usuario('admin@teste.com', tipo_usuario='admin')
+    headers = login(client, 'admin@teste.com')
+
+    # Os contadores são do processo: compara com a primeira leitura
+    antes = _stats(client, headers)
+    depois = _stats(client, headers)
+    assert (depois['hits'] - antes['hits'], depois['misses'] - antes['misses']) == (1, 0)
+
+
+def test_entrada_expira_com_o_ttl(relogio):
+    cache = PrincipalCache(ttl=30)
+    cache.put(1, 'token', _principal(1))
+
+    relogio[0] += 29
+    assert cache.get(1, 'token') == _principal(1)
+
+    relogio[0] += 2
+    assert cache.get(1, 'token') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_lru_descarta_a_entrada_menos_usada(relogio):
+    cache = PrincipalCache(max_size=2)
+    cache.put(1, 'a', _principal(1))
+    cache.put(2, 'b', _principal(2))
+    cache.get(1, 'a')
+    cache.put(3, 'c', _principal(3))
+
+    assert cache.get(2, 'b') is None
+    assert cache.get(1, 'a') and cache.get(3, 'c')
+
+
+def test_ttl_vem_do_ambiente(monkeypatch):
+    monkeypatch.setenv('PRINCIPAL_CACHE_TTL', '5')
+    # Config lê o ambiente ao ser importada; reavalia a mesma expressão
+    monkeypatch.setattr(Config, 'PRINCIPAL_CACHE_TTL', float(env('PRINCIPAL_CACHE_TTL', 30)))
+    create_app()
+    assert principal_cache.ttl == 5
+
+
+def test_atualizar_ou_remover_o_usuario_invalida_o_cache(client):
+    usuario = criar_usuario('admin@teste.com', tipo_usuario='admin')
+    headers = login(client, 'admin@teste.com')
+    token = headers['Authorization'].split(' ')[1]
+    _stats(client, headers)
+    assert principal_cache.get(usuario.id, token).nome_completo == 'Usuário de Teste'
+
+    UserRepo.update_user(usuario.id, {'nome_completo': 'Nome Novo'})
+    assert principal_cache.get(usuario.id, token) is None
+    _stats(client, headers)
+    assert principal_cache.get(usuario.id, token).nome_completo == 'Nome Novo'
+
+    UserRepo.delete_user(usuario.id)
+    assert principal_cache.get(usuario.id, token) is None
+    assert client.get('/auth/principal-cache/stats', headers=headers).status_code == 401
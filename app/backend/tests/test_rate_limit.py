@@ -0,0 +1,93 @@
+import pytest
+from app import create_app
+from extensions import Config, db
+from middleware import rate_limit
+from middleware.rate_limit import LoginThrottle, MemoryBackend, SqliteBackend, login_throttle
+from .conftest import criar_usuario
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1_000_000.0]
+    monkeypatch.setattr(rate_limit.time, 'time', lambda: agora[0])
+    return agora
+
+
+def _throttle(backend=None, max_por_email=3, max_por_ip=5):
+    return LoginThrottle(backend or MemoryBackend(), window=60, buckets=6, max_por_email=max_por_email, max_por_ip=max_por_ip)
+
+
+def test_limite_por_email_libera_quando_a_janela_passa(relogio):
+    throttle = _throttle()
+    for _ in range(3):
+        assert throttle.retry_after('A@teste.com', '10.0.0.1') is None
+        throttle.register_failure('a@teste.com ', '10.0.0.1')
+        relogio[0] += 5
+
+    espera = throttle.retry_after('a@teste.com', '10.0.0.2')
+    assert espera is not None and 0 < espera <= 60
+    # Outro email pelo mesmo IP continua liberado
+    assert throttle.retry_after('b@teste.com', '10.0.0.1') is None
+
+    # A primeira falha sai da janela: sobram duas
+    relogio[0] += espera
+    assert throttle.retry_after('a@teste.com', '10.0.0.1') is None
+
+
+def test_sucesso_zera_o_email_mas_nao_o_ip(relogio):
+    throttle = _throttle(max_por_email=2, max_por_ip=2)
+    throttle.register_failure('a@teste.com', '10.0.0.1')
+    throttle.register_failure('a@teste.com', '10.0.0.1')
+    assert throttle.retry_after('a@teste.com', None)
+
+    throttle.register_success('a@teste.com')
+    assert throttle.retry_after('a@teste.com', None) is None
+    assert throttle.retry_after('a@teste.com', '10.0.0.1')
+
+
+def test_limite_por_ip_entre_emails_e_desligavel(relogio):
+    throttle = _throttle()
+    for i in range(5):
+        throttle.register_failure(f'u{i}@teste.com', '10.0.0.1')
+
+    assert throttle.retry_after('novo@teste.com', '10.0.0.1')
+    assert throttle.retry_after('novo@teste.com', '10.0.0.2') is None
+
+    throttle.max_por_ip = 0
+    assert throttle.retry_after('novo@teste.com', '10.0.0.1') is None
+
+
+def test_backend_sqlite_compartilhado_entre_processos(tmp_path, relogio):
+    # Dois workers do mesmo nó, cada um com a própria conexão ao arquivo
+    caminho = str(tmp_path / 'throttle.db')
+    worker_a, worker_b = _throttle(SqliteBackend(caminho)), _throttle(SqliteBackend(caminho))
+
+    worker_a.register_failure('a@teste.com', '10.0.0.1')
+    worker_b.register_failure('a@teste.com', '10.0.0.1')
+    worker_a.register_failure('a@teste.com', '10.0.0.1')
+    assert worker_b.retry_after('a@teste.com', None)
+
+    relogio[0] += 61
+    assert worker_a.retry_after('a@teste.com', None) is None
+
+    relogio[0] -= 61
+    worker_b.register_success('a@teste.com')
+    assert worker_a.retry_after('a@teste.com', None) is None
+
+
+def test_atras_do_proxy_o_ip_vem_do_x_forwarded_for(monkeypatch):
+    monkeypatch.setattr(Config, 'PROXY_FIX_X_FOR', 1)
+    app = create_app()
+    login_throttle.configure(MemoryBackend(), window=60, buckets=6, max_por_email=100, max_por_ip=2)
+    client = app.test_client()
+
+    def tentar(ip):
+        return client.post('/auth/login', json={'email': 'a@teste.com', 'senha': 'errada'}, headers={'X-Forwarded-For': ip}).status_code
+
+    with app.app_context():
+        db.create_all()
+        criar_usuario('a@teste.com')
+        assert [tentar('203.0.113.1') for _ in range(3)] == [401, 401, 429]
+        # Mesmo proxy, outro cliente
+        assert tentar('203.0.113.2') == 401
+        db.drop_all()
@@ -0,0 +1,103 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from extensions import db
+from models import Inscricao, Oportunidade, Usuario
+from repositories import InscricaoRepo, VagasEsgotadas
+from .conftest import criar_usuario, criar_organizacao, criar_oportunidade
+
+VAGAS = 5
+INSCRICOES = 300
+
+
+def _disputar(app, id_oportunidade, ids_usuarios):
+    def inscrever(id_usuario):
+        with app.app_context():
+            try:
+                return 'inscrito' if InscricaoRepo.create_inscricao(id_usuario, id_oportunidade) else 'duplicada'
+            except VagasEsgotadas:
+                return 'esgotada'
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(50) as executor:
+        return Counter(executor.map(inscrever, ids_usuarios))
+
+
+def _cenario(app):
+    with app.app_context():
+        responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+        oportunidade = criar_oportunidade(criar_organizacao(responsavel.id).id, num_vagas=VAGAS)
+        # Em lote e sem hash de senha: os voluntários não fazem login
+        db.session.execute(db.insert(Usuario), [
+            dict(nome_completo='Voluntário', cpf=f'{i:011d}', email=f'voluntario{i}@teste.com', senha='x',
+                 cidade='Cidade', bairro='Bairro', telefone='11999999999', data_nasc=date(2000, 1, 1))
+            for i in range(INSCRICOES)
+        ])
+        db.session.commit()
+        usuarios = db.session.scalars(db.select(Usuario.id).where(Usuario.id != responsavel.id)).all()
+        return oportunidade.id, usuarios
+
+
+def _conferir(app, id_oportunidade, inscritos):
+    with app.app_context():
+        assert Inscricao.query.filter_by(id_oportunidade=id_oportunidade).count() == inscritos
+        assert db.session.get(Oportunidade, id_oportunidade).vagas_restantes == VAGAS - inscritos
+
+
+def test_inscricoes_simultaneas_nao_excedem_as_vagas(app_arquivo):
+    id_oportunidade, usuarios = _cenario(app_arquivo)
+
+    resultado = _disputar(app_arquivo, id_oportunidade, usuarios)
+
+    assert resultado == {'inscrito': VAGAS, 'esgotada': INSCRICOES - VAGAS}
+    _conferir(app_arquivo, id_oportunidade, VAGAS)
+
+
+def test_inscricoes_repetidas_simultaneas_contam_uma_vez(app_arquivo):
+    id_oportunidade, usuarios = _cenario(app_arquivo)
+
+    # Os mesmos três voluntários tentando várias vezes ao mesmo tempo
+    resultado = _disputar(app_arquivo, id_oportunidade, usuarios[:3] * 20)
+
+    assert resultado['inscrito'] == 3
+    assert resultado['duplicada'] == 57
+    _conferir(app_arquivo, id_oportunidade, 3)
+
+
+def _inscricao_aprovada(app, id_oportunidade, id_usuario):
+    with app.app_context():
+        inscricao = InscricaoRepo.create_inscricao(id_usuario, id_oportunidade, status_inscricao='aprovada')
+        return inscricao.id
+
+
+def _em_paralelo(app, tarefa, vezes):
+    def executar(_):
+        with app.app_context():
+            try:
+                return tarefa()
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(20) as executor:
+        return list(executor.map(executar, range(vezes)))
+
+
+def test_recusas_simultaneas_devolvem_a_vaga_uma_vez(app_arquivo):
+    id_oportunidade, usuarios = _cenario(app_arquivo)
+    id_inscricao = _inscricao_aprovada(app_arquivo, id_oportunidade, usuarios[0])
+
+    _em_paralelo(app_arquivo, lambda: InscricaoRepo.update_inscricao(id_inscricao, {'status_inscricao': 'recusada'}), 40)
+
+    with app_arquivo.app_context():
+        assert db.session.get(Oportunidade, id_oportunidade).vagas_restantes == VAGAS
+
+
+def test_remocoes_simultaneas_devolvem_a_vaga_uma_vez(app_arquivo):
+    id_oportunidade, usuarios = _cenario(app_arquivo)
+    id_inscricao = _inscricao_aprovada(app_arquivo, id_oportunidade, usuarios[0])
+
+    resultado = _em_paralelo(app_arquivo, lambda: InscricaoRepo.delete_inscricao(id_inscricao), 40)
+
+    assert resultado.count(True) == 1
+    _conferir(app_arquivo, id_oportunidade, 0)
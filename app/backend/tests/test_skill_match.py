@@ -0,0 +1,66 @@
+import math
+import pytest
+from repositories import UserRepo
+from services.skill_match import SkillMatrix, BONUS_BAIRRO, BONUS_CIDADE
+from .conftest import criar_usuario, criar_habilidades
+
+
+def _matriz():
+    matriz = SkillMatrix()
+    matriz.rebuild(
+        [(1, 'Cidade', 'Centro'), (2, 'Cidade', 'Vila Nova'), (3, 'Outra', 'Jardim')],
+        [(1, 10), (1, 20), (2, 10), (3, 30)]
+    )
+    return matriz
+
+
+def test_jaccard_pontua_pela_sobreposicao_de_habilidades():
+    # u1 = {10, 20}, u2 = {10}: |U ∩ O| / |U ∪ O| com O = {10, 20}
+    assert _matriz().top_k([10, 20], None, 10) == [(1, 1.0, 2), (2, 0.5, 1)]
+
+
+def test_ponderado_favorece_habilidades_raras():
+    # 3 voluntários; a habilidade 10 aparece em 2 deles e a 20 em 1
+    peso_10, peso_20 = math.log(1 + 3 / 2), math.log(1 + 3 / 1)
+    ranking = _matriz().top_k([10, 20], None, 10, metodo='ponderado')
+
+    assert [(uid, em_comum) for uid, _, em_comum in ranking] == [(1, 2), (2, 1)]
+    assert ranking[0][1] == pytest.approx(1.0)
+    assert ranking[1][1] == pytest.approx(round(peso_10 / (peso_10 + peso_20), 4))
+
+
+def test_local_do_voluntario_entra_como_bonus():
+    matriz = _matriz()
+
+    # Mesmo bairro (sem diferenciar acentos e maiúsculas): u2 passa de 0.5 para 0.5 + BONUS_BAIRRO
+    assert matriz.top_k([10], 'VILA NOVA', 10) == [(2, 1.0 + BONUS_BAIRRO, 1), (1, 0.5, 1)]
+    # Mesma cidade vale menos que o mesmo bairro
+    assert matriz.top_k([10], 'cidade', 10) == [(2, 1.0 + BONUS_CIDADE, 1), (1, 0.5 + BONUS_CIDADE, 1)]
+    assert matriz.top_k([10], 'Cidade', 10, excluir=[2]) == [(1, 0.5 + BONUS_CIDADE, 1)]
+
+
+def test_escritas_durante_a_reconstrucao_nao_se_perdem():
+    matriz = SkillMatrix()
+
+    def vinculos():
+        yield (1, 10)
+        # Escritas de requisições enquanto o banco é lido para a matriz nova
+        matriz.set_user(2, [10], 'Cidade', 'Centro')
+        matriz.remove_user(1)
+
+    matriz.rebuild([(1, 'Cidade', 'Centro')], vinculos())
+
+    assert matriz.top_k([10], None, 10) == [(2, 1.0, 1)]
+
+
+def test_ranking_acompanha_a_troca_de_habilidades(app):
+    hab_a, hab_b = criar_habilidades(2)
+    voluntario = criar_usuario('voluntario@teste.com')
+    UserRepo.update_habilidades(voluntario.id, [hab_a])
+
+    assert [v['id'] for v in UserRepo.rank_voluntarios([hab_a], None, 10)] == [voluntario.id]
+
+    # A matriz já está construída: a troca entra pela atualização incremental da linha
+    UserRepo.update_habilidades(voluntario.id, [hab_b])
+    assert UserRepo.rank_voluntarios([hab_a], None, 10) == []
+    assert [v['id'] for v in UserRepo.rank_voluntarios([hab_b], None, 10)] == [voluntario.id]
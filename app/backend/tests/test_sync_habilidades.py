@@ -0,0 +1,88 @@
+import pytest
+from datetime import date, datetime, timedelta
+from repositories import UserRepo, OportunidadeRepo
+from .conftest import criar_usuario, criar_organizacao, criar_habilidades
+
+TAMANHOS = [1, 10, 100]
+
+
+def _comandos_por_tamanho(contar_comandos, executar):
+    contagens = {}
+    for n in TAMANHOS:
+        with contar_comandos() as comandos:
+            executar(n)
+        contagens[n] = len(comandos)
+    return contagens
+
+
+def test_update_habilidades_do_usuario_em_numero_constante_de_comandos(app, contar_comandos):
+    habilidades = criar_habilidades(2 * max(TAMANHOS))
+    usuarios = {n: criar_usuario(f'voluntario{n}@teste.com').id for n in TAMANHOS}
+    for n, id_usuario in usuarios.items():
+        UserRepo.update_habilidades(id_usuario, habilidades[:n])
+
+    # Troca todas as habilidades de cada um: exige DELETE e INSERT
+    def executar(n):
+        assert UserRepo.update_habilidades(usuarios[n], habilidades[n:2 * n])
+
+    contagens = _comandos_por_tamanho(contar_comandos, executar)
+    assert len(set(contagens.values())) == 1, contagens
+
+
+def test_create_user_grava_habilidades_no_mesmo_commit(app, contar_comandos):
+    habilidades = criar_habilidades(max(TAMANHOS))
+
+    def executar(n):
+        user = UserRepo.create_user(
+            f'Voluntário {n}', f'{n:011d}', f'novo{n}@teste.com', 'x', 'Cidade', 'Bairro', '1',
+            date(2000, 1, 1), habilidades=habilidades[:n]
+        )
+        assert user.habilidades.count() == n
+
+    contagens = _comandos_por_tamanho(contar_comandos, executar)
+    assert len(set(contagens.values())) == 1, contagens
+
+
+@pytest.fixture
+def oportunidades(app):
+    responsavel = criar_usuario('org@teste.com', tipo_usuario='organizacao')
+    organizacao = criar_organizacao(responsavel.id)
+    # Pelo repositório, como na API: a criação já deixa as versões do feed da comunidade gravadas
+    return {
+        n: OportunidadeRepo.create_oportunidade(organizacao.id, 'Mutirão', 'Descrição', 'Rua 2', 'Bairro', datetime.now() + timedelta(days=7), 3, 10).id
+        for n in TAMANHOS
+    }
+
+
+def test_update_oportunidade_habilidades_em_numero_constante_de_comandos(app, contar_comandos, oportunidades):
+    habilidades = criar_habilidades(2 * max(TAMANHOS))
+    for n, id_oportunidade in oportunidades.items():
+        OportunidadeRepo.update_oportunidade_habilidades(id_oportunidade, habilidades[:n])
+
+    def executar(n):
+        assert OportunidadeRepo.update_oportunidade_habilidades(oportunidades[n], habilidades[n:2 * n])
+
+    contagens = _comandos_por_tamanho(contar_comandos, executar)
+    assert len(set(contagens.values())) == 1, contagens
+
+
+def test_update_oportunidade_sincroniza_habilidades_sem_depender_da_quantidade(app, contar_comandos, oportunidades):
+    habilidades = criar_habilidades(2 * max(TAMANHOS))
+
+    def executar(n):
+        OportunidadeRepo.update_oportunidade(oportunidades[n], {'habilidades': habilidades[:n]})
+
+    contagens = _comandos_por_tamanho(contar_comandos, executar)
+    assert len(set(contagens.values())) == 1, contagens
+
+
+def test_update_oportunidade_sincroniza_tags_sem_depender_da_quantidade(app, contar_comandos, oportunidades):
+    for n, id_oportunidade in oportunidades.items():
+        OportunidadeRepo.update_oportunidade(id_oportunidade, {'tags': ','.join(f'tag {i}' for i in range(n))})
+
+    # Troca todas as tags de cada uma, criando as novas: exige DELETE e INSERT
+    def executar(n):
+        OportunidadeRepo.update_oportunidade(oportunidades[n], {'tags': ','.join(f'nova {n} {i}' for i in range(n))})
+
+    contagens = _comandos_por_tamanho(contar_comandos, executar)
+    assert len(set(contagens.values())) == 1, contagens
@@ -0,0 +1,46 @@
+from datetime import datetime
+from services.timeline import TimelineCache
+
+CHAVE = ('comunidade', 'Bairro')
+# sync negativo: toda leitura sincroniza; janela_pull=0: nunca entra no modo pull
+
+
+def _banco(*ids):
+    # Publicações da comunidade no "banco", com as funções de leitura do TimelineCache.get
+    publicacoes = {id: datetime(2026, 1, 1, 0, 0, id) for id in ids}
+
+    def carregar(chave, n):
+        return [(id, publicacoes[id]) for id in sorted(publicacoes, reverse=True)[:n]]
+
+    def novos(chave, desde):
+        return [(id, publicacoes[id]) for id in sorted(publicacoes) if id > desde]
+
+    return publicacoes, carregar, novos
+
+
+def test_sincronizacao_pega_publicacao_confirmada_fora_de_ordem():
+    cache = TimelineCache(tamanho=10, sync=-1, janela_pull=0, janela_sync=2)
+    publicacoes, carregar, novos = _banco(1, 2, 3)
+    cache.get(CHAVE, carregar, novos)
+
+    # Este processo publica o id 5; o id 4, de outro processo, é confirmado depois
+    publicacoes[5] = datetime(2026, 1, 1, 0, 0, 5)
+    cache.publicar([CHAVE], 5, publicacoes[5])
+    publicacoes[4] = datetime(2026, 1, 1, 0, 0, 4)
+
+    timeline = cache.get(CHAVE, carregar, novos)
+    assert timeline.pagina(None, 10) == ([5, 4, 3, 2, 1], None)
+
+
+def test_sincronizacao_rele_so_a_janela_abaixo_da_mais_recente():
+    cache = TimelineCache(tamanho=10, sync=-1, janela_pull=0, janela_sync=2)
+    _, carregar, novos = _banco(*range(1, 21))
+    relidos = []
+
+    def novos_registrando(chave, desde):
+        relidos.append(desde)
+        return novos(chave, desde)
+
+    cache.get(CHAVE, carregar, novos_registrando)
+    cache.get(CHAVE, carregar, novos_registrando)
+    assert relidos == [18]